@@ -0,0 +1,167 @@
+"""
+Benchmark: criação concorrente de tickets no SQLite - modo antigo x WAL com fila de escrita
+
+Cria um banco SQLite temporário e, para cada número de threads, cria tickets em paralelo
+(reserva do número + INSERT + SELECT da linha, como `create_transporte`) enquanto outras
+threads leem as contagens por status sem parar. Dois perfis:
+
+- antigo: journal em rollback (DELETE), sem pragmas, uma conexão por thread escrevendo direto
+  (o que o bot fazia antes; disputa a trava no busy handler do SQLite)
+- atual: WAL + pragmas de SQLitePool, escritas em fila na conexão de escrita (`SQLitePool.escrita()`)
+
+Mostra tickets/s, latência p50/p95 da criação, erros "database is locked" e p95 das leituras.
+
+Uso (na pasta bot/):
+    python benchmarks/bench_escrita.py [--threads 1 4 16] [--tickets 2000] [--leitores 4]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Banco isolado: força SQLite e cria tudo num diretório temporário
+os.environ["DATABASE_URL"] = ""
+os.chdir(tempfile.mkdtemp(prefix="bench_escrita_"))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database import db, SQLitePool  # noqa: E402
+
+SQL_NUMERO = "UPDATE sequencias SET valor = valor + 1 WHERE nome = 'ticket' RETURNING valor"
+SQL_INSERT = (
+    "INSERT INTO transportes (numero_ticket, cliente_id, status, origem, destino, valor_estimado, prioridade, taxa_final, ticket_channel_id) "
+    "VALUES (?, ?, 'AGUARDANDO_PAGAMENTO', 'Martlock', 'Caerleon', 50000000, 'NORMAL', 30.0, ?)"
+)
+SQL_LEITURA = "SELECT status, COUNT(*) AS total FROM transportes GROUP BY status"
+
+
+def p95(valores):
+    return statistics.quantiles(valores, n=20)[-1] if len(valores) > 1 else (valores or [0])[0]
+
+
+class Antigo:
+    """Caminho antigo: conexão comum por thread, sem fila, commit por comando"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.caminho)
+        return conn
+
+    def criar(self):
+        conn = self._conn()
+        numero = conn.execute(SQL_NUMERO).fetchone()[0]
+        conn.commit()
+        cur = conn.execute(SQL_INSERT, (numero, numero % 500, str(numero)))
+        conn.execute("SELECT * FROM transportes WHERE id = ?", (cur.lastrowid,)).fetchone()
+        conn.commit()
+
+    def ler(self):
+        self._conn().execute(SQL_LEITURA).fetchall()
+
+
+class Atual:
+    """Caminho atual: mesmos comandos pelo SQLitePool (WAL, pragmas, escritas na fila)"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def criar(self):
+        with self.pool.escrita() as conn:
+            numero = conn.execute(SQL_NUMERO).fetchone()[0]
+            conn.commit()
+        with self.pool.escrita() as conn:
+            cur = conn.execute(SQL_INSERT, (numero, numero % 500, str(numero)))
+            conn.execute("SELECT * FROM transportes WHERE id = ?", (cur.lastrowid,)).fetchone()
+            conn.commit()
+
+    def ler(self):
+        self.pool.acquire().execute(SQL_LEITURA).fetchall()
+
+
+def rodar(perfil, threads, tickets, leitores):
+    """Cria `tickets` com `threads` escritoras e `leitores` threads lendo; devolve as métricas"""
+    latencias, erros, leituras = [], [0], []
+    parar = threading.Event()
+
+    def escrever():
+        inicio = time.perf_counter()
+        try:
+            perfil.criar()
+        except sqlite3.OperationalError:
+            erros[0] += 1
+            return
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    def ler_sempre():
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            try:
+                perfil.ler()
+            except sqlite3.OperationalError:
+                continue
+            leituras.append((time.perf_counter() - inicio) * 1000)
+
+    fundo = [threading.Thread(target=ler_sempre, daemon=True) for _ in range(leitores)]
+    for thread in fundo:
+        thread.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in range(tickets):
+            executor.submit(escrever)
+    duracao = time.perf_counter() - inicio
+    parar.set()
+    for thread in fundo:
+        thread.join()
+
+    return {
+        "tickets/s": len(latencias) / duracao,
+        "p50 (ms)": statistics.median(latencias) if latencias else 0,
+        "p95 (ms)": p95(latencias),
+        "locked": erros[0],
+        "leitura p95": p95(leituras),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--leitores", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"📦 Banco em {os.getcwd()} ({args.tickets:,} tickets por rodada, {args.leitores} leitores)")
+    colunas = ["tickets/s", "p50 (ms)", "p95 (ms)", "locked", "leitura p95"]
+    print(f"\n{'perfil':<8} {'threads':>7} " + " ".join(f"{coluna:>12}" for coluna in colunas))
+
+    # Duas cópias do banco recém-criado, ambas no journal antigo: o SQLitePool do perfil atual liga o WAL ao abrir
+    db.close()
+    caminhos = {perfil: os.path.abspath(f"{perfil}.db") for perfil in ("antigo", "atual")}
+    for perfil, caminho in caminhos.items():
+        origem, destino = sqlite3.connect(db.sqlite_path), sqlite3.connect(caminho)
+        origem.backup(destino)
+        destino.execute("PRAGMA journal_mode = DELETE")
+        origem.close()
+        destino.close()
+
+    for threads in args.threads:
+        antigo = rodar(Antigo(caminhos["antigo"]), threads, args.tickets, args.leitores)
+        atual = rodar(Atual(SQLitePool(caminhos["atual"])), threads, args.tickets, args.leitores)
+
+        for perfil, metricas in (("antigo", antigo), ("atual", atual)):
+            print(f"{perfil:<8} {threads:>7} " + " ".join(
+                f"{metricas[coluna]:>12}" if coluna == "locked" else f"{metricas[coluna]:>12.1f}" for coluna in colunas
+            ))
+
+
+if __name__ == "__main__":
+    main()
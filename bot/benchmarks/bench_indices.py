@@ -0,0 +1,112 @@
+"""
+Benchmark: latência das buscas de transportes antes/depois dos índices (migração 1)
+
+Cria um banco SQLite temporário com N transportes (padrão 100k), mede as queries
+quentes sem os índices e depois de `apply_migrations()`.
+
+Uso (na pasta bot/):
+    python benchmarks/bench_indices.py [--linhas 100000] [--repeticoes 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Banco isolado: força SQLite e cria tudo num diretório temporário
+os.environ["DATABASE_URL"] = ""
+os.chdir(tempfile.mkdtemp(prefix="bench_indices_"))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database import db, MIGRATIONS  # noqa: E402
+
+STATUS_PESOS = [
+    ("CONCLUIDO", 85), ("CANCELADO", 6), ("AGUARDANDO_PAGAMENTO", 4),
+    ("PAGO", 2), ("DEPOSITADO", 1), ("EM_TRANSPORTE", 1), ("ENTREGUE", 1),
+]
+
+
+def popular(linhas, clientes=5000):
+    status = [s for s, _ in STATUS_PESOS]
+    pesos = [p for _, p in STATUS_PESOS]
+    inicio = datetime(2024, 1, 1)
+    rnd = random.Random(42)
+    with db._cursor(commit=True) as cur:
+        cur.executemany(
+            "INSERT INTO transportes (numero_ticket, cliente_id, status, origem, valor_estimado, prioridade, taxa_final, ticket_channel_id, data_criacao) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    1001 + i,
+                    rnd.randint(1, clientes),
+                    rnd.choices(status, pesos)[0],
+                    "Martlock",
+                    rnd.randint(10, 500) * 1_000_000,
+                    "ALTA" if rnd.random() < 0.2 else "NORMAL",
+                    6.0,
+                    str(900_000_000_000 + i),
+                    (inicio + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                for i in range(linhas)
+            ),
+        )
+
+
+def remover_indices():
+    for versao, _, comandos in MIGRATIONS:
+        if versao != 1:
+            continue
+        for comando in comandos:
+            nome = comando.split("EXISTS")[1].split()[0]
+            db._execute(f"DROP INDEX IF EXISTS {nome}", commit=True)
+    db._execute("DELETE FROM schema_migrations WHERE versao = 1", commit=True)
+
+
+def medir(repeticoes, linhas):
+    consultas = {
+        "get_transportes_by_status('PAGO')": lambda: db.get_transportes_by_status("PAGO"),
+        "get_transportes_por_status([PAGO, DEPOSITADO])": lambda: db.get_transportes_por_status(["PAGO", "DEPOSITADO"]),
+        "get_transportes_cliente(42)": lambda: db.get_transportes_cliente(42),
+        "ticket_channel_id = ?": lambda: db._execute(
+            "SELECT * FROM transportes WHERE ticket_channel_id = ?", (str(900_000_000_000 + linhas // 2),), fetchone=True
+        ),
+    }
+    resultados = {}
+    for nome, consulta in consultas.items():
+        consulta()  # aquece cache de páginas
+        tempos = []
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            consulta()
+            tempos.append((time.perf_counter() - t0) * 1000)
+        tempos.sort()
+        resultados[nome] = (statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1])
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"📦 Populando {args.linhas:,} transportes em {os.getcwd()}...")
+    popular(args.linhas)
+
+    remover_indices()
+    antes = medir(args.repeticoes, args.linhas)
+    db.apply_migrations()
+    depois = medir(args.repeticoes, args.linhas)
+
+    print(f"\n{'consulta':<48} {'sem índice p50/p95 (ms)':>24} {'com índice p50/p95 (ms)':>24} {'ganho':>8}")
+    for nome in antes:
+        (a50, a95), (d50, d95) = antes[nome], depois[nome]
+        print(f"{nome:<48} {a50:>11.3f} / {a95:<10.3f} {d50:>11.3f} / {d95:<10.3f} {a50 / d50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
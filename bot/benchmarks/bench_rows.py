@@ -0,0 +1,118 @@
+"""
+Benchmark: custo de materializar linhas - Row antigo (dict copiado) x Row de tupla
+
+Cria um banco SQLite temporário com transportes e mede, para 10k e 100k linhas,
+o tempo de `SELECT * ... fetchall` e a memória retida pela lista de resultados
+(tracemalloc) em três caminhos:
+
+- sqlite3.Row cru (referência, sem conversão)
+- caminho antigo: sqlite3.Row -> dict -> Row(dict) com cópia dos valores em `_values`
+- caminho atual: tupla do driver -> Row(índice compartilhado, tupla)
+
+Uso (na pasta bot/):
+    python benchmarks/bench_rows.py [--linhas 10000 100000] [--repeticoes 5]
+"""
+import argparse
+import gc
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Banco isolado: força SQLite e cria tudo num diretório temporário
+os.environ["DATABASE_URL"] = ""
+os.chdir(tempfile.mkdtemp(prefix="bench_rows_"))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database import db, _CursorSQLite  # noqa: E402
+
+
+def popular(linhas):
+    with db._cursor(commit=True) as cur:
+        cur.executemany(
+            "INSERT INTO transportes (numero_ticket, cliente_id, status, origem, valor_estimado, prioridade, taxa_final, ticket_channel_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (1001 + i, 1 + i % 5000, "CONCLUIDO", "Martlock", 50_000_000, "NORMAL", 30.0, str(900_000_000_000 + i))
+                for i in range(linhas)
+            ),
+        )
+
+
+class RowAntigo(dict):
+    """Row anterior (dict + lista `_values`), mantido aqui só para comparação"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = list(self.values())
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._values[key]
+        return super().__getitem__(key)
+
+
+def buscar_sqlite_row(conn, sql):
+    return conn.execute(sql).fetchall()
+
+
+def buscar_antigo(conn, sql):
+    return [RowAntigo(dict(row)) for row in conn.execute(sql).fetchall()]
+
+
+def buscar_atual(conn, sql):
+    cur = conn.cursor(factory=_CursorSQLite)
+    cur.execute(sql)
+    return cur.fetchall()
+
+
+def medir(buscar, conn, sql, repeticoes):
+    buscar(conn, sql)  # aquece cache de páginas
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        t0 = time.perf_counter()
+        linhas = buscar(conn, sql)
+        tempos.append((time.perf_counter() - t0) * 1000)
+        del linhas
+
+    gc.collect()
+    tracemalloc.start()
+    linhas = buscar(conn, sql)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Confere que os dois acessos continuam funcionando
+    assert linhas[0]["status"] == linhas[0][3]
+    del linhas
+    return statistics.median(tempos), memoria / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"📦 Populando {max(args.linhas):,} transportes em {os.getcwd()}...")
+    popular(max(args.linhas))
+
+    caminhos = {
+        "sqlite3.Row (cru)": buscar_sqlite_row,
+        "Row(dict) antigo": buscar_antigo,
+        "Row de tupla": buscar_atual,
+    }
+    with db._conexao() as conn:
+        for linhas in args.linhas:
+            sql = f"SELECT * FROM transportes ORDER BY id LIMIT {linhas}"
+            print(f"\n{linhas:,} linhas")
+            print(f"{'caminho':<22} {'fetch p50 (ms)':>16} {'memória (MiB)':>15}")
+            for nome, buscar in caminhos.items():
+                tempo, memoria = medir(buscar, conn, sql, args.repeticoes)
+                print(f"{nome:<22} {tempo:>16.1f} {memoria:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Cog: Índice de Canais
+Mantém `bot.utils.channels.canais` em dia com os eventos da guild e salva os
+canais de cada papel em `configuracoes` (CANAL_ANALISE, CANAL_FILA, ...)
+"""
+from discord.ext import commands
+from bot.database import adb
+from bot.utils.channels import canais, PAPEIS, chave_config
+
+class CanaisCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            # IDs salvos têm preferência sobre o nome do canal
+            fixos = {papel: await adb.get_config(chave_config(papel)) for papel in PAPEIS}
+            papeis = canais.reconstruir(guild, fixos)
+            await self._salvar(guild, [p for p in papeis if str(papeis[p]) != str(fixos.get(p))])
+            print(f"✅ Índice de canais montado: {len(papeis)} papéis em {guild.name}")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        await self._salvar(channel.guild, canais.registrar(channel))
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        await self._salvar(channel.guild, canais.remover(channel))
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        await self._salvar(after.guild, canais.atualizar(before, after))
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        canais.invalidar_cargos(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        canais.invalidar_cargos(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        if before.name != after.name:
+            canais.invalidar_cargos(after.guild)
+
+    async def _salvar(self, guild, papeis_alterados):
+        """Persiste os papéis que mudaram de canal"""
+        if not papeis_alterados:
+            return
+        atuais = canais.papeis(guild)
+        for papel in papeis_alterados:
+            canal_id = atuais.get(papel)
+            await adb.set_config(chave_config(papel), str(canal_id) if canal_id else "")
+
+async def setup(bot):
+    await bot.add_cog(CanaisCog(bot))
@@ -8,16 +8,27 @@ from discord import app_commands
 import sqlite3
 from datetime import datetime
 import asyncio
-from bot.config import GUILD_ID
-from bot.database import db
-import sys
-import os
+from bot.config import GUILD_ID, STATUS
+from bot.database import adb
+from bot.utils.channels import canais
+from bot.utils.precos import precos
+from bot.utils.outbound import outbound, PRIORIDADE_STAFF
 
-# Adiciona o caminho do bot ao sys.path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Cartões do dashboard -> status de `config.STATUS` somados em cada um (mesmos grupos do relatório)
+GRUPOS_STATS = {
+    'concluidos': (STATUS["CONCLUIDO"], STATUS["ENTREGUE"]),
+    'fila': (STATUS["ABERTO"],),
+    'aguardando_pagamento': (STATUS["AGUARDANDO_PAGAMENTO"],),
+    'pagos_esperando': (STATUS["PAGO"], STATUS["DEPOSITADO"], STATUS["EM_TRANSPORTE"]),
+}
+
+
+def agrupar_stats(contagens):
+    """Soma as contagens por status (snapshot do banco) nos cartões do dashboard, mais o total"""
+    stats = {cartao: sum(contagens.get(s, 0) for s in status) for cartao, status in GRUPOS_STATS.items()}
+    stats['total'] = sum(stats.values())
+    return stats
 
-# Importa config para valores
-import config
 
 class Dashboards(commands.Cog):
     def __init__(self, bot):
@@ -27,6 +38,10 @@ class Dashboards(commands.Cog):
         self.dashboard_config_enviado = False
         self._init_tabelas()
     
+    async def cog_load(self):
+        await adb.run_sync(precos.carregar)
+        precos.escutar()
+    
     def _init_tabelas(self):
         """Inicializa tabelas se não existirem"""
         try:
@@ -35,103 +50,39 @@ class Dashboards(commands.Cog):
         except Exception as e:
             print(f"❌ Erro ao inicializar dashboards: {e}")
     
-    def _get_stats_transporte(self):
+    async def _get_stats_transporte(self):
         """Retorna estatísticas de transportes por status"""
         try:
-            conn = db.get_connection()
-            cursor = db.get_wrapped_cursor(conn)
-            
-            # Conta transportes por status
-            # Assumindo que existe uma tabela de transportes com status
-            
-            # Concluídos
-            cursor.execute("""
-                SELECT COUNT(*) FROM transportes 
-                WHERE status = 'concluido' OR status = 'CONCLUIDO'
-            """)
-            concluidos = cursor.fetchone()[0] or 0
-            
-            # Fila (criados/aguardando)
-            cursor.execute("""
-                SELECT COUNT(*) FROM transportes 
-                WHERE status IN ('criado', 'CRIADO', 'fila', 'FILA')
-            """)
-            fila = cursor.fetchone()[0] or 0
-            
-            # Aguardando Pagamento
-            cursor.execute("""
-                SELECT COUNT(*) FROM transportes 
-                WHERE status IN ('aguardando_pagamento', 'AGUARDANDO_PAGAMENTO', 'aguardando_pag')
-            """)
-            aguardando_pagamento = cursor.fetchone()[0] or 0
-            
-            # Pagos Esperando Transportar
-            cursor.execute("""
-                SELECT COUNT(*) FROM transportes 
-                WHERE status IN ('pago', 'PAGO', 'em_transporte', 'EM_TRANSPORTE', 'aguardando_transporte')
-            """)
-            pagos_esperando = cursor.fetchone()[0] or 0
-            
-            conn.close()
-            
-            return {
-                'concluidos': concluidos,
-                'fila': fila,
-                'aguardando_pagamento': aguardando_pagamento,
-                'pagos_esperando': pagos_esperando,
-                'total': concluidos + fila + aguardando_pagamento + pagos_esperando
-            }
+            # Snapshot em cache (uma única query GROUP BY status), status já em maiúsculo
+            return agrupar_stats(await adb.get_stats_snapshot())
         except Exception as e:
             print(f"❌ Erro ao buscar stats: {e}")
-            return {
-                'concluidos': 0,
-                'fila': 0,
-                'aguardando_pagamento': 0,
-                'pagos_esperando': 0,
-                'total': 0
-            }
+            return agrupar_stats({})
     
     def _get_preco_por_milhao(self):
-        """Retorna preço por milhão de prata configurado"""
-        # Lê do arquivo config ou retorna valor padrão
-        try:
-            return getattr(config, 'PRECO_POR_MILHAO', 0.60)
-        except:
-            return 0.60
+        """Retorna preço por milhão de prata configurado (snapshot em memória)"""
+        return precos.atual.preco_por_milhao
     
-    def _set_preco_por_milhao(self, preco):
-        """Atualiza preço por milhão de prata no config"""
+    async def _set_preco_por_milhao(self, preco):
+        """Atualiza preço por milhão de prata em `configuracoes` (vale na hora para todos os cálculos)"""
         try:
-            # Atualiza o config.py dinamicamente
-            config_path = os.path.join(os.path.dirname(__file__), '../config.py')
-            
-            with open(config_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Encontra e substitui o valor
-            import re
-            content = re.sub(
-                r'PRECO_POR_MILHAO = [\d.]+',
-                f'PRECO_POR_MILHAO = {preco}',
-                content
-            )
-            
-            with open(config_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # Recarrega o módulo config
-            import importlib
-            importlib.reload(config)
-            
+            await adb.run_sync(precos.definir, PRECO_POR_MILHAO=preco)
             return True
         except Exception as e:
             print(f"❌ Erro ao atualizar preço: {e}")
             return False
     
-    async def _enviar_dashboard_relatorios(self, canal):
-        """Envia dashboard de relatórios para o canal"""
+    async def _publicar(self, canal, mensagem, embed, view):
+        """Edita o dashboard existente (edições em rajada viram uma só) ou publica um novo no canal"""
+        if mensagem is not None:
+            outbound.edit(mensagem, prioridade=PRIORIDADE_STAFF, embed=embed, view=view)
+        else:
+            await outbound.send(canal, prioridade=PRIORIDADE_STAFF, embed=embed, view=view)
+    
+    async def _enviar_dashboard_relatorios(self, canal, mensagem=None):
+        """Envia dashboard de relatórios para o canal (ou atualiza `mensagem`, o dashboard já publicado)"""
         try:
-            stats = self._get_stats_transporte()
+            stats = await self._get_stats_transporte()
             
             # Cores por status
             cores_status = {
@@ -220,7 +171,7 @@ class Dashboards(commands.Cog):
             
             async def atualizar_callback(interaction: discord.Interaction):
                 await interaction.response.defer()
-                await self._enviar_dashboard_relatorios(canal)
+                await self._enviar_dashboard_relatorios(canal, interaction.message)
             
             btn_atualizar.callback = atualizar_callback
             view.add_item(btn_atualizar)
@@ -234,7 +185,7 @@ class Dashboards(commands.Cog):
             )
             
             async def detalhes_callback(interaction: discord.Interaction):
-                stats_atualizadas = self._get_stats_transporte()
+                stats_atualizadas = await self._get_stats_transporte()
                 
                 embed_detalhes = discord.Embed(
                     title="📋 DETALHES DOS TRANSPORTES",
@@ -271,16 +222,17 @@ class Dashboards(commands.Cog):
             view.add_item(btn_detalhes)
             
             # Envia para o canal
-            await canal.send(embed=embed, view=view)
+            await self._publicar(canal, mensagem, embed, view)
             print("✅ Dashboard de relatórios enviado para o canal")
         except Exception as e:
             print(f"❌ Erro ao enviar dashboard de relatórios: {e}")
     
-    async def _enviar_dashboard_config(self, canal):
-        """Envia dashboard de configurações para o canal"""
+    async def _enviar_dashboard_config(self, canal, mensagem=None):
+        """Envia dashboard de configurações para o canal (ou atualiza `mensagem`, o dashboard já publicado)"""
         try:
-            preco_atual = self._get_preco_por_milhao()
-            taxa_alta_prioridade = preco_atual * (1 + 0.20)  # +20%
+            tabela = precos.atual
+            preco_atual = tabela.preco_por_milhao
+            taxa_alta_prioridade = tabela.preco_alta_prioridade
             
             # Embed de configuração
             embed = discord.Embed(
@@ -343,13 +295,13 @@ class Dashboards(commands.Cog):
             )
             
             async def aumentar_callback(interaction: discord.Interaction):
-                novo_preco = preco_atual + 0.05
-                if self._set_preco_por_milhao(novo_preco):
+                novo_preco = self._get_preco_por_milhao() + 0.05
+                if await self._set_preco_por_milhao(novo_preco):
                     await interaction.response.send_message(
                         f"✅ Preço atualizado para **R$ {novo_preco:.2f}/milhão**",
                         ephemeral=True
                     )
-                    await self._enviar_dashboard_config(canal)
+                    await self._enviar_dashboard_config(canal, interaction.message)
                 else:
                     await interaction.response.send_message("❌ Erro ao atualizar preço", ephemeral=True)
             
@@ -365,13 +317,13 @@ class Dashboards(commands.Cog):
             )
             
             async def diminuir_callback(interaction: discord.Interaction):
-                novo_preco = max(0.05, preco_atual - 0.05)  # Mínimo R$ 0.05
-                if self._set_preco_por_milhao(novo_preco):
+                novo_preco = max(0.05, self._get_preco_por_milhao() - 0.05)  # Mínimo R$ 0.05
+                if await self._set_preco_por_milhao(novo_preco):
                     await interaction.response.send_message(
                         f"✅ Preço atualizado para **R$ {novo_preco:.2f}/milhão**",
                         ephemeral=True
                     )
-                    await self._enviar_dashboard_config(canal)
+                    await self._enviar_dashboard_config(canal, interaction.message)
                 else:
                     await interaction.response.send_message("❌ Erro ao atualizar preço", ephemeral=True)
             
@@ -393,7 +345,7 @@ class Dashboards(commands.Cog):
             view.add_item(btn_editar)
             
             # Envia para o canal
-            await canal.send(embed=embed, view=view)
+            await self._publicar(canal, mensagem, embed, view)
             print("✅ Dashboard de configurações enviado para o canal")
         except Exception as e:
             print(f"❌ Erro ao enviar dashboard de config: {e}")
@@ -427,7 +379,7 @@ class Dashboards(commands.Cog):
                         return
                     
                     # Atualiza preço
-                    if self._set_preco_por_milhao(novo_preco):
+                    if await self._set_preco_por_milhao(novo_preco):
                         embed_conf = discord.Embed(
                             title="✅ PREÇO ATUALIZADO",
                             color=0x2ECC71
@@ -438,7 +390,7 @@ class Dashboards(commands.Cog):
                             inline=False
                         )
                         
-                        taxa_alta = novo_preco * 1.20
+                        taxa_alta = precos.atual.preco_alta_prioridade
                         embed_conf.add_field(
                             name="⭐ Alta Prioridade (+20%)",
                             value=f"R$ {taxa_alta:.2f}/milhão",
@@ -447,12 +399,11 @@ class Dashboards(commands.Cog):
                         
                         await modal_interaction.response.send_message(embed=embed_conf, ephemeral=True)
                         
-                        # Reenvia o dashboard atualizado
+                        # Atualiza o dashboard em que o botão foi clicado
                         guild = modal_interaction.guild
-                        for ch in guild.channels:
-                            if "config" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                                await self._enviar_dashboard_config(ch)
-                                break
+                        ch = canais.canal(guild, "config")
+                        if ch:
+                            await self._enviar_dashboard_config(ch, modal_interaction.message)
                     else:
                         await modal_interaction.response.send_message(
                             "❌ Erro ao atualizar preço",
@@ -476,11 +427,10 @@ class Dashboards(commands.Cog):
             try:
                 guild = self.bot.get_guild(self.guild_id)
                 if guild:
-                    for ch in guild.channels:
-                        if "relatorio" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                            await self._enviar_dashboard_relatorios(ch)
-                            self.dashboard_relatorios_enviado = True
-                            break
+                    ch = canais.canal(guild, "relatorio")
+                    if ch:
+                        await self._enviar_dashboard_relatorios(ch)
+                        self.dashboard_relatorios_enviado = True
             except Exception as e:
                 print(f"❌ Erro ao enviar dashboard de relatórios: {e}")
         
@@ -490,11 +440,10 @@ class Dashboards(commands.Cog):
             try:
                 guild = self.bot.get_guild(self.guild_id)
                 if guild:
-                    for ch in guild.channels:
-                        if "config" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                            await self._enviar_dashboard_config(ch)
-                            self.dashboard_config_enviado = True
-                            break
+                    ch = canais.canal(guild, "config")
+                    if ch:
+                        await self._enviar_dashboard_config(ch)
+                        self.dashboard_config_enviado = True
             except Exception as e:
                 print(f"❌ Erro ao enviar dashboard de config: {e}")
     
@@ -505,11 +454,11 @@ class Dashboards(commands.Cog):
         try:
             guild = interaction.guild
             
-            for ch in guild.channels:
-                if "relatorio" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                    await self._enviar_dashboard_relatorios(ch)
-                    await interaction.response.send_message("✅ Dashboard de relatórios enviado!", ephemeral=True)
-                    return
+            ch = canais.canal(guild, "relatorio")
+            if ch:
+                await self._enviar_dashboard_relatorios(ch)
+                await interaction.response.send_message("✅ Dashboard de relatórios enviado!", ephemeral=True)
+                return
             
             await interaction.response.send_message("❌ Canal de relatórios não encontrado!", ephemeral=True)
         except Exception as e:
@@ -522,11 +471,11 @@ class Dashboards(commands.Cog):
         try:
             guild = interaction.guild
             
-            for ch in guild.channels:
-                if "config" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                    await self._enviar_dashboard_config(ch)
-                    await interaction.response.send_message("✅ Dashboard de config enviado!", ephemeral=True)
-                    return
+            ch = canais.canal(guild, "config")
+            if ch:
+                await self._enviar_dashboard_config(ch)
+                await interaction.response.send_message("✅ Dashboard de config enviado!", ephemeral=True)
+                return
             
             await interaction.response.send_message("❌ Canal de config não encontrado!", ephemeral=True)
         except Exception as e:
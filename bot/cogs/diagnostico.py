@@ -0,0 +1,106 @@
+"""
+Cog: Diagnóstico
+Métricas internas do bot (pool do banco, fila de envios ao Discord) para admins
+"""
+import discord
+from discord import app_commands
+from discord.ext import commands
+from bot.database import db
+from bot.utils.outbound import outbound
+
+class Diagnostico(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        print("✅ Cog Diagnóstico carregado")
+    
+    @app_commands.command(name="diagnostico", description="Mostra métricas internas do bot")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def diagnostico(self, interaction: discord.Interaction):
+        """Pool de conexões, instruções SQL, fila de envios e cache de configurações"""
+        embed = discord.Embed(title="🩺 DIAGNÓSTICO", color=0x3498DB)
+        
+        pool = db.pool_stats()
+        embed.add_field(
+            name="🗄️ Pool do banco",
+            value="\n".join(f"`{chave}`: {valor}" for chave, valor in pool.items()),
+            inline=True
+        )
+        
+        envios = outbound.metricas()
+        embed.add_field(
+            name="📤 Envios ao Discord",
+            value="\n".join(
+                f"`{chave}`: {valor:.1f}" if isinstance(valor, float) else f"`{chave}`: {valor}"
+                for chave, valor in envios.items()
+            ),
+            inline=True
+        )
+        
+        instrucoes = db.sql_stats()
+        embed.add_field(
+            name="🧮 Instruções SQL",
+            value="\n".join(
+                f"`{chave}`: {valor:.1%}" if chave == "reuso" else f"`{chave}`: {valor}"
+                for chave, valor in instrucoes.items()
+            ),
+            inline=True
+        )
+        
+        configs = db.config_cache_stats()
+        embed.add_field(
+            name="⚙️ Cache de configurações",
+            value="\n".join(
+                f"`{chave}`: {valor:.1%}" if chave == "hit_rate" else f"`{chave}`: {valor}"
+                for chave, valor in configs.items()
+            ),
+            inline=True
+        )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="queries_top", description="Queries do banco com maior tempo total (latência p50/p95/p99)")
+    @app_commands.describe(
+        quantidade="Quantas queries mostrar",
+        ordem="Critério de ordenação",
+        zerar="Zera as medições depois de mostrar"
+    )
+    @app_commands.choices(ordem=[
+        app_commands.Choice(name="Tempo total", value="total_ms"),
+        app_commands.Choice(name="p95", value="p95_ms"),
+        app_commands.Choice(name="Execuções", value="contagem"),
+    ])
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def queries_top(self, interaction: discord.Interaction, quantidade: app_commands.Range[int, 1, 25] = 10,
+                          ordem: str = "total_ms", zerar: bool = False):
+        """Top-N impressões digitais de SQL desde o início (ou desde o último zerar)"""
+        top = db.sql_top(quantidade, ordem)
+        if zerar:
+            db.zerar_latencias_sql()
+        if not top:
+            await interaction.response.send_message("📭 Nenhuma query medida ainda.", ephemeral=True)
+            return
+        
+        embed = discord.Embed(title=f"🐢 TOP {len(top)} QUERIES", color=0x3498DB)
+        for i, item in enumerate(top, 1):
+            valor = (
+                f"`{item['contagem']}x` • total `{item['total_ms']:.0f} ms` • média `{item['media_ms']:.1f} ms`\n"
+                f"p50 `{item['p50_ms']:.1f}` • p95 `{item['p95_ms']:.1f}` • p99 `{item['p99_ms']:.1f}` • máx `{item['max_ms']:.1f}` ms"
+            )
+            if item["erros"]:
+                valor += f" • ❌ {item['erros']} erro(s)"
+            valor += f"\n```sql\n{item['digital'][:500]}```"
+            if item["plano"]:
+                valor += f"```{item['plano'][:1024 - len(valor) - 10]}```"
+            embed.add_field(name=f"#{i}", value=valor[:1024], inline=False)
+        if zerar:
+            embed.set_footer(text="Medições zeradas")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Diagnostico(bot))
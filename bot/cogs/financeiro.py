@@ -8,125 +8,43 @@ from discord import app_commands
 import sqlite3
 from datetime import datetime
 import asyncio
-from bot.database import db
+from bot.database import db, adb
 from bot.config import GUILD_ID
+from bot.utils.channels import canais
+from bot.utils.buttons import ViewPaginacao
+from bot.utils.log import get_logger
+
+log = get_logger(__name__)
+
+ERRO_TRANSACAO = "❌ Erro ao registrar a transação. Nada foi alterado, tente novamente."
 
 class Financeiro(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.guild_id = GUILD_ID
         self.dashboard_enviado = False
-        self._init_tabelas()
     
-    def _init_tabelas(self):
-        """Inicializa tabelas de financeiro se não existirem"""
+    def _adicionar_transacao(self, tipo, valor, descricao="", motivo="", autor_id=0, exigir_saldo=False):
+        """
+        Lança a transação no livro-caixa (saldo atualizado atomicamente no banco).
+        Devolve o saldo atualizado, ou None se `exigir_saldo` e o saldo não cobrir; erro do banco é relançado.
+        """
         try:
-            conn = db.get_connection()
-            cursor = db.get_wrapped_cursor(conn)
-            
-            # Usa tipo diferente para Postgres e SQLite
-            if db.use_postgres:
-                id_tipo = "SERIAL PRIMARY KEY"
-            else:
-                id_tipo = "INTEGER PRIMARY KEY AUTOINCREMENT"
-            
-            # Tabela de transações financeiras
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS financeiro_transacoes (
-                    id {id_tipo},
-                    tipo TEXT,
-                    descricao TEXT,
-                    valor REAL,
-                    motivo TEXT,
-                    autor_id INTEGER,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Tabela de saldo
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS financeiro_saldo (
-                    id INTEGER PRIMARY KEY,
-                    saldo_total REAL DEFAULT 0,
-                    saldo_entrada REAL DEFAULT 0,
-                    saldo_saida REAL DEFAULT 0,
-                    ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Inicializa saldo se não existir
-            cursor.execute("SELECT * FROM financeiro_saldo WHERE id = 1")
-            if not cursor.fetchone():
-                cursor.execute("""
-                    INSERT INTO financeiro_saldo (id, saldo_total, saldo_entrada, saldo_saida)
-                    VALUES (1, 0, 0, 0)
-                """)
-            
-            conn.commit()
-            conn.close()
-            print("✅ Tabelas de financeiro inicializadas")
-        except Exception as e:
-            print(f"❌ Erro ao inicializar tabelas: {e}")
-    
-    def _adicionar_transacao(self, tipo, valor, descricao="", motivo="", autor_id=0):
-        """Adiciona uma transação e atualiza saldo"""
-        try:
-            conn = db.get_connection()
-            cursor = db.get_wrapped_cursor(conn)
-            
-            # Adiciona transação
-            cursor.execute("""
-                INSERT INTO financeiro_transacoes 
-                (tipo, valor, descricao, motivo, autor_id)
-                VALUES (?, ?, ?, ?, ?)
-            """, (tipo, valor, descricao, motivo, autor_id))
-            
-            # Busca saldo atual
-            cursor.execute("SELECT * FROM financeiro_saldo WHERE id = 1")
-            saldo_data = cursor.fetchone()
-            saldo_total = saldo_data[1] if saldo_data else 0
-            entrada = saldo_data[2] if saldo_data else 0
-            saida = saldo_data[3] if saldo_data else 0
-            
-            # Atualiza saldo
-            if tipo == "ENTRADA":
-                novo_total = saldo_total + valor
-                nova_entrada = entrada + valor
-                nova_saida = saida
-            else:  # SAIDA
-                novo_total = saldo_total - valor
-                nova_entrada = entrada
-                nova_saida = saida + valor
-            
-            cursor.execute("""
-                UPDATE financeiro_saldo 
-                SET saldo_total = ?, saldo_entrada = ?, saldo_saida = ?,
-                    ultima_atualizacao = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, (novo_total, nova_entrada, nova_saida))
-            
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            print(f"❌ Erro ao adicionar transação: {e}")
-            return False
+            return db.create_transacao_financeira(tipo, valor, descricao, motivo, autor_id, exigir_saldo=exigir_saldo)
+        except Exception:
+            log.exception("❌ Erro ao adicionar transação (%s de R$ %.2f)", tipo, valor)
+            raise
     
     def _get_saldo(self):
         """Retorna saldo atual"""
         try:
-            conn = db.get_connection()
-            cursor = db.get_wrapped_cursor(conn)
-            cursor.execute("SELECT * FROM financeiro_saldo WHERE id = 1")
-            dados = cursor.fetchone()
-            conn.close()
-            
+            dados = db.get_saldo_financeiro()
             if dados:
                 return {
-                    'total': dados[1],
-                    'entrada': dados[2],
-                    'saida': dados[3],
-                    'ultima_atualizacao': dados[4]
+                    'total': dados['saldo_total'],
+                    'entrada': dados['saldo_entrada'],
+                    'saida': dados['saldo_saida'],
+                    'ultima_atualizacao': dados['ultima_atualizacao']
                 }
             return {'total': 0, 'entrada': 0, 'saida': 0}
         except Exception as e:
@@ -136,17 +54,7 @@ class Financeiro(commands.Cog):
     def _get_historico(self, limite=10):
         """Retorna histórico de transações"""
         try:
-            conn = db.get_connection()
-            cursor = db.get_wrapped_cursor(conn)
-            
-            cursor.execute(f"""
-                SELECT * FROM financeiro_transacoes 
-                ORDER BY id DESC LIMIT {limite}
-            """)
-            
-            transacoes = cursor.fetchall()
-            conn.close()
-            return transacoes
+            return db.get_transacoes_financeiras(limite)
         except Exception as e:
             print(f"❌ Erro ao buscar histórico: {e}")
             return []
@@ -156,8 +64,8 @@ class Financeiro(commands.Cog):
     async def banco_dashboard(self, interaction: discord.Interaction):
         """Exibe dashboard financeiro"""
         
-        saldo = self._get_saldo()
-        historico = self._get_historico(5)
+        saldo = await adb.run_sync(self._get_saldo)
+        historico = await adb.run_sync(self._get_historico, 5)
         
         # Embed principal - Dashboard
         embed_main = discord.Embed(
@@ -244,7 +152,7 @@ class Financeiro(commands.Cog):
             await interaction.response.send_message("❌ Valor deve ser maior que zero!", ephemeral=True)
             return
         
-        saldo = self._get_saldo()
+        saldo = await adb.run_sync(self._get_saldo)
         
         if saldo['total'] < valor:
             await interaction.response.send_message(f"❌ Saldo insuficiente! Você tem R$ {saldo['total']:,.2f}", ephemeral=True)
@@ -264,17 +172,26 @@ class Financeiro(commands.Cog):
             async def on_submit(modal_self, modal_interaction: discord.Interaction):
                 motivo = str(modal_self.motivo_input)
                 
-                # Adiciona transação
-                cog_ref._adicionar_transacao(
-                    tipo="SAIDA",
-                    valor=valor,
-                    descricao=f"Retirada de R$ {valor:,.2f}",
-                    motivo=motivo,
-                    autor_id=modal_interaction.user.id
-                )
+                # Adiciona transação (recusada no banco se o saldo não cobrir)
+                try:
+                    lancada = await adb.run_sync(
+                        cog_ref._adicionar_transacao,
+                        tipo="SAIDA",
+                        valor=valor,
+                        descricao=f"Retirada de R$ {valor:,.2f}",
+                        motivo=motivo,
+                        autor_id=modal_interaction.user.id,
+                        exigir_saldo=True
+                    )
+                except Exception:
+                    await modal_interaction.response.send_message(ERRO_TRANSACAO, ephemeral=True)
+                    return
                 
                 # Novo saldo
-                novo_saldo = cog_ref._get_saldo()
+                novo_saldo = await adb.run_sync(cog_ref._get_saldo)
+                if lancada is None:
+                    await modal_interaction.response.send_message(f"❌ Saldo insuficiente! Você tem R$ {novo_saldo['total']:,.2f}", ephemeral=True)
+                    return
                 
                 # Embed de confirmação
                 embed_conf = discord.Embed(
@@ -291,18 +208,17 @@ class Financeiro(commands.Cog):
                 
                 # Envia para canal financeiro
                 guild = cog_ref.bot.get_guild(cog_ref.guild_id)
-                for ch in guild.channels:
-                    if ch.name == "financeiro":
-                        embed_log = discord.Embed(
-                            title="📊 RETIRADA REGISTRADA",
-                            description=f"Retirada de **R$ {valor:,.2f}**",
-                            color=0xE74C3C
-                        )
-                        embed_log.add_field(name="🎯 Motivo", value=motivo, inline=False)
-                        embed_log.add_field(name="👤 Por", value=modal_interaction.user.mention, inline=False)
-                        embed_log.add_field(name="💰 Saldo Atual", value=f"R$ {novo_saldo['total']:,.2f}", inline=False)
-                        await ch.send(embed=embed_log)
-                        break
+                ch = canais.canal(guild, "financeiro")
+                if ch:
+                    embed_log = discord.Embed(
+                        title="📊 RETIRADA REGISTRADA",
+                        description=f"Retirada de **R$ {valor:,.2f}**",
+                        color=0xE74C3C
+                    )
+                    embed_log.add_field(name="🎯 Motivo", value=motivo, inline=False)
+                    embed_log.add_field(name="👤 Por", value=modal_interaction.user.mention, inline=False)
+                    embed_log.add_field(name="💰 Saldo Atual", value=f"R$ {novo_saldo['total']:,.2f}", inline=False)
+                    await ch.send(embed=embed_log)
         
         modal = MotivModal()
         await interaction.response.send_modal(modal)
@@ -317,15 +233,20 @@ class Financeiro(commands.Cog):
             await interaction.response.send_message("❌ Valor deve ser maior que zero!", ephemeral=True)
             return
         
-        self._adicionar_transacao(
-            tipo="ENTRADA",
-            valor=valor,
-            descricao=f"Depósito de R$ {valor:,.2f}",
-            motivo=motivo,
-            autor_id=interaction.user.id
-        )
+        try:
+            await adb.run_sync(
+                self._adicionar_transacao,
+                tipo="ENTRADA",
+                valor=valor,
+                descricao=f"Depósito de R$ {valor:,.2f}",
+                motivo=motivo,
+                autor_id=interaction.user.id
+            )
+        except Exception:
+            await interaction.response.send_message(ERRO_TRANSACAO, ephemeral=True)
+            return
         
-        novo_saldo = self._get_saldo()
+        novo_saldo = await adb.run_sync(self._get_saldo)
         
         # Embed de confirmação
         embed_conf = discord.Embed(
@@ -342,55 +263,107 @@ class Financeiro(commands.Cog):
         
         # Envia para canal financeiro
         guild = self.bot.get_guild(self.guild_id)
-        for ch in guild.channels:
-            if ch.name == "financeiro":
-                embed_log = discord.Embed(
-                    title="📊 DEPÓSITO REGISTRADO",
-                    description=f"Depósito de **R$ {valor:,.2f}**",
-                    color=0x2ECC71
+        ch = canais.canal(guild, "financeiro")
+        if ch:
+            embed_log = discord.Embed(
+                title="📊 DEPÓSITO REGISTRADO",
+                description=f"Depósito de **R$ {valor:,.2f}**",
+                color=0x2ECC71
+            )
+            embed_log.add_field(name="🎯 Motivo", value=motivo, inline=False)
+            embed_log.add_field(name="👤 Por", value=interaction.user.mention, inline=False)
+            embed_log.add_field(name="💰 Saldo Atual", value=f"R$ {novo_saldo['total']:,.2f}", inline=False)
+            await ch.send(embed=embed_log)
+    
+    async def _historico_paginado(self, por_pagina=10):
+        """View + embed da primeira página do histórico (None se não houver transações)"""
+        por_pagina = max(1, min(por_pagina, 25))  # limite de campos por embed
+        saldo = await adb.run_sync(self._get_saldo)
+        
+        async def buscar_pagina(antes=None, depois=None):
+            return await adb.get_transacoes_financeiras_pagina(antes=antes, depois=depois, limite=por_pagina)
+        
+        def montar_embed(pagina, numero):
+            embed = discord.Embed(
+                title="📜 HISTÓRICO FINANCEIRO COMPLETO",
+                description=f"Página {numero} - {len(pagina['itens'])} transações",
+                color=0x9B59B6
+            )
+            
+            for trans in pagina['itens']:
+                tipo_emoji = "🟢 ENTRADA" if trans['tipo'] == "ENTRADA" else "🔴 SAÍDA"
+                valor = trans['valor']
+                desc = trans['descricao']
+                motivo = trans['motivo'] if trans['motivo'] else "N/A"
+                data = trans['data_criacao']
+                
+                embed.add_field(
+                    name=f"{tipo_emoji} - R$ {valor:,.2f}",
+                    value=f"**Descrição:** {desc}\n**Motivo:** {motivo}\n**Data:** {data}",
+                    inline=False
                 )
-                embed_log.add_field(name="🎯 Motivo", value=motivo, inline=False)
-                embed_log.add_field(name="👤 Por", value=interaction.user.mention, inline=False)
-                embed_log.add_field(name="💰 Saldo Atual", value=f"R$ {novo_saldo['total']:,.2f}", inline=False)
-                await ch.send(embed=embed_log)
-                break
+            
+            embed.set_footer(text=f"💰 Saldo Atual: R$ {saldo['total']:,.2f}")
+            return embed
+        
+        view = ViewPaginacao(buscar_pagina, montar_embed)
+        embed = await view.primeira_pagina()
+        if not view.pagina['itens']:
+            return None, None
+        return view, embed
     
     @app_commands.command(name="historico_financeiro", description="Mostra histórico de transações")
-    @app_commands.describe(limite="Número de transações a mostrar")
+    @app_commands.describe(limite="Transações por página (máx. 25)")
     @app_commands.guild_only()
     async def historico_financeiro(self, interaction: discord.Interaction, limite: int = 20):
-        """Mostra histórico completo de transações"""
+        """Mostra histórico completo de transações, paginado"""
         
-        historico = self._get_historico(limite)
+        view, embed = await self._historico_paginado(limite)
         
-        if not historico:
+        if not view:
             await interaction.response.send_message("📭 Nenhuma transação registrada", ephemeral=True)
             return
         
-        # Cria embeds pagináveis
+        await interaction.response.send_message(embed=embed, view=view)
+    
+    @app_commands.command(name="reconciliar_financeiro", description="Recalcula o saldo a partir das transações e mostra divergências")
+    @app_commands.describe(corrigir="Grava o saldo recalculado se houver divergência")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guild_only()
+    async def reconciliar_financeiro(self, interaction: discord.Interaction, corrigir: bool = False):
+        """Compara o saldo materializado com a soma de financeiro_transacoes"""
+        
+        await interaction.response.defer(ephemeral=True)
+        resultado = await adb.reconciliar_financeiro(corrigir=corrigir)
+        
+        diferenca = resultado['diferenca']
+        divergente = any(abs(valor) >= 0.01 for valor in diferenca.values())
+        
         embed = discord.Embed(
-            title="📜 HISTÓRICO FINANCEIRO COMPLETO",
-            description=f"Últimas {len(historico)} transações",
-            color=0x9B59B6
+            title="🧮 RECONCILIAÇÃO FINANCEIRA",
+            description=f"{resultado['lancamentos']} lançamentos somados",
+            color=0xE74C3C if divergente else 0x2ECC71
         )
-        
-        for trans in historico:
-            tipo_emoji = "🟢 ENTRADA" if trans['tipo'] == "ENTRADA" else "🔴 SAÍDA"
-            valor = trans['valor']
-            desc = trans['descricao']
-            motivo = trans['motivo'] if trans['motivo'] else "N/A"
-            data = trans['data_criacao']
-            
+        for chave, nome in (('total', '💰 Saldo'), ('entrada', '📈 Entradas'), ('saida', '📉 Saídas')):
             embed.add_field(
-                name=f"{tipo_emoji} - R$ {valor:,.2f}",
-                value=f"**Descrição:** {desc}\n**Motivo:** {motivo}\n**Data:** {data}",
-                inline=False
+                name=nome,
+                value=(
+                    f"Registrado: R$ {resultado['registrado'][chave]:,.2f}\n"
+                    f"Calculado: R$ {resultado['calculado'][chave]:,.2f}\n"
+                    f"Diferença: R$ {diferenca[chave]:+,.2f}"
+                ),
+                inline=True
             )
         
-        saldo = self._get_saldo()
-        embed.set_footer(text=f"💰 Saldo Atual: R$ {saldo['total']:,.2f}")
+        if not divergente:
+            embed.set_footer(text="✅ Saldo confere com as transações")
+        elif corrigir:
+            embed.set_footer(text="🔧 Saldo corrigido para o valor calculado")
+        else:
+            embed.set_footer(text="⚠️ Use corrigir:True para gravar o saldo calculado")
         
-        await interaction.response.send_message(embed=embed)
+        print(f"🧮 Reconciliação financeira: diferença {diferenca} (corrigir={corrigir})")
+        await interaction.followup.send(embed=embed, ephemeral=True)
     
     @app_commands.command(name="enviar_banco", description="Envia dashboard do banco ao canal financeiro")
     @app_commands.guild_only()
@@ -400,11 +373,7 @@ class Financeiro(commands.Cog):
             guild = interaction.guild
             
             # Encontra o canal financeiro (com qualquer nome que contenha financeiro)
-            canal_financeiro = None
-            for ch in guild.channels:
-                if "financeiro" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                    canal_financeiro = ch
-                    break
+            canal_financeiro = canais.canal(guild, "financeiro")
             
             if not canal_financeiro:
                 await interaction.response.send_message("❌ Canal 'financeiro' não encontrado!", ephemeral=True)
@@ -435,16 +404,14 @@ class Financeiro(commands.Cog):
                     return
                 
                 print(f"✅ Guild encontrada: {guild.name}")
-                print(f"📋 Canais disponíveis: {[ch.name for ch in guild.channels]}")
                 
-                for ch in guild.channels:
-                    # Procura por qualquer canal que contenha "financeiro"
-                    if "financeiro" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                        print(f"📨 Enviando dashboard para {ch.name}...")
-                        await self._enviar_dashboard(ch)
-                        self.dashboard_enviado = True
-                        print("✅ Dashboard financeiro enviado com sucesso!")
-                        break
+                # Qualquer canal que contenha "financeiro"
+                ch = canais.canal(guild, "financeiro")
+                if ch:
+                    print(f"📨 Enviando dashboard para {ch.name}...")
+                    await self._enviar_dashboard(ch)
+                    self.dashboard_enviado = True
+                    print("✅ Dashboard financeiro enviado com sucesso!")
                 else:
                     print("❌ Canal financeiro não encontrado!")
                     
@@ -457,8 +424,8 @@ class Financeiro(commands.Cog):
     async def _enviar_dashboard(self, canal):
         """Envia dashboard com botões para o canal de financeiro"""
         
-        saldo = self._get_saldo()
-        historico = self._get_historico(5)
+        saldo = await adb.run_sync(self._get_saldo)
+        historico = await adb.run_sync(self._get_historico, 5)
         
         # Embed principal - Dashboard
         embed_main = discord.Embed(
@@ -565,31 +532,13 @@ class Financeiro(commands.Cog):
         )
         
         async def historico_callback(interaction: discord.Interaction):
-            historico = self._get_historico(20)
-            saldo = self._get_saldo()
-            
-            embed = discord.Embed(
-                title="📜 HISTÓRICO FINANCEIRO",
-                description=f"Últimas {len(historico)} transações",
-                color=0x9B59B6
-            )
-            
-            for trans in historico:
-                tipo_emoji = "🟢 ENTRADA" if trans['tipo'] == "ENTRADA" else "🔴 SAÍDA"
-                valor = trans['valor']
-                desc = trans['descricao']
-                motivo = trans['motivo'] if trans['motivo'] else "N/A"
-                data = trans['data_criacao']
-                
-                embed.add_field(
-                    name=f"{tipo_emoji} - R$ {valor:,.2f}",
-                    value=f"**Descrição:** {desc}\n**Motivo:** {motivo}\n**Data:** {data}",
-                    inline=False
-                )
+            view_historico, embed = await self._historico_paginado(20)
             
-            embed.set_footer(text=f"💰 Saldo Atual: R$ {saldo['total']:,.2f}")
+            if not view_historico:
+                await interaction.response.send_message("📭 Nenhuma transação registrada", ephemeral=True)
+                return
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=embed, view=view_historico, ephemeral=True)
         
         btn_historico.callback = historico_callback
         view.add_item(btn_historico)
@@ -641,15 +590,20 @@ class Financeiro(commands.Cog):
                         return
                     
                     # Adiciona transação
-                    self._adicionar_transacao(
-                        tipo="ENTRADA",
-                        valor=valor,
-                        descricao=f"Depósito de R$ {valor:,.2f}",
-                        motivo=motivo,
-                        autor_id=modal_interaction.user.id
-                    )
+                    try:
+                        await adb.run_sync(
+                            self._adicionar_transacao,
+                            tipo="ENTRADA",
+                            valor=valor,
+                            descricao=f"Depósito de R$ {valor:,.2f}",
+                            motivo=motivo,
+                            autor_id=modal_interaction.user.id
+                        )
+                    except Exception:
+                        await modal_interaction.response.send_message(ERRO_TRANSACAO, ephemeral=True)
+                        return
                     
-                    novo_saldo = self._get_saldo()
+                    novo_saldo = await adb.run_sync(self._get_saldo)
                     
                     # Embed de confirmação
                     embed_conf = discord.Embed(
@@ -693,21 +647,25 @@ class Financeiro(commands.Cog):
                         await modal_interaction.response.send_message("❌ Valor deve ser maior que zero!", ephemeral=True)
                         return
                     
-                    saldo = self._get_saldo()
-                    if saldo['total'] < valor:
-                        await modal_interaction.response.send_message(f"❌ Saldo insuficiente! Você tem R$ {saldo['total']:,.2f}", ephemeral=True)
+                    # Adiciona transação (recusada no banco se o saldo não cobrir)
+                    try:
+                        lancada = await adb.run_sync(
+                            self._adicionar_transacao,
+                            tipo="SAIDA",
+                            valor=valor,
+                            descricao=f"Retirada de R$ {valor:,.2f}",
+                            motivo=motivo,
+                            autor_id=modal_interaction.user.id,
+                            exigir_saldo=True
+                        )
+                    except Exception:
+                        await modal_interaction.response.send_message(ERRO_TRANSACAO, ephemeral=True)
                         return
                     
-                    # Adiciona transação
-                    self._adicionar_transacao(
-                        tipo="SAIDA",
-                        valor=valor,
-                        descricao=f"Retirada de R$ {valor:,.2f}",
-                        motivo=motivo,
-                        autor_id=modal_interaction.user.id
-                    )
-                    
-                    novo_saldo = self._get_saldo()
+                    novo_saldo = await adb.run_sync(self._get_saldo)
+                    if lancada is None:
+                        await modal_interaction.response.send_message(f"❌ Saldo insuficiente! Você tem R$ {novo_saldo['total']:,.2f}", ephemeral=True)
+                        return
                     
                     # Embed de confirmação
                     embed_conf = discord.Embed(
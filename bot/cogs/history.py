@@ -1,39 +1,55 @@
 """
 Cog: Histórico Público
 """
+import asyncio
+from collections import deque
 import discord
 from discord.ext import commands
-from bot.database import db
-from bot.config import STATUS
+from bot.database import adb
+from bot.config import STATUS, HISTORICO_PUBLICO_MAX, HISTORICO_PUBLICO_LOTE
 from bot.utils.embeds import criar_embed_log_publico
+from bot.utils.channels import canais
+from bot.utils.outbound import outbound, PRIORIDADE_LOG
+from bot.utils.validators import gerar_valor_aproximado
+from bot.utils.log import get_logger
+
+log = get_logger(__name__)
 
 class HistoryCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # IDs das mensagens publicadas no histórico, da mais antiga para a mais nova
+        self.mensagens = deque()
+        self._lock = asyncio.Lock()
+    
+    async def cog_load(self):
+        # O canal guarda até MAX + LOTE - 1 mensagens: carrega todas para poder apagá-las depois
+        self.mensagens.extend(await adb.get_log_message_ids(HISTORICO_PUBLICO_MAX + HISTORICO_PUBLICO_LOTE))
+        # Erros de slash commands: o discord.py não despacha evento para listeners, só chama tree.on_error
+        self._on_error_anterior = self.bot.tree.on_error
+        self.bot.tree.on_error = self._erro_comando
+    
+    async def cog_unload(self):
+        self.bot.tree.on_error = self._on_error_anterior
     
     @commands.Cog.listener()
     async def on_ready(self):
-        print("✅ Cog History carregado")
+        log.info("✅ Cog History carregado")
     
-    @commands.Cog.listener()
-    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
-        """Registra erros públicos no histórico"""
-        
-        db.create_log_transporte(
-            0,
-            "ERRO",
-            f"Erro: {str(error)}"
-        )
+    async def _erro_comando(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        """Registra no log os erros dos slash commands"""
+        comando = interaction.command.qualified_name if interaction.command else "?"
+        log.error("❌ Erro no comando /%s (usuário %s)", comando, interaction.user.id, exc_info=error)
     
     async def registrar_entrega_publico(self, transporte_id: int):
         """Registra uma entrega no histórico público"""
         
         try:
-            transporte = db.get_transporte(transporte_id)
+            transporte = await adb.get_transporte(transporte_id)
             if not transporte:
                 return
             
-            guild_id = int(db.get_config("GUILD_ID") or 0)
+            guild_id = int(await adb.get_config("GUILD_ID") or 0)
             if not guild_id:
                 return
             
@@ -42,41 +58,72 @@ class HistoryCog(commands.Cog):
                 return
             
             # Busca canal de histórico
-            historico_channel_id = db.get_config("CANAL_HISTORICO")
-            if not historico_channel_id:
-                return
-            
-            historico_channel = guild.get_channel(int(historico_channel_id))
+            historico_channel = canais.canal(guild, "historico")
             if not historico_channel:
                 return
             
             # Cria embed de log
+            origem = transporte['origem'] or 'Desconhecida'
+            destino = transporte['destino'] or 'Caerleon'
+            valor = gerar_valor_aproximado(transporte['valor_estimado'] or 0)
             embed = criar_embed_log_publico(
-                numero=transporte[1],
-                origem=transporte[4],
-                valor=transporte[7],
-                prioridade=transporte[6]
+                numero_ticket=transporte['numero_ticket'],
+                origem=origem,
+                destino=destino,
+                valor_aproximado=valor,
+                prioridade=transporte['prioridade']
             )
             
             # Envia para histórico público
-            msg = await historico_channel.send(embed=embed)
+            msg = await outbound.send(historico_channel, prioridade=PRIORIDADE_LOG, embed=embed)
             
-            # Armazena no banco
-            db.update_transporte(transporte_id, historico_message_id=msg.id)
+            # Grava o message_id antes de contar a mensagem no buffer: após um restart só o que está
+            # no banco é carregado (cog_load) e pode ser aparado
+            try:
+                anterior = await adb.registrar_log_transporte(
+                    transporte_id, origem, destino, valor, transporte['prioridade'], transporte['status'], str(msg.id)
+                )
+            except Exception:
+                log.exception("❌ Log da entrega #%s não gravado; publicação removida", transporte_id)
+                await self._apagar(historico_channel, [msg.id])
+                return
             
-            # Limpa mensagens antigas (mantém últimas 50)
-            async for msg in historico_channel.history(limit=100):
-                if msg.author == self.bot.user:
-                    # Conta mensagens de bot neste canal
-                    count = sum(1 for m in await historico_channel.history(limit=200) if m.author == self.bot.user)
-                    if count > 50:
-                        try:
-                            await msg.delete()
-                        except:
-                            pass
+            async with self._lock:
+                if anterior is not None:
+                    # Mesma entrega publicada de novo: a publicação anterior sai do canal
+                    if anterior in self.mensagens:
+                        self.mensagens.remove(anterior)
+                    await self._apagar(historico_channel, [anterior])
+                self.mensagens.append(msg.id)
+                await self._aparar(historico_channel)
+        
+        except Exception:
+            log.exception("❌ Erro ao registrar entrega pública #%s", transporte_id)
+    
+    async def _apagar(self, canal, message_ids):
+        """Apaga mensagens do canal (bulk delete até 100; uma a uma se o bulk falhar)"""
+        try:
+            # Uma chamada para até 100 mensagens (só aceita mensagens com menos de 14 dias)
+            await canal.delete_messages([discord.Object(id=message_id) for message_id in message_ids[:100]])
+            for message_id in message_ids[100:]:
+                await canal.get_partial_message(message_id).delete()
+        except discord.HTTPException:
+            for message_id in message_ids:
+                try:
+                    await canal.get_partial_message(message_id).delete()
+                except discord.HTTPException:
+                    pass  # já apagada
+    
+    async def _aparar(self, canal):
+        """Mantém as últimas HISTORICO_PUBLICO_MAX entregas; as excedentes saem juntas num bulk delete"""
+        excedentes = len(self.mensagens) - HISTORICO_PUBLICO_MAX
+        if excedentes < HISTORICO_PUBLICO_LOTE:
+            return
         
-        except Exception as e:
-            print(f"Erro ao registrar entrega pública: {e}")
+        antigas = [self.mensagens.popleft() for _ in range(excedentes)]
+        await self._apagar(canal, antigas)
+        await adb.clear_log_message_ids(antigas)
+        log.info("🧹 Histórico público: %s mensagens antigas removidas", len(antigas))
     
     @commands.command(name="log_entrega", hidden=True)
     @commands.is_owner()
@@ -7,105 +7,140 @@ from discord.ext import commands
 from pathlib import Path
 import sqlite3
 from datetime import datetime
-from bot.database import db
+from bot.database import adb
 from bot.config import GUILD_ID, STATUS, PIX_KEY, PIX_QRCODE_PATH
+from bot.utils.channels import canais, numero_ticket as numero_do_canal
+from bot.utils.outbound import outbound, PRIORIDADE_CLIENTE, PRIORIDADE_STAFF, PRIORIDADE_LOG
+from bot.utils.componentes import BotaoDinamico, RoteadorComponentes, view_estatica
+from bot.utils.validators import checar_cabecalho, analisar_comprovante
+from bot.utils.log import get_logger, vincular
+
+log = get_logger(__name__)
+
+# Botões do fluxo de pagamento/transporte: o custom_id leva o id do transporte
+BOTAO_APROVAR = BotaoDinamico("aprovar_pag_", "✅ Aprovar Pagamento", discord.ButtonStyle.success)
+BOTAO_REJEITAR = BotaoDinamico("rejeitar_pag_", "❌ Rejeitar (Enviar foto novamente)", discord.ButtonStyle.danger)
+BOTAO_CORRIGIR = BotaoDinamico("corrigir_pag_", "🔧 Corrigir (Valor Diferente)", discord.ButtonStyle.secondary)
+BOTAO_LIBERAR = BotaoDinamico("liberar_acesso_", "✅ Acesso Liberado", discord.ButtonStyle.success)
+BOTAO_DEPOSITO = BotaoDinamico("confirmar_deposito_", "✅ Confirmar Depósito de Items", discord.ButtonStyle.success)
+BOTAO_INICIAR = BotaoDinamico("iniciar_transporte_", "🚚 Iniciar Transporte", discord.ButtonStyle.primary)
+BOTAO_CONFIRMAR_TRANSPORTE = BotaoDinamico("confirmar_transporte_", "✅ Transporte Confirmado", discord.ButtonStyle.success)
+BOTAO_RETIRADA = BotaoDinamico("confirmar_retirada_", "✅ Confirmar Retirada", discord.ButtonStyle.success)
 
 class PaymentVerification(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.guild_id = GUILD_ID
-        self.aguardando_foto_deposito = {}
         
+        # Todos os handlers recebem (interaction, transporte, numero_ticket, canal_ticket)
+        self.botoes = RoteadorComponentes()
+        self.botoes.registrar(BOTAO_APROVAR, self._aprovar_pagamento)
+        self.botoes.registrar(BOTAO_REJEITAR, self._rejeitar_pagamento)
+        self.botoes.registrar(BOTAO_CORRIGIR, self._corrigir_pagamento)
+        self.botoes.registrar(BOTAO_LIBERAR, self._liberar_acesso_ilha)
+        self.botoes.registrar(BOTAO_DEPOSITO, self._confirmar_deposito)
+        self.botoes.registrar(BOTAO_INICIAR, self._iniciar_transporte)
+        self.botoes.registrar(BOTAO_CONFIRMAR_TRANSPORTE, self._confirmar_transporte)
+        self.botoes.registrar(BOTAO_RETIRADA, self._confirmar_retirada)
+    
     @commands.Cog.listener()
-    async def on_message(self, message):
-        """Escuta mensagens nos canais de ticket para comprovantes de PIX e fotos de depósito"""
-        
-        print(f"\n[LISTENER] Mensagem recebida")
-        print(f"   Canal: {message.channel.name}")
-        print(f"   Autor: {message.author.name}")
-        print(f"   Bot? {message.author == self.bot.user}")
-        print(f"   Anexos: {len(message.attachments) if message.attachments else 0}")
-        
-        # Ignora mensagens do bot
-        if message.author == self.bot.user:
-            print(f"   ↩️ Ignorando (é o bot)")
+    async def on_button_click(self, interaction):
+        """Despacha os botões do fluxo pelo custom_id (funciona também depois de reiniciar o bot)"""
+        rota = self.botoes.resolver(interaction.data.get("custom_id"))
+        if rota is None:
             return
+        handler, transporte_id = rota
         
-        # Verifica se é um canal de ticket
-        if not message.channel.name.startswith("ticket-"):
-            print(f"   ↩️ Ignorando (não é canal ticket)")
+        # Estado sempre lido do banco no clique, nunca guardado na view
+        vincular(transporte=transporte_id)
+        transporte = await adb.get_transporte(transporte_id)
+        if not transporte:
+            await interaction.response.send_message("❌ Transporte não encontrado", ephemeral=True)
             return
         
-        print(f"   ✅ É canal ticket")
-        
-        # Verifica se tem anexos (imagens)
-        if not message.attachments:
-            print(f"   ↩️ Ignorando (sem anexos)")
-            return
+        vincular(ticket=transporte['numero_ticket'])
+        try:
+            await handler(interaction, transporte, transporte['numero_ticket'], self._canal_ticket(transporte))
+        except Exception as e:
+            log.exception("❌ Erro no botão %s", interaction.data.get('custom_id'))
+    
+    def _canal_ticket(self, transporte):
+        """Canal do ticket do transporte (pelo id salvo; se não existir mais, pelo número)"""
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            return None
+        canal_id = str(transporte['ticket_channel_id'] or '')
+        canal = guild.get_channel(int(canal_id)) if canal_id.isdigit() else None
+        return canal or canais.ticket(guild, transporte['numero_ticket'])
         
-        print(f"   ✅ Tem {len(message.attachments)} anexo(s)")
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        """Escuta mensagens nos canais de ticket para comprovantes de PIX e fotos de depósito"""
         
-        # Extrai número do ticket
-        try:
-            numero_ticket = int(message.channel.name.split("-")[1])
-            print(f"   ✅ Número ticket extraído: {numero_ticket}")
-        except (IndexError, ValueError) as e:
-            print(f"   ❌ Erro ao extrair número: {e}")
+        # Filtros baratos primeiro: a grande maioria das mensagens para aqui, sem log nenhum
+        if message.author == self.bot.user or not message.attachments:
             return
         
-        # VERIFICA SE ESTÁ AGUARDANDO FOTO DE DEPÓSITO
-        if numero_ticket in self.aguardando_foto_deposito:
-            print(f"   📸 [FOTO_DEPOSITO] Detectada foto de depósito!")
-            await self._processar_foto_deposito(message, numero_ticket)
+        # Verifica se é um canal de ticket (ticket-1001 ou ticket-transport-1001)
+        nome_canal = getattr(message.channel, "name", "")
+        if not nome_canal.startswith("ticket-"):
+            return
+        numero_ticket = numero_do_canal(nome_canal)
+        if numero_ticket is None:
+            log.debug("Canal de ticket sem número reconhecível: %s", nome_canal)
             return
         
-        # CASO CONTRÁRIO, PROCESSA COMPROVANTE DE PAGAMENTO
-        print(f"\n📸 [COMPROVANTE] Iniciando processamento ticket-{numero_ticket}")
-        print(f"   Autor: {message.author.name} (ID: {message.author.id})")
-        print(f"   Anexos: {len(message.attachments)}")
+        vincular(ticket=numero_ticket, mensagem=message.id, usuario=message.author.id)
+        log.debug("Mensagem com %d anexo(s) em %s", len(message.attachments), nome_canal)
         
-        # Busca o transporte
+        # Busca o transporte (com o discord_id do cliente)
         try:
-            print(f"   ⏳ Buscando transporte no banco...")
-            transporte = db._execute("""
-                SELECT * FROM transportes 
-                WHERE numero_ticket = ? 
-                ORDER BY id DESC LIMIT 1
+            transporte = await adb._execute("""
+                SELECT transportes.*, clientes.discord_id AS cliente_discord_id FROM transportes
+                LEFT JOIN clientes ON clientes.id = transportes.cliente_id
+                WHERE transportes.numero_ticket = ? 
+                ORDER BY transportes.id DESC LIMIT 1
             """, (numero_ticket,), fetchone=True)
             
             if not transporte:
-                print(f"   ❌ Transporte NÃO encontrado no banco")
-                await message.reply(
-                    "❌ Ticket não encontrado no sistema",
+                log.warning("❌ Transporte NÃO encontrado no banco")
+                outbound.reply(
+                    message,
+                    content="❌ Ticket não encontrado no sistema",
                     mention_author=False
                 )
                 return
             
-            print(f"   ✅ Transporte encontrado:")
-            print(f"      ID: {transporte['id']}")
-            print(f"      Status: {transporte['status']}")
-            print(f"      Cliente ID: {transporte['cliente_id']}")
+            vincular(transporte=transporte['id'])
+            log.debug("Transporte encontrado: status %s, cliente %s", transporte['status'], transporte['cliente_id'])
             
         except Exception as e:
-            print(f"   ❌ Erro ao buscar no banco: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Erro ao buscar no banco")
+            return
+        
+        # PAGO = aguardando a foto do depósito (estado no banco: vale também depois de reiniciar o bot)
+        if transporte['status'] == STATUS["PAGO"]:
+            if str(message.author.id) == str(transporte['cliente_discord_id']):
+                await self._processar_foto_deposito(message, transporte)
             return
         
+        # CASO CONTRÁRIO, PROCESSA COMPROVANTE DE PAGAMENTO
+        log.debug("📸 [COMPROVANTE] %s enviou %d anexo(s)", message.author.name, len(message.attachments))
+        
         # Valida se está aguardando pagamento
         if transporte['status'] != STATUS["AGUARDANDO_PAGAMENTO"]:
-            print(f"   ⏭️ Status não é AGUARDANDO_PAGAMENTO (é: {transporte['status']})")
-            await message.reply(
-                f"⏭️ Este transporte não está aguardando pagamento (Status: {transporte['status']})",
+            log.debug("⏭️ Status não é AGUARDANDO_PAGAMENTO (é: %s)", transporte['status'])
+            outbound.reply(
+                message,
+                content=f"⏭️ Este transporte não está aguardando pagamento (Status: {transporte['status']})",
                 mention_author=False
             )
             return
         
-        print(f"   ✅ Status é AGUARDANDO_PAGAMENTO")
         
         # Processa cada anexo
         for anexo in message.attachments:
-            print(f"\n   📎 Processando anexo: {anexo.filename}")
+            log.debug("📎 Processando anexo: %s", anexo.filename)
             await self._processar_comprovante(
                 message, 
                 anexo, 
@@ -113,49 +148,57 @@ class PaymentVerification(commands.Cog):
                 numero_ticket
             )
         
-        print(f"✅ [COMPROVANTE] Processamento iniciado para {len(message.attachments)} anexo(s)\n")
+        log.info("✅ [COMPROVANTE] Processamento iniciado para %s anexo(s)", len(message.attachments))
     
     async def _processar_comprovante(self, message, anexo, transporte, numero_ticket):
         """Processa um comprovante de pagamento"""
         
-        print(f"      📎 [VERIFICAÇÃO] Processando: {anexo.filename}")
+        log.debug("📎 [VERIFICAÇÃO] Processando: %s", anexo.filename)
         
         try:
-            # Valida se é imagem
-            if not anexo.content_type or not anexo.content_type.startswith('image/'):
-                print(f"         ❌ Não é imagem: {anexo.content_type}")
-                await message.reply(
-                    "❌ **Erro:** Envie uma imagem do comprovante de PIX",
+            # Valida e calcula os hashes (no pool de imagens, fora do event loop)
+            hashes = await analisar_comprovante(anexo)
+            if not hashes:
+                log.warning("❌ Imagem inválida: %s (%s bytes)", anexo.content_type, anexo.size)
+                outbound.reply(
+                    message,
+                    content="❌ **Erro:** Envie uma imagem do comprovante de PIX (até 10MB)",
                     mention_author=False
                 )
                 return
             
-            print(f"         ✅ Imagem válida: {anexo.content_type}")
+            # Comprovante já usado em outro ticket? (consulta só os índices de hash)
+            sha256, dhash, dhash16 = hashes
+            similares = await adb.get_comprovantes_similares(sha256, dhash, dhash16, ignorar_transporte_id=transporte['id'])
+            # Só o mesmo arquivo (sha256) conta como reuso; hash perceptual próximo é apenas um aviso
+            repetidos = [(anterior, distancia) for anterior, distancia in similares if anterior['sha256'] == sha256]
+            parecidos = [(anterior, distancia) for anterior, distancia in similares if anterior['sha256'] != sha256]
+            if repetidos:
+                log.warning("🚨 Comprovante idêntico a %s já enviado(s)", len(repetidos))
+            
+            log.debug("✅ Imagem válida: %s", anexo.content_type)
             
             # Busca canal de análise de pagamentos
             guild = self.bot.get_guild(self.guild_id)
             if not guild:
-                print(f"         ❌ Guild não encontrada")
+                log.warning("❌ Guild não encontrada")
                 return
             
-            print(f"         ✅ Guild encontrada")
+            log.debug("✅ Guild encontrada")
             
             # Procura canal "analise-pagamentos" (pode ter emoji)
-            canal_analise = None
-            for ch in guild.channels:
-                if "analise-pagamentos" in ch.name:
-                    canal_analise = ch
-                    break
+            canal_analise = canais.canal(guild, "analise")
             
             if not canal_analise:
-                print(f"         ⚠️ Canal 'analise-pagamentos' não encontrado")
-                await message.reply(
-                    "⚠️ Canal de análise não configurado. Contate o staff!",
+                log.warning("⚠️ Canal 'analise-pagamentos' não encontrado")
+                outbound.reply(
+                    message,
+                    content="⚠️ Canal de análise não configurado. Contate o staff!",
                     mention_author=False
                 )
                 return
             
-            print(f"         ✅ Canal de análise encontrado: {canal_analise.name}")
+            log.debug("✅ Canal de análise encontrado: %s", canal_analise.name)
             
             # Cria embed para análise
             embed_analise = discord.Embed(
@@ -196,65 +239,55 @@ class PaymentVerification(commands.Cog):
             )
             embed_analise.add_field(
                 name="📎 Arquivo",
-                value=f"```{anexo.filename}```",
+                value=f"```{anexo.filename}```\n[Mensagem original]({message.jump_url})",
                 inline=False
             )
+            # Comprovante vai por referência (URL do anexo), sem baixar e reenviar os bytes
+            embed_analise.set_image(url=anexo.url)
+            if repetidos:
+                linhas = [
+                    f"Ticket #{anterior['numero_ticket']:04d} - idêntico - [ver]({anterior['mensagem_url']})"
+                    for anterior, _ in repetidos[:3]
+                ]
+                embed_analise.add_field(
+                    name="🚨 COMPROVANTE JÁ UTILIZADO",
+                    value="\n".join(linhas),
+                    inline=False
+                )
+                embed_analise.color = 0xE74C3C
+            if parecidos:
+                linhas = [
+                    f"Ticket #{anterior['numero_ticket']:04d} - parecido ({distancia} bits) - [ver]({anterior['mensagem_url']})"
+                    for anterior, distancia in parecidos[:3]
+                ]
+                embed_analise.add_field(
+                    name="🔎 Comprovante parecido (conferir valor e ID da transação)",
+                    value="\n".join(linhas),
+                    inline=False
+                )
             embed_analise.set_footer(text="⏳ Aguardando análise do Staff")
             
-            print(f"         ✅ Embed criado")
-            
-            # Cria view com botões de ação
-            view = discord.ui.View(timeout=None)
-            
-            # Botão APROVAR
-            btn_aprovar = discord.ui.Button(
-                label="✅ Aprovar Pagamento",
-                style=discord.ButtonStyle.success,
-                custom_id=f"aprovar_pag_{transporte['id']}"
-            )
-            
-            async def aprovar_callback(interaction):
-                await self._aprovar_pagamento(interaction, transporte, numero_ticket, message)
-            
-            btn_aprovar.callback = aprovar_callback
-            view.add_item(btn_aprovar)
-            
-            # Botão REJEITAR
-            btn_rejeitar = discord.ui.Button(
-                label="❌ Rejeitar (Enviar foto novamente)",
-                style=discord.ButtonStyle.danger,
-                custom_id=f"rejeitar_pag_{transporte['id']}"
-            )
-            
-            async def rejeitar_callback(interaction):
-                await self._rejeitar_pagamento(interaction, numero_ticket, message)
-            
-            btn_rejeitar.callback = rejeitar_callback
-            view.add_item(btn_rejeitar)
+            log.debug("✅ Embed criado")
             
-            # Botão CORRIGIR (valor diferente)
-            btn_corrigir = discord.ui.Button(
-                label="🔧 Corrigir (Valor Diferente)",
-                style=discord.ButtonStyle.secondary,
-                custom_id=f"corrigir_pag_{transporte['id']}"
+            # Botões de ação (tratados em on_button_click)
+            view = view_estatica(
+                BOTAO_APROVAR.item(transporte['id']),
+                BOTAO_REJEITAR.item(transporte['id']),
+                BOTAO_CORRIGIR.item(transporte['id']),
             )
             
-            async def corrigir_callback(interaction):
-                await self._corrigir_pagamento(interaction, numero_ticket, message)
-            
-            btn_corrigir.callback = corrigir_callback
-            view.add_item(btn_corrigir)
-            
-            print(f"         ✅ Botões criados")
+            log.debug("✅ Botões criados")
             
             # Envia para canal de análise com a imagem
-            print(f"         ✅ Enviando para análise...")
-            msg_analise = await canal_analise.send(embed=embed_analise, view=view)
-            print(f"         ✅ Embed enviado")
-            
-            # Também envia a imagem do comprovante
-            await canal_analise.send(file=await anexo.to_file())
-            print(f"         ✅ Imagem enviada")
+            log.debug("✅ Enviando para análise...")
+            msg_analise = await outbound.send(canal_analise, prioridade=PRIORIDADE_STAFF, embed=embed_analise, view=view)
+            log.debug("✅ Embed enviado com a imagem")
+            
+            # Registra o comprovante apontando para a análise (a mensagem do cliente pode ser apagada)
+            await adb.create_comprovante(
+                transporte['id'], transporte['numero_ticket'], sha256, dhash,
+                dhash16=dhash16, mensagem_url=msg_analise.jump_url
+            )
             
             # Responde ao cliente que recebeu
             embed_ok = discord.Embed(
@@ -269,63 +302,52 @@ class PaymentVerification(commands.Cog):
             )
             embed_ok.set_footer(text="⏳ Status: Aguardando análise")
             
-            await message.reply(embed=embed_ok, mention_author=False)
-            print(f"         ✅ Cliente notificado")
+            outbound.reply(message, embed=embed_ok, mention_author=False)
+            log.debug("✅ Cliente notificado")
             
-            print(f"✅ [VERIFICAÇÃO] Comprovante enviado para análise\n")
+            log.info("✅ [VERIFICAÇÃO] Comprovante enviado para análise")
             
         except Exception as e:
-            print(f"         ❌ Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Erro ao processar comprovante %s", anexo.filename)
             
-            try:
-                await message.reply(
-                    f"❌ Erro ao processar comprovante: {str(e)}",
-                    mention_author=False
-                )
-            except:
-                pass
+            outbound.reply(
+                message,
+                content=f"❌ Erro ao processar comprovante: {str(e)}",
+                mention_author=False
+            )
             return
     
-    async def _aprovar_pagamento(self, interaction, transporte, numero_ticket, msg_original):
+    async def _aprovar_pagamento(self, interaction, transporte, numero_ticket, canal_ticket):
         """Aprova o pagamento e inicia fluxo de acesso"""
         
-        print(f"\n✅ [APROVAR] Pagamento do ticket-{numero_ticket}")
+        log.info("✅ [APROVAR] Pagamento do ticket-%s aprovado por %s", numero_ticket, interaction.user.name)
         
         await interaction.response.defer()
         
-        # Atualiza status para PAGO
-        db.update_transporte_status(transporte['id'], STATUS["PAGO"])
+        # ===== STATUS PAGO + ENTRADA NO FINANCEIRO (uma transação) =====
+        # Os dois ou nenhum: um ticket PAGO sem a entrada deixaria o saldo errado.
+        # O status só muda se ainda estiver AGUARDANDO_PAGAMENTO: um segundo clique não lança a entrada de novo
+        taxa_final = float(transporte['taxa_final'])
+        try:
+            async with adb.transaction():
+                aprovado = await adb.update_transporte_status_se(
+                    transporte['id'], STATUS["PAGO"], STATUS["AGUARDANDO_PAGAMENTO"]
+                )
+                if aprovado:
+                    await adb.create_transacao_financeira(
+                        "ENTRADA", taxa_final, f"Transporte Ticket #{numero_ticket:04d}", f"Cliente: {transporte['cliente_id']}", 0
+                    )
+        except Exception:
+            log.exception("❌ Erro ao aprovar pagamento (status e financeiro desfeitos)")
+            await interaction.followup.send("❌ Erro ao registrar o pagamento. Nada foi alterado, tente novamente.", ephemeral=True)
+            return
         
-        print(f"   Status atualizado para: {STATUS['PAGO']}")
+        if not aprovado:
+            log.info("⚠️ [APROVAR] Ticket-%s já tinha sido processado; nada lançado", numero_ticket)
+            await interaction.followup.send(f"⚠️ O ticket #{numero_ticket:04d} já foi processado.", ephemeral=True)
+            return
         
-        # ===== ADICIONAR AO BANCO FINANCEIRO =====
-        try:
-            # Adiciona transação de entrada
-            taxa_final = float(transporte['taxa_final'])
-            db._execute("""
-                INSERT INTO financeiro_transacoes 
-                (tipo, valor, descricao, motivo, autor_id)
-                VALUES (?, ?, ?, ?, ?)
-            """, ("ENTRADA", taxa_final, f"Transporte Ticket #{numero_ticket:04d}", f"Cliente: {transporte['cliente_id']}", 0), commit=True)
-            
-            # Atualiza saldo
-            saldo_data = db._execute("SELECT * FROM financeiro_saldo WHERE id = 1", fetchone=True)
-            saldo_total = (saldo_data[1] if saldo_data else 0) + taxa_final
-            entrada = (saldo_data[2] if saldo_data else 0) + taxa_final
-            saida = saldo_data[3] if saldo_data else 0
-            
-            db._execute("""
-                UPDATE financeiro_saldo 
-                SET saldo_total = ?, saldo_entrada = ?, 
-                    ultima_atualizacao = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, (saldo_total, entrada), commit=True)
-            
-            print(f"   💰 Entrada registrada no banco: R$ {taxa_final:.2f}")
-        except Exception as e:
-            print(f"   ⚠️ Erro ao registrar no banco: {e}")
+        log.debug("Status atualizado para: %s; 💰 entrada registrada: R$ %.2f", STATUS['PAGO'], taxa_final)
         
         # Busca dados do cliente
         notas = transporte['notas'] or ''
@@ -338,13 +360,6 @@ class PaymentVerification(commands.Cog):
         # ===== PASSO 1: Enviar para Staff liberar acesso =====
         guild = self.bot.get_guild(self.guild_id)
         
-        # Busca canal do ticket
-        canal_ticket = None
-        for ch in guild.channels:
-            if ch.name == f"ticket-{numero_ticket}":
-                canal_ticket = ch
-                break
-        
         # Notifica cliente que foi aprovado
         if canal_ticket:
             embed_aprovado = discord.Embed(
@@ -360,12 +375,14 @@ class PaymentVerification(commands.Cog):
             embed_aprovado.set_footer(text="🎯 WHADAWEL™ | Transportes Seguros")
             
             try:
-                cliente_row = db._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
+                cliente_row = await adb._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
                 discord_id = int(cliente_row['discord_id']) if cliente_row else transporte['cliente_id']
             except:
                 discord_id = transporte['cliente_id']
             
-            await canal_ticket.send(
+            outbound.send(
+                canal_ticket,
+                prioridade=PRIORIDADE_CLIENTE,
                 content=f"<@{discord_id}>",
                 embed=embed_aprovado
             )
@@ -394,30 +411,14 @@ class PaymentVerification(commands.Cog):
         embed_acesso.set_footer(text="Ticket #{:04d}".format(numero_ticket))
         
         # View com botão para liberar acesso
-        view_acesso = discord.ui.View(timeout=None)
-        
-        btn_liberar = discord.ui.Button(
-            label="✅ Acesso Liberado",
-            style=discord.ButtonStyle.success,
-            custom_id=f"liberar_acesso_{transporte['id']}"
-        )
-        
-        async def liberar_callback(inter):
-            await self._liberar_acesso_ilha(inter, transporte, numero_ticket, canal_ticket)
-        
-        btn_liberar.callback = liberar_callback
-        view_acesso.add_item(btn_liberar)
+        view_acesso = view_estatica(BOTAO_LIBERAR.item(transporte['id']))
         
         # Procura canal staff
-        canal_staff = None
-        for ch in guild.channels:
-            if "painel-staff" in ch.name:
-                canal_staff = ch
-                break
+        canal_staff = canais.canal(guild, "painel_staff")
         
         if canal_staff:
-            await canal_staff.send(embed=embed_acesso, view=view_acesso)
-            print(f"   ✅ Enviado para staff liberar acesso")
+            outbound.send(canal_staff, prioridade=PRIORIDADE_STAFF, embed=embed_acesso, view=view_acesso)
+            log.debug("✅ Enviado para staff liberar acesso")
         
         # Confirma para o staff que aprovou
         embed_conf = discord.Embed(
@@ -428,30 +429,28 @@ class PaymentVerification(commands.Cog):
         
         await interaction.followup.send(embed=embed_conf, ephemeral=True)
         
-        # Edita mensagem original no canal de análise
+        # Edita mensagem original no canal de análise (já vem na interação, sem fetch)
         try:
-            msg_analise = await interaction.channel.fetch_message(
-                interaction.message.id
-            )
+            msg_analise = interaction.message
             embed_editado = msg_analise.embeds[0]
             embed_editado.color = 0x2ECC71
             embed_editado.set_footer(text="✅ APROVADO - Aguardando acesso à ilha")
-            await msg_analise.edit(embed=embed_editado, view=None)
+            outbound.edit(msg_analise, prioridade=PRIORIDADE_STAFF, embed=embed_editado, view=None)
         except:
             pass
         
-        print(f"✅ [APROVAR] Concluído\n")
+        log.debug("✅ [APROVAR] Concluído")
     
     async def _liberar_acesso_ilha(self, interaction, transporte, numero_ticket, canal_ticket):
         """Staff libera acesso à ilha - foto OPCIONAL no canal"""
         
-        print(f"\n🔓 [LIBERAR_ACESSO] Ticket-{numero_ticket}")
+        log.info("🔓 [LIBERAR_ACESSO] Ticket-%s", numero_ticket)
         
         await interaction.response.defer()
         
         # Busca dados do cliente
         try:
-            cliente_row = db._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
+            cliente_row = await adb._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
             discord_id = int(cliente_row['discord_id']) if cliente_row else transporte['cliente_id']
         except:
             discord_id = transporte['cliente_id']
@@ -470,23 +469,13 @@ class PaymentVerification(commands.Cog):
         embed_acesso_liberado.set_footer(text="🎯 WHADAWEL™ | Transporte em progresso")
         
         # Cria view com botão de confirmar depósito
-        view_deposito = discord.ui.View(timeout=None)
-        
-        btn_deposito = discord.ui.Button(
-            label="✅ Confirmar Depósito de Items",
-            style=discord.ButtonStyle.success,
-            custom_id=f"confirmar_deposito_{transporte['id']}"
-        )
-        
-        async def deposito_callback(dep_inter):
-            await self._confirmar_deposito(dep_inter, transporte, numero_ticket)
-        
-        btn_deposito.callback = deposito_callback
-        view_deposito.add_item(btn_deposito)
+        view_deposito = view_estatica(BOTAO_DEPOSITO.item(transporte['id']))
         
         # Envia para o cliente
         if canal_ticket:
-            await canal_ticket.send(
+            outbound.send(
+                canal_ticket,
+                prioridade=PRIORIDADE_CLIENTE,
                 content=f"<@{discord_id}>",
                 embed=embed_acesso_liberado,
                 view=view_deposito
@@ -500,45 +489,48 @@ class PaymentVerification(commands.Cog):
         )
         
         await interaction.followup.send(embed=embed_confirmado, ephemeral=True)
-        print(f"   ✅ Acesso liberado e cliente notificado\n")
+        log.debug("✅ Acesso liberado e cliente notificado")
     
     
-    async def _processar_foto_deposito(self, message, numero_ticket):
-        """Processa foto de depósito enviada no canal"""
+    async def _processar_foto_deposito(self, message, transporte):
+        """Processa foto de depósito enviada pelo cliente no canal (transporte em PAGO)"""
+        
+        numero_ticket = transporte['numero_ticket']
         
-        print(f"\n📸 [FOTO_DEPOSITO] Recebida em ticket-{numero_ticket}")
+        log.debug("📸 [FOTO_DEPOSITO] Recebida em ticket-%s", numero_ticket)
         
         # Valida se tem anexo
         if not message.attachments:
-            print(f"   ❌ Nenhum anexo encontrado")
+            log.warning("❌ Nenhum anexo encontrado")
             return
         
         anexo = message.attachments[0]
-        print(f"   Arquivo: {anexo.filename}")
-        
-        # Valida se é imagem
-        if not anexo.content_type or not anexo.content_type.startswith('image/'):
-            print(f"   ❌ Não é imagem: {anexo.content_type}")
-            await message.reply(
-                "❌ Arquivo inválido! Envie uma imagem (PNG, JPG, etc)",
+        log.debug("Arquivo: %s", anexo.filename)
+        
+        # Valida se é imagem (só metadados: a foto segue por URL)
+        if not checar_cabecalho(anexo):
+            log.warning("❌ Não é imagem: %s", anexo.content_type)
+            outbound.reply(
+                message,
+                content="❌ Arquivo inválido! Envie uma imagem (PNG, JPG, etc)",
                 mention_author=False
             )
             return
         
-        print(f"   ✅ Imagem válida: {anexo.content_type}")
+        log.debug("✅ Imagem válida: %s", anexo.content_type)
         
-        # Pega dados salvos
-        dados = self.aguardando_foto_deposito[numero_ticket]
-        transporte_id = dados['transporte_id']
-        taxa_final = dados['taxa_final']
-        prioridade = dados['prioridade']
+        transporte_id = transporte['id']
+        taxa_final = transporte['taxa_final']
+        prioridade = transporte['prioridade']
         
-        # Atualiza status
-        db.update_transporte_status(transporte_id, STATUS["DEPOSITADO"])
-        db.update_transporte(transporte_id, print_items_origem=anexo.url)
+        # Atualiza status (só a primeira foto conta: outra mensagem pode ter chegado antes)
+        if not await adb.update_transporte_status_se(transporte_id, STATUS["DEPOSITADO"], STATUS["PAGO"]):
+            log.debug("⏭️ Depósito do ticket-%s já confirmado", numero_ticket)
+            return
+        await adb.update_transporte(transporte_id, print_items_origem=anexo.url)
         
-        print(f"   ✅ Status atualizado para DEPOSITADO")
-        print(f"   ✅ Foto salva: {anexo.url[:50]}...")
+        log.debug("✅ Status atualizado para DEPOSITADO")
+        log.debug("✅ Foto salva: %s...", anexo.url[:50])
         
         # Confirma para cliente
         embed_confirmado = discord.Embed(
@@ -559,15 +551,11 @@ class PaymentVerification(commands.Cog):
         )
         embed_confirmado.set_footer(text="🎯 WHADAWEL™")
         
-        await message.reply(embed=embed_confirmado, mention_author=False)
+        outbound.reply(message, embed=embed_confirmado, mention_author=False)
         
         # ===== Enviar para fila de transporte =====
         guild = self.bot.get_guild(self.guild_id)
-        canal_fila = None
-        for ch in guild.channels:
-            if "historico" in ch.name:
-                canal_fila = ch
-                break
+        canal_fila = canais.canal(guild, "historico")
         
         if canal_fila:
             embed_fila = discord.Embed(
@@ -580,61 +568,28 @@ class PaymentVerification(commands.Cog):
             embed_fila.set_image(url=anexo.url)
             
             # View com botão para iniciar transporte
-            view_transporte = discord.ui.View(timeout=None)
-            
-            btn_iniciar = discord.ui.Button(
-                label="🚚 Iniciar Transporte",
-                style=discord.ButtonStyle.primary,
-                custom_id=f"iniciar_transporte_{transporte_id}"
-            )
-            
-            # Busca canal ticket
-            canal_ticket = message.channel
-            
-            async def iniciar_callback(init_inter):
-                # Busca dados completos do transporte
-                try:
-                    transporte_completo = db._execute("SELECT * FROM transportes WHERE id = ?", (transporte_id,), fetchone=True)
-                    
-                    if transporte_completo:
-                        await self._iniciar_transporte(init_inter, transporte_completo, numero_ticket, canal_ticket)
-                    else:
-                        await init_inter.response.defer()
-                        await init_inter.followup.send("❌ Transporte não encontrado", ephemeral=True)
-                except Exception as e:
-                    print(f"   ❌ Erro ao buscar transporte: {e}")
-                    await init_inter.response.defer()
-                    await init_inter.followup.send(f"❌ Erro: {e}", ephemeral=True)
-            
-            btn_iniciar.callback = iniciar_callback
-            view_transporte.add_item(btn_iniciar)
+            view_transporte = view_estatica(BOTAO_INICIAR.item(transporte_id))
             
-            await canal_fila.send(embed=embed_fila, view=view_transporte)
-            print(f"   ✅ Enviado para fila com foto")
+            outbound.send(canal_fila, prioridade=PRIORIDADE_STAFF, embed=embed_fila, view=view_transporte)
+            log.debug("✅ Enviado para fila com foto")
         
-        # Remove do dicionário aguardando
-        del self.aguardando_foto_deposito[numero_ticket]
-        print(f"✅ [FOTO_DEPOSITO] Processamento concluído\n")
+        log.info("✅ [FOTO_DEPOSITO] Processamento concluído")
 
-    async def _confirmar_deposito(self, interaction, transporte, numero_ticket):
+    async def _confirmar_deposito(self, interaction, transporte, numero_ticket, canal_ticket):
         """Cliente confirma depósito de items - deve enviar FOTO no canal"""
         
-        print(f"\n📦 [CONFIRMAR_DEPOSITO] Ticket-{numero_ticket}")
+        log.info("📦 [CONFIRMAR_DEPOSITO] Ticket-%s", numero_ticket)
         
         await interaction.response.defer()
         
-        # Busca canal ticket
-        guild = self.bot.get_guild(self.guild_id)
-        canal_ticket = None
-        for ch in guild.channels:
-            if ch.name == f"ticket-{numero_ticket}":
-                canal_ticket = ch
-                break
-        
         if not canal_ticket:
             await interaction.followup.send("❌ Canal do ticket não encontrado", ephemeral=True)
             return
         
+        if transporte['status'] != STATUS["PAGO"]:
+            await interaction.followup.send("⏭️ O depósito deste ticket já foi confirmado", ephemeral=True)
+            return
+        
         # Envia mensagem pedindo foto
         embed_pedir_foto = discord.Embed(
             title="📸 ENVIE FOTO DO DEPÓSITO",
@@ -653,33 +608,25 @@ class PaymentVerification(commands.Cog):
         )
         embed_pedir_foto.set_footer(text="🎯 WHADAWEL™ | Enviando arquivo...")
         
-        await canal_ticket.send(embed=embed_pedir_foto)
-        
-        # Salva estado temporário
-        self.aguardando_foto_deposito = getattr(self, 'aguardando_foto_deposito', {})
-        self.aguardando_foto_deposito[numero_ticket] = {
-            'transporte_id': transporte['id'],
-            'cliente_id': transporte['cliente_id'],
-            'taxa_final': transporte['taxa_final'],
-            'prioridade': transporte['prioridade']
-        }
+        outbound.send(canal_ticket, prioridade=PRIORIDADE_CLIENTE, embed=embed_pedir_foto)
         
+        # Sem estado em memória: a próxima foto do cliente com o transporte em PAGO é o depósito (on_message)
         await interaction.followup.send(
             "✅ Aguardando sua foto no canal...\nEnvie a imagem que será confirmada automaticamente",
             ephemeral=True
         )
-        print(f"   ⏳ Aguardando foto do cliente\n")
+        log.debug("⏳ Aguardando foto do cliente")
 
     
     async def _iniciar_transporte(self, interaction, transporte, numero_ticket, canal_ticket):
         """Transportador inicia o transporte"""
         
-        print(f"\n🚚 [INICIAR_TRANSPORTE] Ticket-{numero_ticket}")
+        log.info("🚚 [INICIAR_TRANSPORTE] Ticket-%s", numero_ticket)
         
         await interaction.response.defer()
         
         # Atualiza status
-        db.update_transporte_status(transporte['id'], STATUS["EM_TRANSPORTE"])
+        await adb.update_transporte_status(transporte['id'], STATUS["EM_TRANSPORTE"])
         
         # Notifica cliente
         embed_iniciado = discord.Embed(
@@ -696,13 +643,15 @@ class PaymentVerification(commands.Cog):
         
         guild = self.bot.get_guild(self.guild_id)
         try:
-            cliente_row = db._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
+            cliente_row = await adb._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
             discord_id = int(cliente_row['discord_id']) if cliente_row else transporte['cliente_id']
         except:
             discord_id = transporte['cliente_id']
         
         if canal_ticket:
-            await canal_ticket.send(
+            outbound.send(
+                canal_ticket,
+                prioridade=PRIORIDADE_CLIENTE,
                 content=f"<@{discord_id}>",
                 embed=embed_iniciado
             )
@@ -719,53 +668,37 @@ class PaymentVerification(commands.Cog):
             inline=False
         )
         
-        view_confirma = discord.ui.View(timeout=None)
-        
-        btn_confirmar = discord.ui.Button(
-            label="✅ Transporte Confirmado",
-            style=discord.ButtonStyle.success,
-            custom_id=f"confirmar_transporte_{transporte['id']}"
-        )
-        
-        async def confirmar_callback(conf_inter):
-            await self._confirmar_transporte(conf_inter, transporte, numero_ticket, canal_ticket)
-        
-        btn_confirmar.callback = confirmar_callback
-        view_confirma.add_item(btn_confirmar)
+        view_confirma = view_estatica(BOTAO_CONFIRMAR_TRANSPORTE.item(transporte['id']))
         
         # Procura canal staff
-        canal_staff = None
-        for ch in guild.channels:
-            if "painel-staff" in ch.name:
-                canal_staff = ch
-                break
+        canal_staff = canais.canal(guild, "painel_staff")
         
         if canal_staff:
-            await canal_staff.send(embed=embed_confirma, view=view_confirma)
+            outbound.send(canal_staff, prioridade=PRIORIDADE_STAFF, embed=embed_confirma, view=view_confirma)
         
         # Confirma para quem iniciou
         await interaction.followup.send(
             "✅ Transporte iniciado! Aguardando confirmação da entrega...",
             ephemeral=True
         )
-        print(f"   ✅ Transporte iniciado\n")
+        log.debug("✅ Transporte iniciado")
     
     async def _confirmar_transporte(self, interaction, transporte, numero_ticket, canal_ticket):
         """Staff confirma transporte entregue - foto OPCIONAL no canal"""
         
-        print(f"\n✅ [CONFIRMAR_TRANSPORTE] Ticket-{numero_ticket}")
+        log.info("✅ [CONFIRMAR_TRANSPORTE] Ticket-%s", numero_ticket)
         
         await interaction.response.defer()
         
         # Busca cliente
         try:
-            cliente_row = db._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
+            cliente_row = await adb._execute("SELECT discord_id FROM clientes WHERE id = ?", (transporte['cliente_id'],), fetchone=True)
             discord_id = int(cliente_row['discord_id']) if cliente_row else transporte['cliente_id']
         except:
             discord_id = transporte['cliente_id']
         
         # Atualiza status para ENTREGUE
-        db.update_transporte_status(transporte['id'], STATUS["ENTREGUE"])
+        await adb.update_transporte_status(transporte['id'], STATUS["ENTREGUE"])
         
         # Envia para cliente confirmar retirada
         embed_retirada = discord.Embed(
@@ -781,23 +714,13 @@ class PaymentVerification(commands.Cog):
         embed_retirada.set_footer(text="🎯 WHADAWEL™ | Transporte Concluído")
         
         # View com botão final
-        view_retirada = discord.ui.View(timeout=None)
-        
-        btn_retirada = discord.ui.Button(
-            label="✅ Confirmar Retirada",
-            style=discord.ButtonStyle.success,
-            custom_id=f"confirmar_retirada_{transporte['id']}"
-        )
-        
-        async def retirada_callback(ret_inter):
-            await self._confirmar_retirada(ret_inter, transporte, numero_ticket)
-        
-        btn_retirada.callback = retirada_callback
-        view_retirada.add_item(btn_retirada)
+        view_retirada = view_estatica(BOTAO_RETIRADA.item(transporte['id']))
         
         # Envia para cliente
         if canal_ticket:
-            await canal_ticket.send(
+            outbound.send(
+                canal_ticket,
+                prioridade=PRIORIDADE_CLIENTE,
                 content=f"<@{discord_id}>",
                 embed=embed_retirada,
                 view=view_retirada
@@ -811,17 +734,17 @@ class PaymentVerification(commands.Cog):
         )
         
         await interaction.followup.send(embed=embed_conf, ephemeral=True)
-        print(f"   ✅ Transporte confirmado\n")
+        log.debug("✅ Transporte confirmado")
     
-    async def _confirmar_retirada(self, interaction, transporte, numero_ticket):
+    async def _confirmar_retirada(self, interaction, transporte, numero_ticket, canal_ticket):
         """Cliente confirma retirada - FIM DO FLUXO"""
         
-        print(f"\n🎉 [CONFIRMAR_RETIRADA] Ticket-{numero_ticket} - FLUXO FINALIZADO")
+        log.debug("🎉 [CONFIRMAR_RETIRADA] Ticket-%s", numero_ticket)
         
         await interaction.response.defer()
         
         # Atualiza status final
-        db.update_transporte_status(transporte['id'], STATUS["CONCLUIDO"])
+        await adb.update_transporte_status(transporte['id'], STATUS["CONCLUIDO"])
         
         # Mensagem final
         embed_final = discord.Embed(
@@ -841,24 +764,14 @@ class PaymentVerification(commands.Cog):
         )
         embed_final.set_footer(text="🎯 WHADAWEL™ | Transportes Seguros desde 2024")
         
-        # Busca canal
         guild = self.bot.get_guild(self.guild_id)
-        canal_ticket = None
-        for ch in guild.channels:
-            if ch.name == f"ticket-{numero_ticket}":
-                canal_ticket = ch
-                break
         
         if canal_ticket:
-            await canal_ticket.send(embed=embed_final)
+            outbound.send(canal_ticket, prioridade=PRIORIDADE_CLIENTE, embed=embed_final)
         
         # ===== ENVIAR PARA HISTÓRICO-TAS =====
-        print(f"   📝 Enviando para histórico-tas...")
-        canal_historico = None
-        for ch in guild.channels:
-            if ch.name == "historico-tas":
-                canal_historico = ch
-                break
+        log.debug("📝 Enviando para histórico-tas...")
+        canal_historico = canais.canal(guild, "historico")
         
         if canal_historico:
             # Formata: Origem -> Destino ✅
@@ -872,30 +785,22 @@ class PaymentVerification(commands.Cog):
             )
             embed_historico.set_footer(text=f"Ticket #{numero_ticket:04d}")
             
-            await canal_historico.send(embed=embed_historico)
-            print(f"   ✅ Registrado em histórico-tas")
+            outbound.send(canal_historico, prioridade=PRIORIDADE_LOG, embed=embed_historico)
+            log.debug("✅ Registrado em histórico-tas")
         
         await interaction.followup.send(
             "✅ Transporte finalizado com sucesso!",
             ephemeral=True
         )
-        print(f"✅ [FLUXO COMPLETO] Ticket {numero_ticket} finalizado!\n")
+        log.info("✅ [FLUXO COMPLETO] Ticket %s finalizado!", numero_ticket)
     
-    async def _rejeitar_pagamento(self, interaction, numero_ticket, msg_original):
+    async def _rejeitar_pagamento(self, interaction, transporte, numero_ticket, canal_ticket):
         """Rejeita o pagamento pedindo nova foto"""
         
-        print(f"\n❌ [REJEITAR] Pagamento do ticket-{numero_ticket}")
+        log.info("❌ [REJEITAR] Pagamento do ticket-%s rejeitado por %s", numero_ticket, interaction.user.name)
         
         await interaction.response.defer()
         
-        # Busca canal do ticket
-        guild = self.bot.get_guild(self.guild_id)
-        canal_ticket = None
-        for ch in guild.channels:
-            if ch.name == f"ticket-{numero_ticket}":
-                canal_ticket = ch
-                break
-        
         if canal_ticket:
             embed_rejeitado = discord.Embed(
                 title="❌ Comprovante Rejeitado",
@@ -913,16 +818,13 @@ class PaymentVerification(commands.Cog):
                 inline=False
             )
             
-            # Busca user
-            user_obj = await self.bot.fetch_user(int(msg_original.author.id))
-            
             embed_rejeitado.add_field(
                 name="💬 Contato",
                 value=f"Se houver dúvidas, abra uma mensagem em <#duvidas>",
                 inline=False
             )
             
-            await canal_ticket.send(embed=embed_rejeitado)
+            outbound.send(canal_ticket, prioridade=PRIORIDADE_CLIENTE, embed=embed_rejeitado)
         
         # Confirma para o staff
         embed_conf = discord.Embed(
@@ -935,22 +837,21 @@ class PaymentVerification(commands.Cog):
         
         # Edita mensagem original no canal de análise
         try:
-            msg_analise = await interaction.channel.fetch_message(
-                interaction.message.id
-            )
+            msg_analise = interaction.message
             embed_editado = msg_analise.embeds[0]
             embed_editado.color = 0xE74C3C
             embed_editado.set_footer(text="❌ REJEITADO - Aguardando nova imagem")
-            await msg_analise.edit(embed=embed_editado, view=None)
+            outbound.edit(msg_analise, prioridade=PRIORIDADE_STAFF, embed=embed_editado, view=None)
         except:
             pass
         
-        print(f"❌ [REJEITAR] Concluído\n")
+        log.debug("❌ [REJEITAR] Concluído")
     
-    async def _corrigir_pagamento(self, interaction, numero_ticket, msg_original):
+    async def _corrigir_pagamento(self, interaction, transporte, numero_ticket, canal_ticket):
         """Marca para correção (valor diferente)"""
         
-        print(f"\n🔧 [CORRIGIR] Pagamento do ticket-{numero_ticket}")
+        log.info("🔧 [CORRIGIR] Pagamento do ticket-%s", numero_ticket)
+        transporte_id = transporte['id']
         
         # Modal para o staff inserir o valor correto
         class ModalValorCorreto(discord.ui.Modal):
@@ -967,13 +868,8 @@ class PaymentVerification(commands.Cog):
                 try:
                     valor_recebido = float(self.valor_input.value)
                     
-                    # Busca o transporte
-                    db._execute("""
-                        SELECT * FROM transportes 
-                        WHERE numero_ticket = ? 
-                        ORDER BY id DESC LIMIT 1
-                    """, (numero_ticket,))
-                    transporte = cursor.fetchone()
+                    # Busca o transporte (atualizado, pode ter mudado enquanto o modal estava aberto)
+                    transporte = await adb.get_transporte(transporte_id)
                     
                     if not transporte:
                         await modal_interaction.response.send_message(
@@ -982,15 +878,7 @@ class PaymentVerification(commands.Cog):
                         )
                         return
                     
-                    valor_esperado = transporte['valor_br']
-                    
-                    # Busca canal do ticket
-                    guild = self.bot.get_guild(self.guild_id)
-                    canal_ticket = None
-                    for ch in guild.channels:
-                        if ch.name == f"ticket-{numero_ticket}":
-                            canal_ticket = ch
-                            break
+                    valor_esperado = float(transporte['taxa_final'] or 0)
                     
                     if canal_ticket:
                         embed_diferenca = discord.Embed(
@@ -1026,10 +914,10 @@ class PaymentVerification(commands.Cog):
                                 inline=False
                             )
                             # Aprova se recebeu mais
-                            db.update_transporte_status(transporte['id'], STATUS["PAGO"])
+                            await adb.update_transporte_status(transporte['id'], STATUS["PAGO"])
                             embed_diferenca.color = 0x2ECC71
                         
-                        await canal_ticket.send(embed=embed_diferenca)
+                        outbound.send(canal_ticket, prioridade=PRIORIDADE_CLIENTE, embed=embed_diferenca)
                     
                     await modal_interaction.response.send_message(
                         f"✅ Valor registrado: R$ {valor_recebido:.2f}",
@@ -1043,12 +931,12 @@ class PaymentVerification(commands.Cog):
                     )
         
         await interaction.response.send_modal(ModalValorCorreto())
-        print(f"🔧 [CORRIGIR] Modal enviado\n")
+        log.debug("🔧 [CORRIGIR] Modal enviado")
 
 
 async def setup(bot):
     await bot.add_cog(PaymentVerification(bot))
-    print("✅ Cog Payment Verification carregado")
+    log.info("✅ Cog Payment Verification carregado")
 
 
 
@@ -1,112 +1,156 @@
 """
 Cog: Fila de Transportes em Real-time
+
+O quadro é redesenhado quando algum transporte muda de status (evento vindo do
+Database), com debounce para agrupar rajadas. Uma reconciliação lenta continua
+rodando como rede de segurança.
 """
 import discord
 from discord.ext import commands, tasks
-from bot.database import db
-from bot.config import STATUS
+from bot.database import db, adb
+from bot.config import STATUS, FILA_DEBOUNCE, FILA_RECONCILIAR
 from bot.utils.embeds import criar_embed_fila
+from bot.utils.channels import canais
+from bot.utils.outbound import outbound, PRIORIDADE_LOG
+from bot.utils.log import get_logger
 import asyncio
+import hashlib
+
+log = get_logger(__name__)
+
+# Status que aparecem no quadro da fila
+STATUS_QUADRO = (STATUS["PAGO"], STATUS["DEPOSITADO"])
 
 class QueueCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.fila_task = None
         self.ultima_mensagem_fila = None
         self.transportes_cache = []
-    
+        self._loop = None
+        self._atualizacao_pendente = None  # task do debounce
+        self._lock = asyncio.Lock()
+        self._ultimo_hash = None
+        self._ids_na_fila = None  # ids em STATUS_QUADRO na última leitura (None = quadro ainda não lido)
+
+    async def cog_load(self):
+        # Listener chamado na thread do banco: repassa o evento ao loop do bot
+        self._loop = asyncio.get_running_loop()
+        db.add_status_listener(self._status_alterado_db)
+
+    def _status_alterado_db(self, transporte_id, novo_status):
+        self._loop.call_soon_threadsafe(self.bot.dispatch, "transporte_status_alterado", transporte_id, novo_status)
+
     @commands.Cog.listener()
     async def on_ready(self):
         print("✅ Cog Queue carregado")
-        
-        # Inicia task de atualização
-        if not self.fila_task or not self.fila_task.is_running():
+
+        # Reconciliação periódica + primeira montagem do quadro
+        if not self.atualizar_fila.is_running():
             self.atualizar_fila.start()
-    
-    @tasks.loop(seconds=30)
+
+    @commands.Cog.listener()
+    async def on_transporte_status_alterado(self, transporte_id, novo_status):
+        """Agenda uma atualização; mudanças dentro do debounce viram uma só"""
+        if not self._afeta_quadro(transporte_id, novo_status):
+            return
+        if self._atualizacao_pendente and not self._atualizacao_pendente.done():
+            return
+        self._atualizacao_pendente = asyncio.create_task(self._atualizar_apos_debounce())
+
+    def _afeta_quadro(self, transporte_id, novo_status):
+        """O transporte entrou na fila (novo status do quadro) ou saiu dela (estava no quadro)"""
+        if self._ids_na_fila is None:
+            return True
+        return (novo_status or "").upper() in STATUS_QUADRO or transporte_id in self._ids_na_fila
+
+    async def _atualizar_apos_debounce(self):
+        await asyncio.sleep(FILA_DEBOUNCE)
+        # Libera o agendamento antes de ler o banco: mudanças daqui em diante geram nova rodada
+        self._atualizacao_pendente = None
+        await self._atualizar()
+
+    @tasks.loop(seconds=FILA_RECONCILIAR)
     async def atualizar_fila(self):
-        """Atualiza a fila de transportes a cada 30 segundos"""
-        
-        try:
-            guild_id = int(db.get_config("GUILD_ID") or 0)
-            if not guild_id:
-                return
-            
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                return
-            
-            # Busca canal de fila
-            fila_channel_id = db.get_config("CANAL_FILA")
-            if not fila_channel_id:
-                return
-            
-            fila_channel = guild.get_channel(int(fila_channel_id))
-            if not fila_channel:
-                return
-            
-            # Busca transportes com status PAGO ou DEPOSITADO
-            transportes = db.get_transportes_por_status([STATUS["PAGO"], STATUS["DEPOSITADO"]])
-            
-            # Ordena por prioridade (ALTA primeiro) depois por data
-            transportes_ordenados = sorted(
-                transportes,
-                key=lambda x: (
-                    0 if x[6] == "ALTA" else 1 if x[6] == "NORMAL" else 2,
-                    x[8]  # data_criacao
-                )
+        """Reconciliação de segurança caso algum evento se perca"""
+        await self._atualizar()
+
+    async def _atualizar(self):
+        """Monta o quadro da fila e só edita a mensagem se o conteúdo mudou"""
+        async with self._lock:
+            try:
+                await self._atualizar_quadro()
+            except Exception:
+                log.exception("❌ Erro ao atualizar fila")
+
+    async def _atualizar_quadro(self):
+        guild_id = int(await adb.get_config("GUILD_ID") or 0)
+        if not guild_id:
+            return
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+
+        # Canal de fila (índice de canais; CANAL_FILA em configuracoes tem preferência)
+        fila_channel = canais.canal(guild, "fila")
+        if not fila_channel:
+            return
+
+        # Busca transportes com status PAGO ou DEPOSITADO
+        transportes = await adb.get_transportes_por_status(list(STATUS_QUADRO))
+        self._ids_na_fila = {t["id"] for t in transportes}
+
+        # Ordena por prioridade (ALTA primeiro) depois por data
+        transportes_ordenados = sorted(
+            transportes,
+            key=lambda x: (
+                0 if x["prioridade"] == "ALTA" else 1 if x["prioridade"] == "NORMAL" else 2,
+                str(x["data_criacao"])
             )
-            
-            if not transportes_ordenados:
-                # Nenhum transporte na fila
-                embed = discord.Embed(
-                    title="📭 Fila de Transportes",
-                    description="Nenhum transporte aguardando transportador",
-                    color=discord.Color.greyple()
-                )
-                embed.set_footer(text="Atualizado a cada 30 segundos")
-                
-                if self.ultima_mensagem_fila:
-                    try:
-                        await self.ultima_mensagem_fila.edit(embed=embed)
-                    except:
-                        self.ultima_mensagem_fila = await fila_channel.send(embed=embed)
-                else:
-                    self.ultima_mensagem_fila = await fila_channel.send(embed=embed)
-                return
-            
+        )[:10]  # Máx 10 na fila
+
+        # Hash do que aparece no quadro: se nada mudou, não chama a API
+        conteudo = repr([
+            (t["id"], t["numero_ticket"], t["status"], t["prioridade"], t["origem"], t["valor_estimado"])
+            for t in transportes_ordenados
+        ])
+        hash_conteudo = hashlib.sha1(conteudo.encode()).hexdigest()
+        if hash_conteudo == self._ultimo_hash and self.ultima_mensagem_fila:
+            return
+
+        if not transportes_ordenados:
+            # Nenhum transporte na fila
+            embed = discord.Embed(
+                title="📭 Fila de Transportes",
+                description="Nenhum transporte aguardando transportador",
+                color=discord.Color.greyple()
+            )
+            embed.set_footer(text="Atualizado automaticamente")
+            embeds = [embed]
+        else:
             # Cria embeds para cada transporte
-            embeds = []
-            for idx, transporte in enumerate(transportes_ordenados[:10], 1):  # Máx 10 na fila
-                embed = criar_embed_fila(
-                    numero=transporte[1],
-                    origem=transporte[4],
-                    valor=transporte[7],
-                    prioridade=transporte[6],
-                    cliente_id=transporte[1]
-                )
-                embeds.append(embed)
-            
-            # Envia/atualiza mensagem de fila
-            view = discord.ui.View()
-            
-            if self.ultima_mensagem_fila:
-                try:
-                    # Tenta editar mensagem existente
-                    await self.ultima_mensagem_fila.edit(embeds=embeds)
-                except discord.errors.NotFound:
-                    # Se foi deletada, cria nova
-                    self.ultima_mensagem_fila = await fila_channel.send(embeds=embeds)
-            else:
-                self.ultima_mensagem_fila = await fila_channel.send(embeds=embeds)
-            
-        except Exception as e:
-            print(f"Erro ao atualizar fila: {e}")
-    
+            embeds = [criar_embed_fila(transporte) for transporte in transportes_ordenados]
+
+        if self.ultima_mensagem_fila:
+            try:
+                # Tenta editar mensagem existente
+                await outbound.edit(self.ultima_mensagem_fila, prioridade=PRIORIDADE_LOG, embeds=embeds)
+            except discord.errors.NotFound:
+                # Se foi deletada, cria nova
+                self.ultima_mensagem_fila = await outbound.send(fila_channel, prioridade=PRIORIDADE_LOG, embeds=embeds)
+        else:
+            self.ultima_mensagem_fila = await outbound.send(fila_channel, prioridade=PRIORIDADE_LOG, embeds=embeds)
+
+        self.transportes_cache = transportes_ordenados
+        self._ultimo_hash = hash_conteudo
+
     def cog_unload(self):
         """Limpa ao descarregar o cog"""
-        if self.fila_task.is_running():
-            self.fila_task.cancel()
+        db.remove_status_listener(self._status_alterado_db)
+        if self.atualizar_fila.is_running():
+            self.atualizar_fila.cancel()
+        if self._atualizacao_pendente and not self._atualizacao_pendente.done():
+            self._atualizacao_pendente.cancel()
 
 async def setup(bot):
     await bot.add_cog(QueueCog(bot))
@@ -8,8 +8,10 @@ from discord import app_commands
 import sqlite3
 from datetime import datetime
 import asyncio
-from bot.database import db
+from bot.database import db, adb
 from bot.config import GUILD_ID, STATUS
+from bot.utils.channels import canais
+from bot.utils.buttons import ViewPaginacao
 
 class RelatorioTransportes(commands.Cog):
     def __init__(self, bot):
@@ -17,29 +19,32 @@ class RelatorioTransportes(commands.Cog):
         self.guild_id = GUILD_ID
         self.dashboard_enviado = False
     
-    def _get_estatisticas(self):
+    async def _get_estatisticas(self):
         """Retorna estatísticas de transportes"""
         try:
+            # Snapshot em cache (uma única query GROUP BY status)
+            contagens = await adb.get_stats_snapshot()
+
+            def soma(*chaves):
+                return sum(contagens.get(STATUS[c], 0) for c in chaves)
+
             # Concluídos (CONCLUIDO ou ENTREGUE)
-            concluidos = len(db.get_transportes_by_status(STATUS["CONCLUIDO"])) + \
-                         len(db.get_transportes_by_status(STATUS["ENTREGUE"]))
+            concluidos = soma("CONCLUIDO", "ENTREGUE")
             
             # Em fila (ABERTO)
-            fila = len(db.get_transportes_by_status(STATUS["ABERTO"]))
+            fila = soma("ABERTO")
             
             # Aguardando pagamento
-            aguardando_pagamento = len(db.get_transportes_by_status(STATUS["AGUARDANDO_PAGAMENTO"]))
+            aguardando_pagamento = soma("AGUARDANDO_PAGAMENTO")
             
             # Pagos aguardando transporte (PAGO ou DEPOSITADO)
-            pagos = len(db.get_transportes_by_status(STATUS["PAGO"])) + \
-                    len(db.get_transportes_by_status(STATUS["DEPOSITADO"]))
+            pagos = soma("PAGO", "DEPOSITADO")
             
             # Em transporte
-            em_transporte = len(db.get_transportes_by_status(STATUS["EM_TRANSPORTE"]))
+            em_transporte = soma("EM_TRANSPORTE")
             
             # Cancelados
-            cancelados = len(db.get_transportes_by_status(STATUS["CANCELADO"])) + \
-                         len(db.get_transportes_by_status(STATUS["REJEITADO"]))
+            cancelados = soma("CANCELADO", "REJEITADO")
             
             total = concluidos + fila + aguardando_pagamento + pagos + em_transporte + cancelados
             
@@ -67,7 +72,7 @@ class RelatorioTransportes(commands.Cog):
     async def _enviar_dashboard(self, canal):
         """Envia dashboard com botões para o canal de relatórios"""
         
-        stats = self._get_estatisticas()
+        stats = await self._get_estatisticas()
         
         # Embed principal - Dashboard
         embed_main = discord.Embed(
@@ -243,48 +248,49 @@ class RelatorioTransportes(commands.Cog):
         except Exception as e:
             print(f"❌ Erro ao enviar dashboard: {e}")
     
+    # Categoria -> (status incluídos, título, cor)
+    DETALHES = {
+        "CONCLUIDOS": ((STATUS["CONCLUIDO"], STATUS["ENTREGUE"]), "✅ TRANSPORTES CONCLUÍDOS", 0x27AE60),
+        "FILA": ((STATUS["ABERTO"],), "📋 TRANSPORTES EM FILA", 0x3498DB),
+        "AGUARDANDO_PAGAMENTO": ((STATUS["AGUARDANDO_PAGAMENTO"],), "⏳ AGUARDANDO PAGAMENTO", 0xF39C12),
+        "PAGOS": ((STATUS["PAGO"], STATUS["DEPOSITADO"]), "💰 PAGOS - AGUARDANDO TRANSPORTE", 0x2ECC71),
+        "EM_TRANSPORTE": ((STATUS["EM_TRANSPORTE"],), "🚚 EM TRANSPORTE", 0x9B59B6),
+    }
+    
     async def _mostrar_detalhes(self, interaction: discord.Interaction, tipo: str):
-        """Mostra detalhes de um tipo de transporte"""
+        """Mostra detalhes de um tipo de transporte, 25 por página"""
         
         try:
             await interaction.response.defer(ephemeral=True)
             
-            # Busca transportes do tipo solicitado
-            if tipo == "CONCLUIDOS":
-                transportes1 = db.get_transportes_by_status(STATUS["CONCLUIDO"])
-                transportes2 = db.get_transportes_by_status(STATUS["ENTREGUE"])
-                transportes = transportes1 + transportes2
-                titulo = "✅ TRANSPORTES CONCLUÍDOS"
-                cor = 0x27AE60
-            
-            elif tipo == "FILA":
-                transportes = db.get_transportes_by_status(STATUS["ABERTO"])
-                titulo = "📋 TRANSPORTES EM FILA"
-                cor = 0x3498DB
+            status_list, titulo, cor = self.DETALHES.get(tipo, ((), "❓ DETALHES", 0x95A5A6))
+            contagens = await adb.get_stats_snapshot()
+            total = sum(contagens.get(status, 0) for status in status_list)
             
-            elif tipo == "AGUARDANDO_PAGAMENTO":
-                transportes = db.get_transportes_by_status(STATUS["AGUARDANDO_PAGAMENTO"])
-                titulo = "⏳ AGUARDANDO PAGAMENTO"
-                cor = 0xF39C12
+            async def buscar_pagina(antes=None, depois=None):
+                return await adb.get_transportes_pagina(status_list, antes=antes, depois=depois, limite=25)
             
-            elif tipo == "PAGOS":
-                transportes1 = db.get_transportes_by_status(STATUS["PAGO"])
-                transportes2 = db.get_transportes_by_status(STATUS["DEPOSITADO"])
-                transportes = transportes1 + transportes2
-                titulo = "💰 PAGOS - AGUARDANDO TRANSPORTE"
-                cor = 0x2ECC71
-            
-            elif tipo == "EM_TRANSPORTE":
-                transportes = db.get_transportes_by_status(STATUS["EM_TRANSPORTE"])
-                titulo = "🚚 EM TRANSPORTE"
-                cor = 0x9B59B6
+            def montar_embed(pagina, numero):
+                embed = discord.Embed(
+                    title=f"{titulo} ({total})",
+                    description=f"Página {numero} - do mais recente ao mais antigo",
+                    color=cor
+                )
+                for trans in pagina['itens']:
+                    numero_ticket = trans['numero_ticket'] if trans['numero_ticket'] is not None else "N/A"
+                    cliente = f"<@{trans['cliente_discord_id']}>" if trans['cliente_discord_id'] else "N/A"
+                    embed.add_field(
+                        name=f"🎫 Ticket #{numero_ticket}",
+                        value=f"**Status:** {trans['status']}\n**Cliente:** {cliente}\n**Data:** {trans['data_criacao']}",
+                        inline=False
+                    )
+                embed.set_footer(text=f"Mostrando {len(pagina['itens'])} de {total} transportes")
+                return embed
             
-            else:
-                transportes = []
-                titulo = "❓ DETALHES"
-                cor = 0x95A5A6
+            view = ViewPaginacao(buscar_pagina, montar_embed)
+            embed = await view.primeira_pagina()
             
-            if not transportes:
+            if not view.pagina['itens']:
                 embed = discord.Embed(
                     title=titulo,
                     description="Nenhum transporte nesta categoria",
@@ -293,30 +299,7 @@ class RelatorioTransportes(commands.Cog):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
             
-            # Cria embed com detalhes
-            embed = discord.Embed(
-                title=f"{titulo} ({len(transportes)})",
-                description=f"Detalhes dos {len(transportes)} transportes",
-                color=cor
-            )
-            
-            # Mostra até 25 transportes
-            for trans in transportes[:25]:
-                numero = trans[11] if len(trans) > 11 else "N/A"
-                status = trans[2]
-                cliente_id = trans[1]
-                data = trans[7] if len(trans) > 7 else "N/A"
-                
-                embed.add_field(
-                    name=f"🎫 Ticket #{numero}",
-                    value=f"**Status:** {status}\n**Cliente:** <@{cliente_id}>\n**Data:** {data}",
-                    inline=False
-                )
-            
-            if len(transportes) > 25:
-                embed.set_footer(text=f"Mostrando 25 de {len(transportes)} transportes")
-            
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
             
         except Exception as e:
             print(f"❌ Erro ao mostrar detalhes: {e}")
@@ -330,11 +313,7 @@ class RelatorioTransportes(commands.Cog):
             guild = interaction.guild
             
             # Encontra o canal de relatórios
-            canal_relatorio = None
-            for ch in guild.channels:
-                if "relatorio" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                    canal_relatorio = ch
-                    break
+            canal_relatorio = canais.canal(guild, "relatorio")
             
             if not canal_relatorio:
                 await interaction.response.send_message("❌ Canal de relatórios não encontrado!", ephemeral=True)
@@ -366,13 +345,12 @@ class RelatorioTransportes(commands.Cog):
                 
                 print(f"✅ Guild encontrada: {guild.name}")
                 
-                for ch in guild.channels:
-                    if "relatorio" in ch.name.lower() and isinstance(ch, discord.TextChannel):
-                        print(f"📨 Enviando dashboard para {ch.name}...")
-                        await self._enviar_dashboard(ch)
-                        self.dashboard_enviado = True
-                        print("✅ Dashboard de relatórios enviado com sucesso!")
-                        break
+                ch = canais.canal(guild, "relatorio")
+                if ch:
+                    print(f"📨 Enviando dashboard para {ch.name}...")
+                    await self._enviar_dashboard(ch)
+                    self.dashboard_enviado = True
+                    print("✅ Dashboard de relatórios enviado com sucesso!")
                         
             except Exception as e:
                 print(f"❌ Erro ao enviar dashboard: {e}")
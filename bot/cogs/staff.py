@@ -5,7 +5,7 @@ DESABILITADO: Requer banco de dados legado não disponível
 import discord
 from discord.ext import commands
 from discord.app_commands import checks
-from bot.config import STATUS, PRECO_BASE
+from bot.config import STATUS
 from bot.utils.embeds import criar_embed_transporte
 from datetime import datetime, timedelta
 
@@ -3,9 +3,9 @@ Cog: Sistema de Tickets
 """
 import discord
 from discord.ext import commands
-from bot.database import db
+from bot.database import adb
 from bot.config import (
-    PRECO_BASE, VALOR_MINIMO, TAXA_ALTA_PRIORIDADE, PIX_KEY, 
+    VALOR_MINIMO, PIX_KEY, 
     STATUS, ORIGENS, DESTINO_PADRAO
 )
 from bot.utils.embeds import (
@@ -16,29 +16,52 @@ from bot.utils.buttons import (
     ViewConfirmarDeposito, ModalConfirmarDeposito
 )
 from bot.utils.validators import validar_valor_prata, calcular_taxa
+from bot.utils.channels import canais
+from bot.utils.sessions import SessionStore
+from bot.utils.precos import precos
+from bot.utils.componentes import BotaoDinamico, SelectDinamico, RoteadorComponentes, view_estatica
+
+# Passos do assistente: o custom_id leva o user_id do dono do ticket, então um clique
+# depois de reiniciar o bot continua a sessão restaurada (roteados em on_button_click)
+SELECT_ORIGEM = SelectDinamico("ticket_origem_", "Selecione a origem...", [discord.SelectOption(label=o, value=o) for o in ORIGENS])
+BOTAO_NORMAL = BotaoDinamico("ticket_normal_", "🕒 Normal", discord.ButtonStyle.gray)
+BOTAO_ALTA = BotaoDinamico("ticket_alta_", "⚡ Alta (+20%)", discord.ButtonStyle.danger)
+BOTAO_VALOR = BotaoDinamico("ticket_valor_", "Inserir Valor", discord.ButtonStyle.primary)
+BOTAO_OBS = BotaoDinamico("ticket_obs_", "Adicionar Observações", discord.ButtonStyle.primary)
 
 class TicketsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.ticket_counter = 0
-        self.user_sessions = {}  # Armazena estado de cada usuário
+        self.user_sessions = SessionStore("tickets")  # user_id → sessão (TTL + limite, salva em `sessoes`)
+        
+        # Handlers recebem (interaction, user_id do dono); os passos usam a sessão de quem clicou
+        self.passos = RoteadorComponentes()
+        self.passos.registrar(SELECT_ORIGEM, lambda inter, user_id: self.processar_origem(inter, inter.data["values"][0]))
+        self.passos.registrar(BOTAO_NORMAL, lambda inter, user_id: self.processar_prioridade(inter, "NORMAL"))
+        self.passos.registrar(BOTAO_ALTA, lambda inter, user_id: self.processar_prioridade(inter, "ALTA"))
+        self.passos.registrar(BOTAO_VALOR, self._abrir_modal_valor)
+        self.passos.registrar(BOTAO_OBS, self._abrir_modal_obs)
+    
+    async def cog_load(self):
+        # Retoma tickets em andamento antes do reinício
+        await self.user_sessions.recarregar()
     
     @commands.Cog.listener()
     async def on_ready(self):
         """Evento quando bot conecta"""
         print(f"✅ Cog Tickets carregado")
-        
-        # Restaura o contador do banco
-        conn = db.get_connection()
-        cursor = db.get_wrapped_cursor(conn)
-        cursor.execute("SELECT COUNT(*) FROM transportes")
-        self.ticket_counter = cursor.fetchone()[0]
-        conn.close()
     
     @commands.Cog.listener()
     async def on_button_click(self, interaction: discord.Interaction):
         """Listener para cliques em botões"""
         
+        # Passos do assistente (custom_id com o user_id)
+        rota = self.passos.resolver(interaction.data.get('custom_id'))
+        if rota is not None:
+            handler, user_id = rota
+            await handler(interaction, user_id)
+            return
+        
         # Abrir novo ticket
         if interaction.data.get('custom_id') == 'btn_abrir_ticket':
             await self.abrir_ticket(interaction)
@@ -60,46 +83,31 @@ class TicketsCog(commands.Cog):
         # Cria canal privado para o ticket
         try:
             # Cria cliente se não existir
-            cliente = db.get_or_create_cliente(
+            cliente = await adb.get_or_create_cliente(
                 str(interaction.user.id),
                 interaction.user.name
             )
             
             # Gera próximo número de ticket
-            self.ticket_counter += 1
-            numero_ticket = 1000 + self.ticket_counter
+            numero_ticket = await adb.next_ticket_number()
             
             # Cria canal privado
             guild = interaction.guild
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            }
-            
-            # Adiciona staff se tiver permissão
-            for member in guild.members:
-                if any(role.name.startswith("💼") or role.name.startswith("👑") for role in member.roles):
-                    overwrites[member] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-            
-            canal_ticket = await guild.create_text_channel(
+            # Overwrites por cargo de staff, dentro da categoria de tickets
+            canal_ticket = await canais.criar_ticket(
+                guild,
+                interaction.user,
                 name=f"ticket-transport-{numero_ticket:04d}",
-                category=None,  # Root level
-                overwrites=overwrites,
                 topic=f"Ticket de transporte #{numero_ticket:04d} | Cliente: {interaction.user.name}"
             )
             
             # Salva sessão do usuário
-            self.user_sessions[interaction.user.id] = {
-                'numero_ticket': numero_ticket,
-                'canal_ticket': canal_ticket.id,
-                'cliente_id': cliente['id'],
-                'origem': None,
-                'prioridade': None,
-                'valor': None,
-                'print_item': None,
-                'obs': None,
-                'transporte_id': None
-            }
+            self.user_sessions.criar(
+                interaction.user.id,
+                numero_ticket=numero_ticket,
+                canal_ticket=canal_ticket.id,
+                cliente_id=cliente['id']
+            )
             
             # Responde ao usuário
             embed_welcome = discord.Embed(
@@ -139,29 +147,7 @@ class TicketsCog(commands.Cog):
             color=0x3498DB
         )
         
-        # Create select menu
-        class SelectOrigem(discord.ui.Select):
-            def __init__(self, callback):
-                options = [
-                    discord.SelectOption(label=origem, value=origem)
-                    for origem in ORIGENS
-                ]
-                super().__init__(
-                    placeholder="Selecione a origem...",
-                    min_values=1,
-                    max_values=1,
-                    options=options,
-                    custom_id=f"select_origem_{numero_ticket}"
-                )
-                self.callback_func = callback
-            
-            async def callback(self, inter: discord.Interaction):
-                await self.callback_func(inter, self.values[0])
-        
-        view = discord.ui.View()
-        view.add_item(SelectOrigem(self.processar_origem))
-        
-        await canal_ticket.send(embed=embed, view=view)
+        await canal_ticket.send(embed=embed, view=view_estatica(SELECT_ORIGEM.item(interaction.user.id)))
     
     async def processar_origem(self, interaction: discord.Interaction, origem: str):
         """Processa a origem escolhida"""
@@ -196,32 +182,8 @@ class TicketsCog(commands.Cog):
             color=0xF39C12
         )
         
-        view = discord.ui.View()
-        
-        async def callback_normal(inter):
-            await self.processar_prioridade(inter, "NORMAL")
-        
-        async def callback_alta(inter):
-            await self.processar_prioridade(inter, "ALTA")
-        
-        btn_normal = discord.ui.Button(
-            label="🕒 Normal",
-            style=discord.ButtonStyle.gray,
-            custom_id="btn_normal"
-        )
-        btn_normal.callback = callback_normal
-        
-        btn_alta = discord.ui.Button(
-            label="⚡ Alta (+20%)",
-            style=discord.ButtonStyle.danger,
-            custom_id="btn_alta"
-        )
-        btn_alta.callback = callback_alta
-        
-        view.add_item(btn_normal)
-        view.add_item(btn_alta)
-        
-        await canal.send(embed=embed, view=view)
+        user_id = interaction.user.id
+        await canal.send(embed=embed, view=view_estatica(BOTAO_NORMAL.item(user_id), BOTAO_ALTA.item(user_id)))
     
     async def processar_prioridade(self, interaction: discord.Interaction, prioridade: str):
         """Processa a prioridade escolhida"""
@@ -255,6 +217,11 @@ class TicketsCog(commands.Cog):
             color=0x3498DB
         )
         
+        await canal.send(embed=embed, view=view_estatica(BOTAO_VALOR.item(interaction.user.id)))
+    
+    async def _abrir_modal_valor(self, interaction: discord.Interaction, user_id):
+        """Botão do passo de valor: abre o modal"""
+        
         class ModalValor(discord.ui.Modal):
             def __init__(self, cog):
                 super().__init__(title="Valor da Carga", custom_id="modal_valor_ticket")
@@ -271,20 +238,7 @@ class TicketsCog(commands.Cog):
             async def on_submit(self, inter: discord.Interaction):
                 await self.cog.processar_valor(inter, self.valor_input.value)
         
-        view = discord.ui.View()
-        
-        async def open_modal(inter):
-            await inter.response.send_modal(ModalValor(self))
-        
-        btn = discord.ui.Button(
-            label="Inserir Valor",
-            style=discord.ButtonStyle.primary,
-            custom_id="btn_valor"
-        )
-        btn.callback = open_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        await interaction.response.send_modal(ModalValor(self))
     
     async def processar_valor(self, interaction: discord.Interaction, valor_text: str):
         """Processa o valor inserido"""
@@ -384,7 +338,10 @@ class TicketsCog(commands.Cog):
             color=0x3498DB
         )
         
-        view = discord.ui.View()
+        await message.channel.send(embed=embed, view=view_estatica(BOTAO_OBS.item(message.author.id)))
+    
+    async def _abrir_modal_obs(self, interaction: discord.Interaction, user_id):
+        """Botão do passo de observações: abre o modal"""
         
         class ModalObs(discord.ui.Modal):
             def __init__(self, cog):
@@ -402,18 +359,7 @@ class TicketsCog(commands.Cog):
             async def on_submit(self, inter: discord.Interaction):
                 await self.cog.processar_observacoes(inter, self.obs_input.value or "Nenhuma")
         
-        async def open_modal(inter):
-            await inter.response.send_modal(ModalObs(self))
-        
-        btn = discord.ui.Button(
-            label="Adicionar Observações",
-            style=discord.ButtonStyle.primary,
-            custom_id="btn_obs"
-        )
-        btn.callback = open_modal
-        view.add_item(btn)
-        
-        await message.channel.send(embed=embed, view=view)
+        await interaction.response.send_modal(ModalObs(self))
     
     async def processar_observacoes(self, interaction: discord.Interaction, obs: str):
         """Processa observações e gera resumo"""
@@ -431,18 +377,19 @@ class TicketsCog(commands.Cog):
         taxa = calcular_taxa(
             session['valor'],
             prioridade,
-            PRECO_BASE,
-            TAXA_ALTA_PRIORIDADE
+            precos.atual.preco_base,
+            precos.atual.taxa_alta_prioridade
         )
         
         # Cria transporte no banco
-        transporte = db.create_transporte(
+        transporte = await adb.create_transporte(
             cliente_id=session['cliente_id'],
             origem=session['origem'],
             valor_estimado=session['valor'],
             prioridade=prioridade,
             taxa_final=taxa,
-            ticket_channel_id=session['canal_ticket']
+            ticket_channel_id=session['canal_ticket'],
+            numero_ticket=session['numero_ticket']
         )
         
         session['transporte_id'] = transporte['id']
@@ -4,20 +4,31 @@ Fluxo Completo: Nick → Origem → Prioridade → Valor → Obs → Pagamento 
 """
 import discord
 from discord.ext import commands
-from bot.database import db
+from bot.database import adb
 from bot.config import (
-    PRECO_POR_MILHAO, PRECO_ALTA_PRIORIDADE, VALOR_MINIMO, 
-    TAXA_ALTA_PRIORIDADE, PIX_KEY, STATUS, ORIGENS, DESTINO_PADRAO, PIX_QRCODE_PATH
+    VALOR_MINIMO, PIX_KEY, STATUS, ORIGENS, DESTINO_PADRAO, PIX_QRCODE_PATH
 )
+from bot.utils.channels import canais
+from bot.utils.sessions import SessionStore
+from bot.utils.precos import precos
+from bot.utils.log import get_logger, vincular, vincular_interacao
+from bot.utils.componentes import BotaoDinamico, SelectDinamico, RoteadorComponentes, view_estatica
 from pathlib import Path
 
+log = get_logger(__name__)
+
+# Passos do assistente: o custom_id leva o user_id do dono do ticket, então um clique
+# depois de reiniciar o bot continua a sessão restaurada (roteados em on_button_click)
+BOTAO_NICK = BotaoDinamico("fluxo_nick_", "📝 Inserir Nick", discord.ButtonStyle.primary)
+SELECT_ORIGEM = SelectDinamico("fluxo_origem_", "Selecione...", [discord.SelectOption(label=o, value=o, emoji="📍") for o in ORIGENS])
+BOTAO_NORMAL = BotaoDinamico("fluxo_normal_", "🕒 Normal", discord.ButtonStyle.gray)
+BOTAO_ALTA = BotaoDinamico("fluxo_alta_", "⚡ Alta (+20%)", discord.ButtonStyle.danger)
+BOTAO_VALOR = BotaoDinamico("fluxo_valor_", "💵 Inserir Valor", discord.ButtonStyle.secondary)
+BOTAO_OBS = BotaoDinamico("fluxo_obs_", "📝 Adicionar Observações", discord.ButtonStyle.secondary)
+
 def calcular_taxa_novo(valor, prioridade):
-    """Calcula taxa com novo sistema"""
-    if prioridade == "ALTA":
-        taxa = (valor / 1_000_000) * PRECO_ALTA_PRIORIDADE
-    else:
-        taxa = (valor / 1_000_000) * PRECO_POR_MILHAO
-    return taxa
+    """Calcula taxa com novo sistema (preço vigente em `configuracoes`)"""
+    return (valor / 1_000_000) * precos.atual.por_milhao(prioridade)
 
 class ViewAbrirTransporte(discord.ui.View):
     def __init__(self, cog):
@@ -42,20 +53,18 @@ class ModalNick(discord.ui.Modal):
         self.add_item(self.nick)
     
     async def on_submit(self, interaction: discord.Interaction):
-        print(f"\n🎮 [MODAL_NICK] Enviado por {interaction.user.name}")
-        print(f"   Nick: {self.nick.value}")
+        vincular_interacao(interaction)
+        log.debug("🎮 [MODAL_NICK] Nick enviado: %s", self.nick.value)
         
         try:
             await interaction.response.defer(ephemeral=True)
-            print(f"   ✅ Defer feito no modal")
+            log.debug("✅ Defer feito no modal")
             
             await self.callback_func(interaction, self.nick.value)
-            print(f"   ✅ Callback executado")
+            log.debug("✅ Callback executado")
             
         except Exception as e:
-            print(f"   ❌ Erro no modal: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Erro no modal")
 
 class ModalValor(discord.ui.Modal):
     def __init__(self, callback):
@@ -96,85 +105,97 @@ class TransportFlowCog(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.sessions = {}  # user_id → session
-        self.ticket_counter = 0
+        self.sessions = SessionStore("transport_flow")  # user_id → sessão (TTL + limite, salva em `sessoes`)
+        
+        # Todos os handlers recebem (interaction, user_id do dono do ticket)
+        self.passos = RoteadorComponentes()
+        self.passos.registrar(BOTAO_NICK, self._abrir_modal_nick)
+        self.passos.registrar(SELECT_ORIGEM, self._selecionar_origem)
+        self.passos.registrar(BOTAO_NORMAL, lambda inter, user_id: self.processar_prioridade(inter, user_id, "NORMAL"))
+        self.passos.registrar(BOTAO_ALTA, lambda inter, user_id: self.processar_prioridade(inter, user_id, "ALTA"))
+        self.passos.registrar(BOTAO_VALOR, self._abrir_modal_valor)
+        self.passos.registrar(BOTAO_OBS, self._abrir_modal_obs)
+    
+    async def cog_load(self):
+        # Retoma tickets em andamento antes do reinício
+        await self.sessions.recarregar()
     
     @commands.Cog.listener()
     async def on_ready(self):
-        print("✅ Cog Transport Flow carregado")
-        
-        # Restaura contador
-        conn = db.get_connection()
-        cursor = db.get_wrapped_cursor(conn)
-        cursor.execute("SELECT COUNT(*) FROM transportes")
-        self.ticket_counter = cursor.fetchone()[0]
-        conn.close()
+        log.info("✅ Cog Transport Flow carregado")
+    
+    @commands.Cog.listener()
+    async def on_button_click(self, interaction):
+        """Despacha os passos do assistente pelo custom_id (a sessão vem do SessionStore)"""
+        rota = self.passos.resolver(interaction.data.get("custom_id"))
+        if rota is None:
+            return
+        handler, user_id = rota
+        try:
+            await handler(interaction, user_id)
+        except Exception:
+            log.exception("❌ Erro no passo %s", interaction.data.get("custom_id"))
+    
+    async def _abrir_modal_nick(self, inter, user_id):
+        log.debug("✅ Botão de nick clicado (user_id=%s)", user_id)
+        await inter.response.send_modal(ModalNick(lambda i, n: self.processar_nick(i, user_id, n)))
+    
+    async def _selecionar_origem(self, inter, user_id):
+        origem = inter.data["values"][0]
+        log.debug("✅ Select clicado: %s", origem)
+        await self.processar_origem(inter, user_id, origem)
+    
+    async def _abrir_modal_valor(self, inter, user_id):
+        await inter.response.send_modal(ModalValor(lambda i, v: self.processar_valor(i, user_id, v)))
+    
+    async def _abrir_modal_obs(self, inter, user_id):
+        await inter.response.send_modal(ModalObs(lambda i, o: self.processar_observacoes(i, user_id, o)))
     
     async def abrir_ticket(self, interaction: discord.Interaction):
         """Abre novo ticket - FASE 1"""
         
-        print(f"\n🔄 [ABRIR_TICKET] Iniciado por {interaction.user.name}")
+        vincular_interacao(interaction)
+        log.debug("🔄 [ABRIR_TICKET] Iniciado por %s", interaction.user.name)
         
         try:
             # Defer imediatamente
-            print(f"   ⏳ Fazendo defer da interação...")
             await interaction.response.defer(ephemeral=True)
-            print(f"   ✅ Defer feito")
+            log.debug("✅ Defer feito")
             
             # Cria cliente
-            print(f"   ⏳ Criando cliente...")
-            cliente = db.get_or_create_cliente(
+            cliente = await adb.get_or_create_cliente(
                 str(interaction.user.id),
                 interaction.user.name
             )
-            print(f"   ✅ Cliente criado: {cliente['id']}")
+            log.debug("✅ Cliente criado: %s", cliente['id'])
             
             # Gera número
-            self.ticket_counter += 1
-            numero_ticket = 1000 + self.ticket_counter
-            print(f"   ✅ Ticket gerado: #{numero_ticket:04d}")
+            numero_ticket = await adb.next_ticket_number()
+            vincular(ticket=numero_ticket)
+            log.debug("✅ Ticket gerado: #%04d", numero_ticket)
             
             # Cria canal privado
-            print(f"   ⏳ Criando canal privado...")
             guild = interaction.guild
-            user_role = interaction.user
-            
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                user_role: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            }
-            
-            # Adiciona staff
-            for member in guild.members:
-                if any(r.name.startswith("💼") or r.name.startswith("👑") for r in member.roles):
-                    overwrites[member] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-            
-            canal = await guild.create_text_channel(
+            # Overwrites por cargo de staff, dentro da categoria de tickets
+            canal = await canais.criar_ticket(
+                guild,
+                interaction.user,
                 name=f"ticket-{numero_ticket:04d}",
-                category=None,
-                overwrites=overwrites,
                 topic=f"Ticket #{numero_ticket:04d} | {interaction.user.name}"
             )
-            print(f"   ✅ Canal criado: {canal.mention}")
+            log.debug("✅ Canal criado: %s", canal.mention)
             
             # Inicializa sessão
-            self.sessions[interaction.user.id] = {
-                'numero_ticket': numero_ticket,
-                'canal_id': canal.id,
-                'cliente_id': cliente['id'],
-                'status': 'COLETANDO_NICK',
-                'nick_jogo': None,
-                'origem': None,
-                'prioridade': None,
-                'valor': None,
-                'obs': None,
-                'transporte_id': None,
-                'comprovante_url': None
-            }
-            print(f"   ✅ Sessão inicializada")
+            self.sessions.criar(
+                interaction.user.id,
+                numero_ticket=numero_ticket,
+                canal_id=canal.id,
+                cliente_id=cliente['id'],
+                status='COLETANDO_NICK'
+            )
+            log.debug("✅ Sessão inicializada")
             
             # Responde ao usuário
-            print(f"   ⏳ Enviando resposta...")
             embed = discord.Embed(
                 title=f"🎫 TICKET #{numero_ticket:04d} ABERTO",
                 description="Seu canal privado foi criado!",
@@ -183,10 +204,9 @@ class TransportFlowCog(commands.Cog):
             embed.set_footer(text=f"Ticket criado | Próximo passo: Seu nick no jogo")
             
             await interaction.followup.send(embed=embed, ephemeral=True)
-            print(f"   ✅ Resposta enviada")
+            log.debug("✅ Resposta enviada")
             
             # Envia no canal
-            print(f"   ⏳ Enviando mensagem de boas-vindas...")
             embed_welcome = discord.Embed(
                 title="🎉 Bem-vindo ao T.A.S Mania!",
                 description="Vamos processar seu transporte passo a passo\n\n🎯 **WHADAWEL** aqui garantindo segurança!",
@@ -199,19 +219,16 @@ class TransportFlowCog(commands.Cog):
             )
             embed_welcome.set_footer(text="WHADAWEL Transportes™")
             await canal.send(f"{interaction.user.mention}", embed=embed_welcome)
-            print(f"   ✅ Mensagem de boas-vindas enviada")
+            log.debug("✅ Mensagem de boas-vindas enviada")
             
             # Pede nick
-            print(f"   ⏳ Iniciando fase de coleta de nick...")
             await self.pedir_nick(interaction.user.id, canal)
-            print(f"   ✅ Fase de nick iniciada")
+            log.debug("✅ Fase de nick iniciada")
             
-            print(f"\n✅ [ABRIR_TICKET] Concluído com sucesso para {interaction.user.name}\n")
+            log.info("✅ [ABRIR_TICKET] Ticket #%04d aberto para %s", numero_ticket, interaction.user.name)
             
         except Exception as e:
-            print(f"\n❌ [ABRIR_TICKET] Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ [ABRIR_TICKET] Erro")
             
             # Tenta enviar mensagem de erro
             try:
@@ -231,7 +248,7 @@ class TransportFlowCog(commands.Cog):
     async def pedir_nick(self, user_id, canal):
         """FASE 1: Pergunta Nick do Jogador"""
         
-        print(f"\n📝 [PEDIR_NICK] Abrindo para user_id={user_id}")
+        log.debug("📝 [PEDIR_NICK] Abrindo para user_id=%s", user_id)
         
         embed = discord.Embed(
             title="🎮 Qual é seu Nick no Jogo?",
@@ -245,42 +262,27 @@ class TransportFlowCog(commands.Cog):
         )
         embed.set_footer(text="✅ WHADAWEL: Vamos cuidar bem dos seus itens!")
         
-        view = discord.ui.View()
-        
-        async def abrir_modal(inter):
-            print(f"   ✅ Botão clicado por {inter.user.name}")
-            print(f"   Abrindo modal com user_id={user_id}")
-            await inter.response.send_modal(ModalNick(lambda i, n: self.processar_nick(i, user_id, n)))
-        
-        btn = discord.ui.Button(
-            label="📝 Inserir Nick",
-            style=discord.ButtonStyle.primary
-        )
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
-        print(f"✅ [PEDIR_NICK] Mensagem enviada\n")
+        await canal.send(embed=embed, view=view_estatica(BOTAO_NICK.item(user_id)))
+        log.debug("✅ [PEDIR_NICK] Mensagem enviada")
     
     async def processar_nick(self, interaction, user_id, nick):
         """Processa nick e vai para FASE 2"""
         
-        print(f"\n📝 [PROCESSAR_NICK] Iniciado por {interaction.user.name}")
-        print(f"   Nick inserido: {nick}")
+        log.debug("📝 [PROCESSAR_NICK] Nick inserido: %s", nick)
         
         try:
             # Já foi feito defer no on_submit, apenas usar followup
-            print(f"   ✅ Usando followup (defer já foi feito no modal)")
             
             session = self.sessions.get(user_id)
             if not session:
-                print(f"   ❌ Sessão não encontrada!")
+                log.warning("❌ Sessão não encontrada!")
                 await interaction.followup.send("❌ Sessão expirou", ephemeral=True)
                 return
+            vincular(ticket=session['numero_ticket'])
             
             session['nick_jogo'] = nick
             session['status'] = 'COLETANDO_ORIGEM'
-            print(f"   ✅ Nick salvo na sessão: {nick}")
+            log.debug("✅ Nick salvo na sessão: %s", nick)
             
             embed = discord.Embed(
                 title="✅ Nick Confirmado",
@@ -289,21 +291,19 @@ class TransportFlowCog(commands.Cog):
             )
             embed.set_footer(text="✅ WHADAWEL aprova!")
             await interaction.followup.send(embed=embed, ephemeral=True)
-            print(f"   ✅ Resposta enviada")
+            log.debug("✅ Resposta enviada")
             
             canal = self.bot.get_channel(session['canal_id'])
             if canal:
                 await self.pedir_origem(user_id, canal)
-                print(f"   ✅ Origem solicitada")
+                log.debug("✅ Origem solicitada")
             else:
-                print(f"   ❌ Canal não encontrado!")
+                log.warning("❌ Canal não encontrado!")
             
-            print(f"✅ [PROCESSAR_NICK] Concluído\n")
+            log.debug("✅ [PROCESSAR_NICK] Concluído")
             
         except Exception as e:
-            print(f"\n❌ [PROCESSAR_NICK] Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ [PROCESSAR_NICK] Erro")
             
             try:
                 await interaction.followup.send(
@@ -316,7 +316,7 @@ class TransportFlowCog(commands.Cog):
     async def pedir_origem(self, user_id, canal):
         """FASE 2: Pergunta Origem"""
         
-        print(f"\n📍 [PEDIR_ORIGEM] Iniciando para user_id={user_id}")
+        log.debug("📍 [PEDIR_ORIGEM] Iniciando para user_id=%s", user_id)
         
         embed = discord.Embed(
             title="📍 De Qual Cidade Você Quer Transportar?",
@@ -324,47 +324,28 @@ class TransportFlowCog(commands.Cog):
             color=0x3498DB
         )
         
-        class SelectOrigem(discord.ui.Select):
-            def __init__(self, callback):
-                options = [discord.SelectOption(label=o, value=o, emoji="📍") for o in ORIGENS]
-                super().__init__(
-                    placeholder="Selecione...",
-                    min_values=1,
-                    max_values=1,
-                    options=options
-                )
-                self.cb = callback
-            
-            async def callback(self, inter: discord.Interaction):
-                print(f"   ✅ Select clicado: {self.values[0]}")
-                await self.cb(inter, self.values[0])
-        
-        view = discord.ui.View()
-        view.add_item(SelectOrigem(lambda i, o: self.processar_origem(i, user_id, o)))
-        
-        await canal.send(embed=embed, view=view)
-        print(f"✅ [PEDIR_ORIGEM] Enviado\n")
+        await canal.send(embed=embed, view=view_estatica(SELECT_ORIGEM.item(user_id)))
+        log.debug("✅ [PEDIR_ORIGEM] Enviado")
     
     async def processar_origem(self, interaction, user_id, origem):
         """Processa origem e vai para FASE 3"""
         
-        print(f"\n🌍 [PROCESSAR_ORIGEM] Iniciado")
-        print(f"   Origem: {origem}")
-        print(f"   User: {interaction.user.name}")
+        log.debug("🌍 [PROCESSAR_ORIGEM] Origem: %s", origem)
         
         try:
             await interaction.response.defer(ephemeral=True)
-            print(f"   ✅ Defer feito")
+            log.debug("✅ Defer feito")
             
             session = self.sessions.get(user_id)
             if not session:
-                print(f"   ❌ Sessão não encontrada!")
+                log.warning("❌ Sessão não encontrada!")
                 await interaction.followup.send("❌ Sessão expirou", ephemeral=True)
                 return
+            vincular(ticket=session['numero_ticket'])
             
             session['origem'] = origem
             session['status'] = 'COLETANDO_PRIORIDADE'
-            print(f"   ✅ Origem salva: {origem}")
+            log.debug("✅ Origem salva: %s", origem)
             
             # Resposta ao cliente
             embed = discord.Embed(
@@ -374,22 +355,20 @@ class TransportFlowCog(commands.Cog):
             )
             embed.set_footer(text="✅ WHADAWEL aprova!")
             await interaction.followup.send(embed=embed, ephemeral=True)
-            print(f"   ✅ Resposta enviada ao cliente")
+            log.debug("✅ Resposta enviada ao cliente")
             
             # Próxima fase
             canal = self.bot.get_channel(session['canal_id'])
             if canal:
                 await self.pedir_prioridade(user_id, canal)
-                print(f"   ✅ Prioridade solicitada")
+                log.debug("✅ Prioridade solicitada")
             else:
-                print(f"   ❌ Canal não encontrado!")
+                log.warning("❌ Canal não encontrado!")
             
-            print(f"✅ [PROCESSAR_ORIGEM] Concluído\n")
+            log.debug("✅ [PROCESSAR_ORIGEM] Concluído")
             
         except Exception as e:
-            print(f"\n❌ [PROCESSAR_ORIGEM] Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ [PROCESSAR_ORIGEM] Erro")
             
             try:
                 await interaction.followup.send(
@@ -415,7 +394,7 @@ class TransportFlowCog(commands.Cog):
     async def pedir_prioridade(self, user_id, canal):
         """FASE 3: Pergunta Prioridade"""
         
-        print(f"\n⚡ [PEDIR_PRIORIDADE] Iniciando para user_id={user_id}")
+        log.debug("⚡ [PEDIR_PRIORIDADE] Iniciando para user_id=%s", user_id)
         
         embed = discord.Embed(
             title="⚡ Qual é a Prioridade?",
@@ -433,47 +412,28 @@ class TransportFlowCog(commands.Cog):
         )
         embed.set_footer(text="✅ WHADAWEL garante agilidade!")
         
-        view = discord.ui.View()
-        
-        async def callback_normal(inter):
-            print(f"   ✅ Botão NORMAL clicado")
-            await self.processar_prioridade(inter, user_id, "NORMAL")
-        
-        async def callback_alta(inter):
-            print(f"   ✅ Botão ALTA clicado")
-            await self.processar_prioridade(inter, user_id, "ALTA")
-        
-        btn_normal = discord.ui.Button(label="🕒 Normal", style=discord.ButtonStyle.gray)
-        btn_alta = discord.ui.Button(label="⚡ Alta (+20%)", style=discord.ButtonStyle.danger)
-        
-        btn_normal.callback = callback_normal
-        btn_alta.callback = callback_alta
-        
-        view.add_item(btn_normal)
-        view.add_item(btn_alta)
-        
-        await canal.send(embed=embed, view=view)
-        print(f"✅ [PEDIR_PRIORIDADE] Enviado\n")
+        await canal.send(embed=embed, view=view_estatica(BOTAO_NORMAL.item(user_id), BOTAO_ALTA.item(user_id)))
+        log.debug("✅ [PEDIR_PRIORIDADE] Enviado")
     
     async def processar_prioridade(self, inter, user_id, prioridade):
         """Processa prioridade e vai para FASE 4"""
         
-        print(f"\n⚡ [PROCESSAR_PRIORIDADE] Iniciado")
-        print(f"   Prioridade: {prioridade}")
+        log.debug("⚡ [PROCESSAR_PRIORIDADE] Prioridade: %s", prioridade)
         
         try:
             await inter.response.defer(ephemeral=True)
-            print(f"   ✅ Defer feito")
+            log.debug("✅ Defer feito")
             
             session = self.sessions.get(user_id)
             if not session:
-                print(f"   ❌ Sessão não encontrada!")
+                log.warning("❌ Sessão não encontrada!")
                 await inter.followup.send("❌ Sessão expirou", ephemeral=True)
                 return
+            vincular(ticket=session['numero_ticket'])
             
             session['prioridade'] = prioridade
             session['status'] = 'COLETANDO_VALOR'
-            print(f"   ✅ Prioridade salva: {prioridade}")
+            log.debug("✅ Prioridade salva: %s", prioridade)
             
             embed = discord.Embed(
                 title="✅ Prioridade Confirmada",
@@ -482,21 +442,19 @@ class TransportFlowCog(commands.Cog):
             )
             embed.set_footer(text="✅ WHADAWEL aprova!")
             await inter.followup.send(embed=embed, ephemeral=True)
-            print(f"   ✅ Resposta enviada ao cliente")
+            log.debug("✅ Resposta enviada ao cliente")
             
             canal = self.bot.get_channel(session['canal_id'])
             if canal:
                 await self.pedir_valor(user_id, canal)
-                print(f"   ✅ Valor solicitado")
+                log.debug("✅ Valor solicitado")
             else:
-                print(f"   ❌ Canal não encontrado!")
+                log.warning("❌ Canal não encontrado!")
             
-            print(f"✅ [PROCESSAR_PRIORIDADE] Concluído\n")
+            log.debug("✅ [PROCESSAR_PRIORIDADE] Concluído")
             
         except Exception as e:
-            print(f"\n❌ [PROCESSAR_PRIORIDADE] Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ [PROCESSAR_PRIORIDADE] Erro")
             
             try:
                 await inter.followup.send(
@@ -529,16 +487,7 @@ class TransportFlowCog(commands.Cog):
             inline=False
         )
         
-        view = discord.ui.View()
-        
-        async def abrir_modal(inter):
-            await inter.response.send_modal(ModalValor(lambda i, v: self.processar_valor(i, user_id, v)))
-        
-        btn = discord.ui.Button(label="💵 Inserir Valor")
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_VALOR.item(user_id)))
     
     async def processar_valor(self, inter, user_id, valor):
         """Processa valor e vai para FASE 5"""
@@ -592,70 +541,63 @@ class TransportFlowCog(commands.Cog):
             inline=False
         )
         
-        view = discord.ui.View()
-        
-        async def abrir_modal(inter):
-            await inter.response.send_modal(ModalObs(lambda i, o: self.processar_observacoes(i, user_id, o)))
-        
-        btn = discord.ui.Button(label="📝 Adicionar Observações")
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_OBS.item(user_id)))
     
     async def processar_observacoes(self, inter, user_id, obs):
         """Processa observações e envia resumo + pagamento - FASE 6"""
         
-        print(f"\n📝 [PROCESSAR_OBSERVACOES] Iniciado")
-        print(f"   Observações: {obs}")
+        vincular_interacao(inter)
+        log.debug("📝 [PROCESSAR_OBSERVACOES] Observações: %s", obs)
         
         try:
             await inter.response.defer(ephemeral=True)
-            print(f"   ✅ Defer feito")
+            log.debug("✅ Defer feito")
             
             session = self.sessions.get(user_id)
             if not session:
-                print(f"   ❌ Sessão não encontrada!")
+                log.warning("❌ Sessão não encontrada!")
                 await inter.followup.send("❌ Sessão expirou", ephemeral=True)
                 return
             
-            print(f"   ✅ Sessão encontrada")
+            vincular(ticket=session['numero_ticket'])
             
             session['obs'] = obs
             session['status'] = 'AGUARDANDO_PAGAMENTO'
-            print(f"   ✅ Status alterado para AGUARDANDO_PAGAMENTO")
+            log.debug("✅ Status alterado para AGUARDANDO_PAGAMENTO")
             
             # Calcula taxa final
             taxa_final = calcular_taxa_novo(session['valor'], session['prioridade'])
-            print(f"   ✅ Taxa calculada: R$ {taxa_final:.2f}")
+            log.debug("✅ Taxa calculada: R$ %.2f", taxa_final)
             
             # Cria transporte no banco
-            transporte = db.create_transporte(
+            transporte = await adb.create_transporte(
                 cliente_id=session['cliente_id'],
                 origem=session['origem'],
                 valor_estimado=session['valor'],
                 prioridade=session['prioridade'],
                 taxa_final=taxa_final,
-                ticket_channel_id=session['canal_id']
+                ticket_channel_id=session['canal_id'],
+                numero_ticket=session['numero_ticket']
             )
-            print(f"   ✅ Transporte criado: #{transporte['numero_ticket']:04d}")
+            vincular(transporte=transporte['id'])
+            log.info("✅ Transporte criado: #%04d (R$ %.2f)", transporte['numero_ticket'], taxa_final)
             
             session['transporte_id'] = transporte['id']
             
             # Salva nick e obs
-            db.update_transporte(
+            await adb.update_transporte(
                 transporte['id'],
                 notas=f"🎮 Nick: {session['nick_jogo']}\n📝 Obs: {obs}"
             )
-            print(f"   ✅ Dados salvos no banco")
+            log.debug("✅ Dados salvos no banco")
             
             await inter.followup.send("✅ Resumo criado!", ephemeral=True)
-            print(f"   ✅ Resposta enviada ao cliente")
+            log.debug("✅ Resposta enviada ao cliente")
             
             # Envia para o canal
             canal = self.bot.get_channel(session['canal_id'])
             if canal:
-                print(f"   ✅ Enviando resumo e pagamento...")
+                log.debug("✅ Enviando resumo e pagamento...")
                 
                 # Resumo bonito
                 embed_resumo = discord.Embed(
@@ -676,7 +618,7 @@ class TransportFlowCog(commands.Cog):
                 embed_resumo.set_footer(text="🎯 WHADAWEL™ | Transportes Seguros")
                 
                 await canal.send(embed=embed_resumo)
-                print(f"   ✅ Resumo enviado")
+                log.debug("✅ Resumo enviado")
                 
                 # Instruções de pagamento
                 embed_pag = discord.Embed(
@@ -725,7 +667,7 @@ class TransportFlowCog(commands.Cog):
                 
                 async def cancelar(i):
                     await i.response.defer(ephemeral=True)
-                    db.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
+                    await adb.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
                     await i.followup.send("❌ Transporte cancelado", ephemeral=True)
                     await canal.send("❌ Transporte foi cancelado pelo cliente")
                 
@@ -734,7 +676,7 @@ class TransportFlowCog(commands.Cog):
                 
                 # Envia embed de pagamento
                 await canal.send(embed=embed_pag, view=view)
-                print(f"   ✅ Pagamento enviado")
+                log.debug("✅ Pagamento enviado")
                 
                 # Envia QR Code se existir
                 qr_path = Path(PIX_QRCODE_PATH)
@@ -743,18 +685,16 @@ class TransportFlowCog(commands.Cog):
                         "📱 **QR Code PIX:**",
                         file=discord.File(qr_path)
                     )
-                    print(f"   ✅ QR Code enviado")
+                    log.debug("✅ QR Code enviado")
                 
-                print(f"   ✅ Resumo e pagamento completos")
+                log.debug("✅ Resumo e pagamento completos")
             else:
-                print(f"   ❌ Canal não encontrado!")
+                log.warning("❌ Canal não encontrado!")
             
-            print(f"✅ [PROCESSAR_OBSERVACOES] Concluído\n")
+            log.debug("✅ [PROCESSAR_OBSERVACOES] Concluído")
             
         except Exception as e:
-            print(f"\n❌ [PROCESSAR_OBSERVACOES] Erro: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ [PROCESSAR_OBSERVACOES] Erro")
             
             try:
                 await inter.followup.send(
@@ -835,7 +775,7 @@ class TransportFlowCog(commands.Cog):
         
         async def cancelar(i):
             await i.response.defer(ephemeral=True)
-            db.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
+            await adb.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
             await i.followup.send("❌ Transporte cancelado", ephemeral=True)
             await canal.send("❌ Transporte foi cancelado pelo cliente")
         
@@ -15,9 +15,22 @@ Fluxo:
 """
 import discord
 from discord.ext import commands
-from bot.database import db
-from bot.config import PRECO_BASE, VALOR_MINIMO, TAXA_ALTA_PRIORIDADE, PIX_KEY, STATUS, ORIGENS
+from bot.database import adb
+from bot.config import VALOR_MINIMO, PIX_KEY, STATUS, ORIGENS
 from bot.utils.validators import calcular_taxa
+from bot.utils.channels import canais
+from bot.utils.sessions import SessionStore
+from bot.utils.precos import precos
+from bot.utils.componentes import BotaoDinamico, SelectDinamico, RoteadorComponentes, view_estatica
+
+# Passos do assistente: o custom_id leva o user_id do dono do ticket, então um clique
+# depois de reiniciar o bot continua a sessão restaurada (roteados em on_button_click)
+BOTAO_NICK = BotaoDinamico("novo_nick_", "Inserir Nick", discord.ButtonStyle.primary)
+SELECT_ORIGEM = SelectDinamico("novo_origem_", "Selecione a origem...", [discord.SelectOption(label=o, value=o) for o in ORIGENS])
+BOTAO_NORMAL = BotaoDinamico("novo_normal_", "🕒 Normal", discord.ButtonStyle.gray)
+BOTAO_ALTA = BotaoDinamico("novo_alta_", "⚡ Alta (+20%)", discord.ButtonStyle.danger)
+BOTAO_VALOR = BotaoDinamico("novo_valor_", "Inserir Valor", discord.ButtonStyle.secondary)
+BOTAO_OBS = BotaoDinamico("novo_obs_", "Adicionar Observações", discord.ButtonStyle.secondary)
 
 class ModalNick(discord.ui.Modal):
     def __init__(self, callback):
@@ -35,68 +48,118 @@ class ModalNick(discord.ui.Modal):
     async def on_submit(self, interaction: discord.Interaction):
         await self.callback_func(interaction, self.nick_input.value)
 
+class ModalValor(discord.ui.Modal):
+    def __init__(self, cog, user_id):
+        super().__init__(title="Valor", custom_id="modal_valor_transport")
+        self.cog = cog
+        self.user_id = user_id
+        self.valor = discord.ui.TextInput(
+            label="Valor em prata",
+            placeholder="Ex: 18500000",
+            required=True
+        )
+        self.add_item(self.valor)
+    
+    async def on_submit(self, inter: discord.Interaction):
+        try:
+            valor = int(self.valor.value.replace(".", "").replace(",", ""))
+            if valor < VALOR_MINIMO:
+                await inter.response.send_message(
+                    f"❌ Mínimo: {VALOR_MINIMO:,}",
+                    ephemeral=True
+                )
+                return
+            await self.cog.processar_valor(inter, self.user_id, valor)
+        except:
+            await inter.response.send_message(
+                "❌ Valor inválido",
+                ephemeral=True
+            )
+
+class ModalObs(discord.ui.Modal):
+    def __init__(self, cog, user_id):
+        super().__init__(title="Observações", custom_id="modal_obs_transport")
+        self.cog = cog
+        self.user_id = user_id
+        self.obs = discord.ui.TextInput(
+            label="Observações",
+            required=False,
+            max_length=500,
+            style=discord.TextStyle.paragraph
+        )
+        self.add_item(self.obs)
+    
+    async def on_submit(self, inter: discord.Interaction):
+        await self.cog.processar_observacoes(inter, self.user_id, self.obs.value or "Nenhuma")
+
 class TransporteCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.user_sessions = {}
-        self.ticket_counter = 0
+        self.user_sessions = SessionStore("transport_novo")  # user_id → sessão (TTL + limite, salva em `sessoes`)
+        
+        # Todos os handlers recebem (interaction, user_id do dono do ticket)
+        self.passos = RoteadorComponentes()
+        self.passos.registrar(BOTAO_NICK, self._abrir_modal_nick)
+        self.passos.registrar(SELECT_ORIGEM, lambda inter, user_id: self.processar_origem(inter, user_id, inter.data["values"][0]))
+        self.passos.registrar(BOTAO_NORMAL, lambda inter, user_id: self.processar_prioridade(inter, user_id, "NORMAL"))
+        self.passos.registrar(BOTAO_ALTA, lambda inter, user_id: self.processar_prioridade(inter, user_id, "ALTA"))
+        self.passos.registrar(BOTAO_VALOR, lambda inter, user_id: inter.response.send_modal(ModalValor(self, user_id)))
+        self.passos.registrar(BOTAO_OBS, lambda inter, user_id: inter.response.send_modal(ModalObs(self, user_id)))
+    
+    async def cog_load(self):
+        # Retoma tickets em andamento antes do reinício
+        await self.user_sessions.recarregar()
     
     @commands.Cog.listener()
     async def on_ready(self):
         print("✅ Cog Transport (novo fluxo) carregado")
-        
-        # Restaura contador
-        conn = db.get_connection()
-        cursor = db.get_wrapped_cursor(conn)
-        cursor.execute("SELECT COUNT(*) FROM transportes")
-        self.ticket_counter = cursor.fetchone()[0]
-        conn.close()
+    
+    @commands.Cog.listener()
+    async def on_button_click(self, interaction):
+        """Despacha os passos do assistente pelo custom_id (a sessão vem do SessionStore)"""
+        rota = self.passos.resolver(interaction.data.get("custom_id"))
+        if rota is None:
+            return
+        handler, user_id = rota
+        try:
+            await handler(interaction, user_id)
+        except Exception as e:
+            print(f"❌ Erro no passo {interaction.data.get('custom_id')}: {e}")
+    
+    async def _abrir_modal_nick(self, inter, user_id):
+        await inter.response.send_modal(ModalNick(lambda i, nick: self.processar_nick(i, user_id, nick)))
     
     async def abrir_ticket(self, interaction: discord.Interaction):
         """Abre novo ticket e pergunta nick do jogador"""
         
         try:
             # Cria cliente
-            cliente = db.get_or_create_cliente(
+            cliente = await adb.get_or_create_cliente(
                 str(interaction.user.id),
                 interaction.user.name
             )
             
             # Gera número
-            self.ticket_counter += 1
-            numero_ticket = 1000 + self.ticket_counter
+            numero_ticket = await adb.next_ticket_number()
             
             # Cria canal privado
             guild = interaction.guild
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            }
-            
-            # Adiciona staff
-            for member in guild.members:
-                if any(role.name.startswith("💼") or role.name.startswith("👑") for role in member.roles):
-                    overwrites[member] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-            
-            canal_ticket = await guild.create_text_channel(
+            # Overwrites por cargo de staff, dentro da categoria de tickets
+            canal_ticket = await canais.criar_ticket(
+                guild,
+                interaction.user,
                 name=f"ticket-transport-{numero_ticket:04d}",
-                category=None,
-                overwrites=overwrites,
                 topic=f"Ticket #{numero_ticket:04d} | {interaction.user.name}"
             )
             
             # Inicializa sessão
-            self.user_sessions[interaction.user.id] = {
-                'numero_ticket': numero_ticket,
-                'canal_ticket': canal_ticket.id,
-                'cliente_id': cliente['id'],
-                'nick_jogo': None,
-                'origem': None,
-                'prioridade': None,
-                'valor': None,
-                'obs': None,
-                'status': 'COLETANDO_NICK'
-            }
+            self.user_sessions.criar(
+                interaction.user.id,
+                numero_ticket=numero_ticket,
+                canal_ticket=canal_ticket.id,
+                cliente_id=cliente['id'],
+                status='COLETANDO_NICK'
+            )
             
             # Responde ao usuário
             embed_welcome = discord.Embed(
@@ -126,23 +189,8 @@ class TransporteCog(commands.Cog):
             color=0x3498DB
         )
         
-        modal = ModalNick(lambda inter, nick: self.processar_nick(inter, user_id, nick))
-        
-        # Cria um botão para abrir o modal
-        view = discord.ui.View()
-        
-        async def abrir_modal(inter):
-            await inter.response.send_modal(modal)
-        
-        btn = discord.ui.Button(
-            label="Inserir Nick",
-            style=discord.ButtonStyle.primary,
-            custom_id="btn_nick"
-        )
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        # O botão abre o modal (custom_id com o user_id, ver on_button_click)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_NICK.item(user_id)))
     
     async def processar_nick(self, interaction: discord.Interaction, user_id, nick):
         """Processa o nick inserido"""
@@ -177,24 +225,7 @@ class TransporteCog(commands.Cog):
             color=0x3498DB
         )
         
-        class SelectOrigem(discord.ui.Select):
-            def __init__(self, callback):
-                options = [discord.SelectOption(label=o, value=o) for o in ORIGENS]
-                super().__init__(
-                    placeholder="Selecione a origem...",
-                    min_values=1,
-                    max_values=1,
-                    options=options
-                )
-                self.cb = callback
-            
-            async def callback(self, inter: discord.Interaction):
-                await self.cb(inter, self.values[0])
-        
-        view = discord.ui.View()
-        view.add_item(SelectOrigem(lambda inter, orig: self.processar_origem(inter, user_id, orig)))
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(SELECT_ORIGEM.item(user_id)))
     
     async def processar_origem(self, interaction: discord.Interaction, user_id, origem):
         """Processa origem"""
@@ -226,24 +257,7 @@ class TransporteCog(commands.Cog):
             color=0xF39C12
         )
         
-        view = discord.ui.View()
-        
-        async def callback_normal(inter):
-            await self.processar_prioridade(inter, user_id, "NORMAL")
-        
-        async def callback_alta(inter):
-            await self.processar_prioridade(inter, user_id, "ALTA")
-        
-        btn_normal = discord.ui.Button(label="🕒 Normal", style=discord.ButtonStyle.gray)
-        btn_alta = discord.ui.Button(label="⚡ Alta (+20%)", style=discord.ButtonStyle.danger)
-        
-        btn_normal.callback = callback_normal
-        btn_alta.callback = callback_alta
-        
-        view.add_item(btn_normal)
-        view.add_item(btn_alta)
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_NORMAL.item(user_id), BOTAO_ALTA.item(user_id)))
     
     async def processar_prioridade(self, inter, user_id, prioridade):
         """Processa prioridade"""
@@ -273,44 +287,7 @@ class TransporteCog(commands.Cog):
             color=0x3498DB
         )
         
-        view = discord.ui.View()
-        
-        class ModalValor(discord.ui.Modal):
-            def __init__(self, cog, user_id):
-                super().__init__(title="Valor", custom_id="modal_valor_transport")
-                self.cog = cog
-                self.user_id = user_id
-                self.valor = discord.ui.TextInput(
-                    label="Valor em prata",
-                    placeholder="Ex: 18500000",
-                    required=True
-                )
-                self.add_item(self.valor)
-            
-            async def on_submit(self, inter: discord.Interaction):
-                try:
-                    valor = int(self.valor.value.replace(".", "").replace(",", ""))
-                    if valor < VALOR_MINIMO:
-                        await inter.response.send_message(
-                            f"❌ Mínimo: {VALOR_MINIMO:,}",
-                            ephemeral=True
-                        )
-                        return
-                    await self.cog.processar_valor(inter, self.user_id, valor)
-                except:
-                    await inter.response.send_message(
-                        "❌ Valor inválido",
-                        ephemeral=True
-                    )
-        
-        async def abrir_modal(inter):
-            await inter.response.send_modal(ModalValor(self, user_id))
-        
-        btn = discord.ui.Button(label="Inserir Valor")
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_VALOR.item(user_id)))
     
     async def processar_valor(self, inter, user_id, valor):
         """Processa valor"""
@@ -340,32 +317,7 @@ class TransporteCog(commands.Cog):
             color=0x3498DB
         )
         
-        view = discord.ui.View()
-        
-        class ModalObs(discord.ui.Modal):
-            def __init__(self, cog, user_id):
-                super().__init__(title="Observações", custom_id="modal_obs_transport")
-                self.cog = cog
-                self.user_id = user_id
-                self.obs = discord.ui.TextInput(
-                    label="Observações",
-                    required=False,
-                    max_length=500,
-                    style=discord.TextStyle.paragraph
-                )
-                self.add_item(self.obs)
-            
-            async def on_submit(self, inter: discord.Interaction):
-                await self.cog.processar_observacoes(inter, self.user_id, self.obs.value or "Nenhuma")
-        
-        async def abrir_modal(inter):
-            await inter.response.send_modal(ModalObs(self, user_id))
-        
-        btn = discord.ui.Button(label="Adicionar Observações")
-        btn.callback = abrir_modal
-        view.add_item(btn)
-        
-        await canal.send(embed=embed, view=view)
+        await canal.send(embed=embed, view=view_estatica(BOTAO_OBS.item(user_id)))
     
     async def processar_observacoes(self, inter, user_id, obs):
         """Processa observações e envia resumo final"""
@@ -383,24 +335,25 @@ class TransporteCog(commands.Cog):
         taxa = calcular_taxa(
             session['valor'],
             session['prioridade'],
-            PRECO_BASE,
-            TAXA_ALTA_PRIORIDADE
+            precos.atual.preco_base,
+            precos.atual.taxa_alta_prioridade
         )
         
         # Cria transporte no banco
-        transporte = db.create_transporte(
+        transporte = await adb.create_transporte(
             cliente_id=session['cliente_id'],
             origem=session['origem'],
             valor_estimado=session['valor'],
             prioridade=session['prioridade'],
             taxa_final=taxa,
-            ticket_channel_id=session['canal_ticket']
+            ticket_channel_id=session['canal_ticket'],
+            numero_ticket=session['numero_ticket']
         )
         
         session['transporte_id'] = transporte['id']
         
         # Atualiza nick e obs no banco
-        db.update_transporte(
+        await adb.update_transporte(
             transporte['id'],
             notas=f"Nick: {session['nick_jogo']}\nObs: {obs}"
         )
@@ -445,7 +398,7 @@ class TransporteCog(commands.Cog):
             
             async def cancelar(inter):
                 await inter.response.send_message("❌ Transporte cancelado", ephemeral=True)
-                db.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
+                await adb.update_transporte_status(transporte['id'], STATUS["CANCELADO"])
             
             btn_cancelar.callback = cancelar
             view.add_item(btn_cancelar)
@@ -19,14 +19,73 @@ DATABASE_PATH = "./data/tas_mania.db"
 # Prefer DATABASE_URL from environment (Postgres). If not present, fall back to sqlite URL.
 DATABASE_URL = os.getenv("DATABASE_URL") or f"sqlite:///{DATABASE_PATH}"
 
-# Preços (novo sistema)
+# Pool de conexões
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))  # conexões abertas já na inicialização
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))  # limite de conexões simultâneas (Postgres)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # segundos esperando uma conexão livre
+DB_POOL_HEALTHCHECK = float(os.getenv("DB_POOL_HEALTHCHECK", 30))  # ociosidade (s) antes de testar a conexão
+# Das DB_POOL_MAX conexões, quantas podem estar presas em `adb.transaction()` ao mesmo tempo (o resto fica para as chamadas avulsas)
+DB_TRANSACOES_MAX = int(os.getenv("DB_TRANSACOES_MAX", 2))
+
+# Instruções SQL: no Postgres uma query vira prepared statement (por conexão) a partir do N-ésimo uso.
+# 0 desliga (necessário atrás de PgBouncer em modo transaction)
+DB_PREPARAR_APOS = int(os.getenv("DB_PREPARAR_APOS", 3))
+DB_PREPARADAS_MAX = int(os.getenv("DB_PREPARADAS_MAX", 200))  # prepared statements por conexão
+SQLITE_CACHE_INSTRUCOES = int(os.getenv("SQLITE_CACHE_INSTRUCOES", 256))  # statements compilados por conexão SQLite
+
+# SQLite (sem DATABASE_URL): pragmas aplicados em toda conexão. Em WAL as leituras rodam em paralelo
+# com a escrita; synchronous=NORMAL em WAL não corrompe o banco (numa queda de energia perde no máximo
+# os últimos commits). As escritas do processo passam uma de cada vez pela conexão de escrita.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", 256))  # 0 desliga o mmap
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", 32))  # cache de páginas por conexão
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))  # espera pela trava de outro processo
+
+# Latência das queries (registrada sempre): acima de DB_LENTA_MS vai para o log de queries lentas;
+# acima de DB_EXPLAIN_MS (0 = nunca) também guarda o EXPLAIN, no máximo um a cada 10 min por query
+DB_LENTA_MS = float(os.getenv("DB_LENTA_MS", 250))
+DB_EXPLAIN_MS = float(os.getenv("DB_EXPLAIN_MS", 0))
+
+# Cache das contagens por status usadas nos dashboards (segundos)
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", 15))
+
+# Cache de `configuracoes` (Database.get_config): 0 = sem expiração; use > 0 com várias instâncias no mesmo banco
+CONFIG_CACHE_TTL = float(os.getenv("CONFIG_CACHE_TTL", 0))
+
+# Quadro da fila: atualizado por eventos de status, com reconciliação periódica de segurança
+FILA_DEBOUNCE = float(os.getenv("FILA_DEBOUNCE", 2))  # segundos agrupando mudanças em rajada
+FILA_RECONCILIAR = float(os.getenv("FILA_RECONCILIAR", 300))  # segundos entre reconciliações
+
+# Sessões do assistente de ticket (utils/sessions.py)
+SESSAO_TTL = float(os.getenv("SESSAO_TTL", 6 * 3600))  # segundos sem alteração até expirar
+SESSAO_MAX = int(os.getenv("SESSAO_MAX", 2000))  # sessões em memória por cog (acima disso saem as alteradas há mais tempo)
+
+# Logging (utils/log.py): DEBUG mostra o passo a passo dos fluxos; "json" para agregadores de log
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO")
+LOG_FORMATO = os.getenv("LOG_FORMATO", "texto")  # "texto" ou "json"
+
+# Envios ao Discord (utils/outbound.py): chamadas simultâneas entre canais diferentes
+OUTBOUND_CONCORRENCIA = int(os.getenv("OUTBOUND_CONCORRENCIA", 4))
+
+# Validação de imagens (utils/validators.py), feita fora do event loop
+IMAGEM_MAX_MB = float(os.getenv("IMAGEM_MAX_MB", 10))  # tamanho máximo do anexo
+IMAGEM_MAX_PIXELS = int(os.getenv("IMAGEM_MAX_PIXELS", 40_000_000))  # largura x altura máxima
+IMAGEM_WORKERS = int(os.getenv("IMAGEM_WORKERS", 2))  # imagens verificadas ao mesmo tempo
+
+# Comprovantes parecidos: distância de Hamming máxima entre os dHashes 16x16 (256 bits). Só vira aviso "parecido":
+# "já utilizado" exige o mesmo sha256. Candidatos vêm do índice de bandas do dHash 8x8 (garantido até 3 bits lá)
+COMPROVANTE_DISTANCIA_MAX = int(os.getenv("COMPROVANTE_DISTANCIA_MAX", 8))
+
+# Histórico público: entregas mantidas no canal; as mais antigas saem em lotes (bulk delete)
+HISTORICO_PUBLICO_MAX = int(os.getenv("HISTORICO_PUBLICO_MAX", 50))
+HISTORICO_PUBLICO_LOTE = int(os.getenv("HISTORICO_PUBLICO_LOTE", 10))
+
+# Preços (novo sistema): só os padrões. Os valores em vigor (e os derivados preço da alta
+# prioridade e preço base) ficam em `precos.atual` (utils/precos.py), que segue as alterações
 PRECO_POR_MILHAO = 0.6  # R$ 0,60 por 1 milhão de prata
 VALOR_MINIMO = 10_000_000  # 10M prata mínimo
 TAXA_ALTA_PRIORIDADE = 0.20  # +20% para alta prioridade (0,60 → 0,72)
-PRECO_ALTA_PRIORIDADE = PRECO_POR_MILHAO * (1 + TAXA_ALTA_PRIORIDADE)  # 0,72
-
-# Mantém para compatibilidade
-PRECO_BASE = VALOR_MINIMO * PRECO_POR_MILHAO  # R$ 6.00
 
 # PIX
 PIX_KEY = os.getenv("PIX_KEY", "fc22c002-961c-43fa-8177-c86ef47f33a0")
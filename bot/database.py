@@ -5,13 +5,40 @@ Comportamento:
 - Usa `DATABASE_URL` do ambiente (Postgres) se disponível.
 - Caso contrário, usa um arquivo SQLite em `DATABASE_PATH`.
 
-Esta implementação adapta placeholders automaticamente: se estiver usando psycopg2, substitui
-os `?` por `%s` antes de executar queries.
+As queries usam `?` nos dois bancos. No Postgres os cursores traduzem cada texto uma única vez
+(`RegistroSQL`) e, depois de alguns usos, executam a instrução como prepared statement na conexão.
+
+As conexões são reaproveitadas: no Postgres um pool limitado (`ConnectionPool`) e no SQLite
+uma conexão persistente por thread para leitura mais uma conexão única de escrita, usada por
+uma escrita de cada vez em ordem de chegada (`SQLitePool`). `get_connection()` devolve um proxy cujo
+`close()` apenas devolve a conexão ao pool.
+
+Unidade de trabalho: dentro de `with db.transaction():` (ou `async with adb.transaction():`)
+todos os métodos do Database usam a mesma conexão e o commit acontece uma vez, no fim do bloco.
 """
+import asyncio
+import bisect
+import contextvars
+import functools
+import itertools
 import os
+import re
+import select
 import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
-from config import DATABASE_PATH, DATABASE_URL
+from config import (
+    DATABASE_PATH, DATABASE_URL,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_HEALTHCHECK, DB_TRANSACOES_MAX, STATS_CACHE_TTL,
+    DB_PREPARAR_APOS, DB_PREPARADAS_MAX, SQLITE_CACHE_INSTRUCOES, DB_LENTA_MS, DB_EXPLAIN_MS,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_MMAP_MB, SQLITE_CACHE_MB, SQLITE_BUSY_TIMEOUT_MS,
+    CONFIG_CACHE_TTL, COMPROVANTE_DISTANCIA_MAX
+)
+from bot.utils.log import get_logger
 
 USE_POSTGRES = False
 psycopg2 = None
@@ -26,21 +53,832 @@ if DATABASE_URL and DATABASE_URL.startswith("postgres"):
         USE_POSTGRES = False
 
 
-class Row(dict):
-    """Wrapper que permite acessar valores tanto como dict quanto como tuple/list"""
+# Queries lentas e falhas de listeners vão para o logging do bot, com o contexto da task que as executou
+log = get_logger(__name__)
+
+# Transação aberta por `Database.transaction()` na thread atual (None = cada método faz o seu commit)
+_transacao_atual = contextvars.ContextVar("transacao_db", default=None)
+# Executor reservado pela `AsyncDatabase.transaction()` da task atual
+_executor_transacao = contextvars.ContextVar("executor_transacao_db", default=None)
+
+# RETURNING só existe a partir do SQLite 3.35
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class Row:
+    """
+    Linha de resultado: tupla do driver + índice de colunas compartilhado por todas as linhas
+    da mesma query. Aceita `row['status']` e `row[2]`, e `.get/keys/values/items` como um dict.
+    """
+    __slots__ = ("_indice", "_valores")
+
+    def __init__(self, indice, valores):
+        self._indice = indice  # {coluna: posição}, um por query
+        self._valores = valores
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            return self._valores[self._indice[chave]]
+        # Índice numérico (ou fatia): por posição
+        return self._valores[chave]
+
+    def get(self, chave, padrao=None):
+        posicao = self._indice.get(chave)
+        return padrao if posicao is None else self._valores[posicao]
+
+    def keys(self):
+        return self._indice.keys()
+
+    def values(self):
+        return self._valores
+
+    def items(self):
+        return zip(self._indice, self._valores)
+
+    def __iter__(self):
+        # Como o dict de antes: itera pelas colunas
+        return iter(self._indice)
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __contains__(self, chave):
+        return chave in self._indice
+
+    def __eq__(self, outro):
+        if isinstance(outro, Row):
+            return self._indice.keys() == outro._indice.keys() and self._valores == outro._valores
+        if isinstance(outro, dict):
+            return dict(self.items()) == outro
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Row({dict(self.items())!r})"
+
+
+# Literais, identificadores entre aspas e comentários passam intactos; só `?` e `%` fora deles importam
+_RE_TOKENS_SQL = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|\?|%", re.S)
+_PREPARAVEIS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES")
+
+
+def _traduzir_placeholders(sql, estilo):
+    """`?` -> `%s` (psycopg2, escapando `%`) ou `$1..$n` (PREPARE). Devolve (sql, nº de parâmetros)"""
+    total = 0
+
+    def trocar(token):
+        nonlocal total
+        texto = token.group(0)
+        if texto == "?":
+            total += 1
+            return "%s" if estilo == "format" else f"${total}"
+        # psycopg2 interpreta `%` em qualquer parte do texto quando há parâmetros
+        return texto.replace("%", "%%") if estilo == "format" else texto
+
+    return _RE_TOKENS_SQL.sub(trocar, sql), total
+
+
+# Impressão digital: literais viram `?`, espaços colapsam e listas `IN (?, ?, ...)` viram `IN (?...)`
+_RE_LITERAIS_SQL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_RE_LISTA_SQL = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+
+# Limites (ms) dos baldes do histograma de latência; o último balde é "acima de 10s"
+LIMITES_LATENCIA = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def impressao_digital(sql):
+    """Forma normalizada da query, que agrupa variações do mesmo comando"""
+    texto = " ".join(_RE_LITERAIS_SQL.sub("?", sql).split())
+    return _RE_LISTA_SQL.sub("IN (?...)", texto)
+
+
+class EstatisticaSQL:
+    """Contagem, tempo total e histograma de latência de uma impressão digital"""
+    __slots__ = ("digital", "contagem", "erros", "total_ms", "max_ms", "baldes", "plano", "plano_em")
+
+    def __init__(self, digital):
+        self.digital = digital
+        self.contagem = 0
+        self.erros = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.baldes = [0] * (len(LIMITES_LATENCIA) + 1)
+        self.plano = None      # último EXPLAIN capturado
+        self.plano_em = 0.0
+
+    def registrar(self, ms, erro=False):
+        self.contagem += 1
+        self.erros += erro
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.baldes[bisect.bisect_left(LIMITES_LATENCIA, ms)] += 1
+
+    def percentil(self, q):
+        """Estimativa pelo histograma: interpolação linear dentro do balde"""
+        if not self.contagem:
+            return 0.0
+        alvo = q * self.contagem
+        acumulado = 0
+        for i, quantidade in enumerate(self.baldes):
+            if quantidade and acumulado + quantidade >= alvo:
+                inicio = LIMITES_LATENCIA[i - 1] if i else 0.0
+                fim = LIMITES_LATENCIA[i] if i < len(LIMITES_LATENCIA) else self.max_ms
+                return min(inicio + (fim - inicio) * (alvo - acumulado) / quantidade, self.max_ms)
+            acumulado += quantidade
+        return self.max_ms
+
+    def resumo(self):
+        return {
+            "digital": self.digital,
+            "contagem": self.contagem,
+            "erros": self.erros,
+            "total_ms": self.total_ms,
+            "media_ms": self.total_ms / self.contagem if self.contagem else 0.0,
+            "p50_ms": self.percentil(0.50),
+            "p95_ms": self.percentil(0.95),
+            "p99_ms": self.percentil(0.99),
+            "max_ms": self.max_ms,
+            "plano": self.plano,
+        }
+
+
+class Instrucao:
+    """Uma query-fonte já traduzida para o dialeto; `nome` só existe se puder virar prepared statement"""
+    __slots__ = ("texto", "parametros", "nome", "preparo", "execucao", "usos", "estatistica")
+
+    def __init__(self, texto, parametros, nome=None, preparo=None, execucao=None):
+        self.texto = texto
+        self.parametros = parametros
+        self.nome = nome
+        self.preparo = preparo      # PREPARE nome AS ... ($1..$n)
+        self.execucao = execucao    # EXECUTE nome (%s, ...)
+        self.usos = 0
+        self.estatistica = None     # EstatisticaSQL da impressão digital (compartilhada)
+
+
+class RegistroSQL:
+    """
+    Traduções por texto-fonte (feitas uma vez), contadores de compilação e latência por
+    impressão digital.
+
+    `compilacoes` conta quantas vezes o banco precisou analisar/planejar uma query: no Postgres,
+    toda execução direta e cada PREPARE; no SQLite, a primeira execução de cada texto em cada
+    conexão (as seguintes vêm do cache de statements da própria conexão).
+    """
+
+    def __init__(self, postgres, preparar_apos=DB_PREPARAR_APOS, maximo=1000):
+        self.postgres = postgres
+        self.preparar_apos = preparar_apos if postgres else 0
+        self.maximo = maximo  # SQL montado com valores no texto não pode encher o registro
+        self._instrucoes = {}
+        self._estatisticas = {}  # impressão digital -> EstatisticaSQL
+        self._lock = threading.Lock()
+        self._nomes = itertools.count(1)
+        self.stats = {"traducoes": 0, "execucoes": 0, "compilacoes": 0, "preparos": 0, "falhas_preparo": 0}
+
+    def instrucao(self, sql):
+        instrucao = self._instrucoes.get(sql)
+        if instrucao is None:
+            self.stats["traducoes"] += 1
+            instrucao = self._traduzir(sql)
+            instrucao.estatistica = self._estatistica(impressao_digital(sql))
+            if len(self._instrucoes) < self.maximo:
+                self._instrucoes[sql] = instrucao
+        return instrucao
+
+    def _estatistica(self, digital):
+        with self._lock:
+            estatistica = self._estatisticas.get(digital)
+            if estatistica is None:
+                # Acima do limite, digitais novas somam numa entrada só
+                if len(self._estatisticas) >= self.maximo:
+                    digital = "<outras>"
+                    estatistica = self._estatisticas.get(digital)
+                if estatistica is None:
+                    estatistica = self._estatisticas[digital] = EstatisticaSQL(digital)
+            return estatistica
+
+    def top(self, n=10, ordem="total_ms"):
+        """As `n` impressões digitais com maior `ordem` (total_ms, p95_ms, contagem, ...)"""
+        with self._lock:
+            resumos = [estatistica.resumo() for estatistica in self._estatisticas.values() if estatistica.contagem]
+        return sorted(resumos, key=lambda resumo: resumo[ordem], reverse=True)[:n]
+
+    def zerar_latencias(self):
+        with self._lock:
+            for estatistica in self._estatisticas.values():
+                estatistica.__init__(estatistica.digital)
+
+    def _traduzir(self, sql):
+        if not self.postgres:
+            return Instrucao(sql, sql.count("?"))
+        texto, parametros = _traduzir_placeholders(sql, "format")
+        if not self.preparar_apos or not sql.lstrip().upper().startswith(_PREPARAVEIS):
+            return Instrucao(texto, parametros)
+        nome = f"tas_{next(self._nomes)}"
+        corpo, _ = _traduzir_placeholders(sql, "dollar")
+        execucao = f"EXECUTE {nome}" + (" (" + ", ".join(["%s"] * parametros) + ")" if parametros else "")
+        return Instrucao(texto, parametros, nome, f"PREPARE {nome} AS {corpo}", execucao)
+
+    def metricas(self):
+        stats = dict(self.stats)
+        stats["instrucoes"] = len(self._instrucoes)
+        stats["reuso"] = 1 - stats["compilacoes"] / stats["execucoes"] if stats["execucoes"] else 0.0
+        return stats
+
+
+def _redigir(params):
+    """Parâmetros do execute sem os valores (só tipo e tamanho), para o log de queries lentas"""
+    valores = params[0] if params else ()
+    if isinstance(valores, dict):
+        valores = valores.values()
+    partes = [
+        f"{type(valor).__name__}[{len(valor)}]" if isinstance(valor, (str, bytes)) else type(valor).__name__
+        for valor in valores or ()
+    ]
+    return "(" + ", ".join(partes) + ")"
+
+
+class _CursorRows:
+    """
+    Mixin de cursor: fetch* devolvem Row direto das tuplas do driver, sem dict intermediário,
+    e cada execução (execute + fetch) é cronometrada na EstatisticaSQL da sua impressão digital.
+    """
+
+    _indice = None
+    _medicao = None  # [instrucao, ms acumulados, sql, params, erro] da execução em andamento
+    registro = None  # RegistroSQL do Database, atribuído em get_wrapped_cursor
+
+    def execute(self, sql, *params):
+        self._finalizar()
+        instrucao = self.registro.instrucao(sql) if self.registro is not None else None
+        inicio = time.perf_counter()
+        erro = True
+        try:
+            resultado = self._executar(instrucao, sql, *params)
+            erro = False
+        finally:
+            if instrucao is not None:
+                self.registro.stats["execucoes"] += 1
+                self._medicao = [instrucao, (time.perf_counter() - inicio) * 1000, sql, params, erro]
+                if erro:
+                    self._finalizar()
+        descricao = self.description
+        # Colunas repetidas (JOIN): vale a última, como no dict de antes
+        self._indice = {coluna[0]: i for i, coluna in enumerate(descricao)} if descricao else None
+        return resultado
+
+    def _cronometrar(self, busca, *args):
+        if self._medicao is None:
+            return busca(*args)
+        inicio = time.perf_counter()
+        try:
+            return busca(*args)
+        finally:
+            self._medicao[1] += (time.perf_counter() - inicio) * 1000
+
+    def fetchone(self):
+        valores = self._cronometrar(super().fetchone)
+        return None if valores is None else Row(self._indice, valores)
+
+    def fetchmany(self, *args):
+        indice = self._indice
+        return [Row(indice, valores) for valores in self._cronometrar(super().fetchmany, *args)]
+
+    def fetchall(self):
+        indice = self._indice
+        linhas = [Row(indice, valores) for valores in self._cronometrar(super().fetchall)]
+        self._finalizar()
+        return linhas
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+    def _finalizar(self):
+        """Fecha a medição da execução anterior: histograma e, se passou do limite, log de query lenta"""
+        medicao, self._medicao = self._medicao, None
+        if medicao is None:
+            return
+        instrucao, ms, sql, params, erro = medicao
+        estatistica = instrucao.estatistica
+        estatistica.registrar(ms, erro)
+        if ms < DB_LENTA_MS:
+            return
+        if DB_EXPLAIN_MS and ms >= DB_EXPLAIN_MS and not erro and time.monotonic() - estatistica.plano_em > 600:
+            estatistica.plano_em = time.monotonic()
+            estatistica.plano = self._explicar(instrucao, sql, params)
+        log.warning("🐢 Query lenta (%.0f ms): %s params=%s", ms, estatistica.digital, _redigir(params))
+
+    def _explicar(self, instrucao, sql, params):
+        """Plano da query numa conexão já aberta (cursor separado, para não perder o resultado)"""
+        try:
+            cur = self.connection.cursor()
+            try:
+                if isinstance(self, sqlite3.Cursor):
+                    cur.execute("EXPLAIN QUERY PLAN " + sql, *params)
+                    return "\n".join(str(linha[-1]) for linha in cur.fetchall())
+                if instrucao.parametros:
+                    cur.execute("EXPLAIN " + instrucao.texto, *params)
+                else:
+                    cur.execute("EXPLAIN " + sql)
+                return "\n".join(linha[0] for linha in cur.fetchall())
+            finally:
+                cur.close()
+        except Exception as e:
+            return f"(EXPLAIN falhou: {e})"
+
+
+class _ConexaoSQLite(sqlite3.Connection):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._values = list(self.values())
-    
-    def __getitem__(self, key):
-        # Se for índice numérico, retorna o valor por posição
-        if isinstance(key, int):
-            return self._values[key]
-        # Se for string, retorna o valor por chave
-        return super().__getitem__(key)
-    
-    def __repr__(self):
-        return f"Row({dict.__repr__(self)})"
+        self.compiladas = set()  # textos já vistos: estão no cache de statements da conexão
+
+
+class _CursorSQLite(_CursorRows, sqlite3.Cursor):
+    def __init__(self, conn):
+        super().__init__(conn)
+        # A conexão usa sqlite3.Row (para quem pega a conexão crua); aqui queremos tuplas
+        self.row_factory = None
+
+    def _executar(self, instrucao, sql, *params):
+        registro = self.registro
+        if registro is not None:
+            compiladas = getattr(self.connection, "compiladas", None)
+            if compiladas is not None and sql not in compiladas:
+                # O cache do sqlite3 é LRU de SQLITE_CACHE_INSTRUCOES; passou disso, recomeça a conta
+                if len(compiladas) >= SQLITE_CACHE_INSTRUCOES:
+                    compiladas.clear()
+                compiladas.add(sql)
+                registro.stats["compilacoes"] += 1
+        return sqlite3.Cursor.execute(self, sql, *params)
+
+
+_SEM_TRANSACAO_VALIDA = "25P02"   # in_failed_sql_transaction
+_PREPARADA_INEXISTENTE = "26000"  # invalid_sql_statement_name
+
+
+class _PreparoPostgres:
+    """
+    Mixin do cursor Postgres: a partir do `preparar_apos`-ésimo uso numa conexão a query vira
+    PREPARE/EXECUTE. `_direto(sql, argumentos)` é o execute do driver, sem tradução.
+    """
+
+    def _executar(self, instrucao, sql, *params):
+        if instrucao is None:
+            return self._direto(sql, *params)
+
+        if instrucao.parametros:
+            texto, argumentos = instrucao.texto, (params[0] if params else None)
+        else:
+            # Sem argumentos o psycopg2 não interpreta `%`: vai o texto original
+            texto, argumentos = sql, None
+
+        if instrucao.nome and self._preparada(instrucao):
+            try:
+                return self._direto(instrucao.execucao, argumentos)
+            except psycopg2.Error as e:
+                if e.pgcode == _PREPARADA_INEXISTENTE:
+                    # Sessão reiniciada por fora (DISCARD ALL, pooler): prepara de novo no próximo uso
+                    self.connection.preparadas.clear()
+                raise
+
+        self.registro.stats["compilacoes"] += 1
+        return self._direto(texto, argumentos)
+
+    def _preparada(self, instrucao):
+        """True se `instrucao` já está (ou acabou de ser) preparada nesta conexão"""
+        conn = self.connection
+        preparadas = getattr(conn, "preparadas", None)
+        if preparadas is None:
+            return False
+        if instrucao.nome in preparadas:
+            return True
+        instrucao.usos += 1
+        if instrucao.usos < self.registro.preparar_apos or len(preparadas) >= DB_PREPARADAS_MAX:
+            return False
+
+        # Savepoint: um PREPARE que falha (tipo de parâmetro ambíguo, ...) não aborta a transação
+        protegido = not conn.autocommit
+        try:
+            if protegido:
+                self._direto("SAVEPOINT tas_preparo")
+            self._direto(instrucao.preparo)
+            if protegido:
+                self._direto("RELEASE SAVEPOINT tas_preparo")
+        except psycopg2.Error as e:
+            if e.pgcode == _SEM_TRANSACAO_VALIDA:
+                raise
+            if protegido:
+                self._direto("ROLLBACK TO SAVEPOINT tas_preparo")
+                self._direto("RELEASE SAVEPOINT tas_preparo")
+            instrucao.nome = None  # essa query segue sempre pelo caminho direto
+            self.registro.stats["falhas_preparo"] += 1
+            return False
+        preparadas.add(instrucao.nome)
+        self.registro.stats["preparos"] += 1
+        self.registro.stats["compilacoes"] += 1
+        return True
+
+
+if psycopg2 is not None:
+    class _ConexaoPostgres(psycopg2.extensions.connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.preparadas = set()  # nomes com PREPARE feito nesta sessão
+
+    class _CursorPostgres(_PreparoPostgres, _CursorRows, psycopg2.extensions.cursor):
+        def _direto(self, sql, argumentos=None):
+            return psycopg2.extensions.cursor.execute(self, sql, argumentos)
+
+        def executemany(self, sql, seq):
+            return psycopg2.extensions.cursor.executemany(self, self.registro.instrucao(sql).texto if self.registro else sql, seq)
+
+
+# Migrações versionadas: (versão, descrição, comandos). Cada uma roda uma única vez e fica
+# registrada em schema_migrations. Um comando pode ser SQL comum ou um dict por dialeto
+# ({"postgres": ..., "sqlite": ...}). Não edite migrações já publicadas: acrescente uma nova.
+MIGRATIONS = [
+    (1, "Índices das colunas de busca de transportes", [
+        # get_transportes_por_status (fila): status IN (...) ORDER BY prioridade, data_criacao
+        "CREATE INDEX IF NOT EXISTS idx_transportes_status_prioridade_data ON transportes (status, prioridade, data_criacao)",
+        # get_transportes_by_status: status = ? ORDER BY data_criacao
+        "CREATE INDEX IF NOT EXISTS idx_transportes_status_data ON transportes (status, data_criacao)",
+        # get_transportes_cliente: cliente_id = ? ORDER BY data_criacao
+        "CREATE INDEX IF NOT EXISTS idx_transportes_cliente_data ON transportes (cliente_id, data_criacao)",
+        "CREATE INDEX IF NOT EXISTS idx_transportes_ticket_channel ON transportes (ticket_channel_id)",
+        # get_all_transportes: ORDER BY data_criacao
+        "CREATE INDEX IF NOT EXISTS idx_transportes_data_criacao ON transportes (data_criacao)",
+    ]),
+    (2, "Sequência de números de ticket", [
+        # Postgres: sequence nativa; SQLite: linha contadora incrementada atomicamente
+        {"postgres": "CREATE SEQUENCE IF NOT EXISTS ticket_numero_seq"},
+        {"postgres": "SELECT setval('ticket_numero_seq', (SELECT GREATEST(COALESCE(MAX(numero_ticket), 1000), 1000) FROM transportes))"},
+        {"sqlite": "CREATE TABLE IF NOT EXISTS sequencias (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)"},
+        {"sqlite": "INSERT OR IGNORE INTO sequencias (nome, valor) SELECT 'ticket', MAX(COALESCE(MAX(numero_ticket), 1000), 1000) FROM transportes"},
+    ]),
+    (3, "Sessões do assistente de ticket", [
+        # dados = JSON da sessão; atualizada_em = epoch (s) da última alteração, usado no TTL
+        """CREATE TABLE IF NOT EXISTS sessoes (
+            namespace TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            dados TEXT NOT NULL,
+            atualizada_em REAL NOT NULL,
+            PRIMARY KEY (namespace, user_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_sessoes_atualizada_em ON sessoes (atualizada_em)",
+    ]),
+    (4, "Índice de comprovantes (hash exato e perceptual)", [
+        # dhash = hash perceptual de 64 bits (com sinal); banda0..3 = seus 4 blocos de 16 bits
+        {"postgres": "CREATE TABLE IF NOT EXISTS comprovantes (id SERIAL PRIMARY KEY, "
+                     "transporte_id INTEGER, numero_ticket INTEGER, sha256 TEXT NOT NULL, dhash BIGINT NOT NULL, "
+                     "banda0 INTEGER NOT NULL, banda1 INTEGER NOT NULL, banda2 INTEGER NOT NULL, banda3 INTEGER NOT NULL, "
+                     "mensagem_url TEXT, criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"},
+        {"sqlite": "CREATE TABLE IF NOT EXISTS comprovantes (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                   "transporte_id INTEGER, numero_ticket INTEGER, sha256 TEXT NOT NULL, dhash INTEGER NOT NULL, "
+                   "banda0 INTEGER NOT NULL, banda1 INTEGER NOT NULL, banda2 INTEGER NOT NULL, banda3 INTEGER NOT NULL, "
+                   "mensagem_url TEXT, criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"},
+        "CREATE INDEX IF NOT EXISTS idx_comprovantes_sha256 ON comprovantes (sha256)",
+        "CREATE INDEX IF NOT EXISTS idx_comprovantes_banda0 ON comprovantes (banda0)",
+        "CREATE INDEX IF NOT EXISTS idx_comprovantes_banda1 ON comprovantes (banda1)",
+        "CREATE INDEX IF NOT EXISTS idx_comprovantes_banda2 ON comprovantes (banda2)",
+        "CREATE INDEX IF NOT EXISTS idx_comprovantes_banda3 ON comprovantes (banda3)",
+    ]),
+    (5, "Livro-caixa financeiro", [
+        # Antes criadas pelo cog financeiro; financeiro_transacoes é só-inserção e
+        # financeiro_saldo (linha id = 1) é o saldo materializado, mantido por incrementos
+        {"postgres": "CREATE TABLE IF NOT EXISTS financeiro_transacoes (id SERIAL PRIMARY KEY, tipo TEXT, descricao TEXT, "
+                     "valor REAL, motivo TEXT, autor_id BIGINT, data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"},
+        {"sqlite": "CREATE TABLE IF NOT EXISTS financeiro_transacoes (id INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT, descricao TEXT, "
+                   "valor REAL, motivo TEXT, autor_id INTEGER, data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"},
+        """CREATE TABLE IF NOT EXISTS financeiro_saldo (
+            id INTEGER PRIMARY KEY,
+            saldo_total REAL DEFAULT 0,
+            saldo_entrada REAL DEFAULT 0,
+            saldo_saida REAL DEFAULT 0,
+            ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "INSERT INTO financeiro_saldo (id, saldo_total, saldo_entrada, saldo_saida) VALUES (1, 0, 0, 0) ON CONFLICT (id) DO NOTHING",
+        # IDs do Discord não cabem em INTEGER no Postgres (tabelas criadas pela versão antiga do cog)
+        {"postgres": "ALTER TABLE financeiro_transacoes ALTER COLUMN autor_id TYPE BIGINT"},
+    ]),
+    (6, "Índice para paginação de transportes por status", [
+        # get_transportes_pagina: status = ? AND id < ? ORDER BY id DESC LIMIT ? (uma por status)
+        "CREATE INDEX IF NOT EXISTS idx_transportes_status_id ON transportes (status, id)",
+    ]),
+    (7, "Índice das mensagens do histórico público", [
+        # clear_log_message_ids: message_id = ? ao apagar as entregas mais antigas do canal
+        "CREATE INDEX IF NOT EXISTS idx_log_transportes_message_id ON log_transportes (message_id)",
+    ]),
+    (8, "dHash 16x16 dos comprovantes", [
+        # 256 bits em hex: o dHash 8x8 não separa comprovantes diferentes do mesmo modelo de banco
+        "ALTER TABLE comprovantes ADD COLUMN dhash16 TEXT",
+    ]),
+    (9, "Status de transportes em maiúsculas", [
+        # Linhas antigas gravaram 'concluido'/'CONCLUIDO': contagens e páginas passam a usar o mesmo status = ?
+        "UPDATE transportes SET status = UPPER(status) WHERE status <> UPPER(status)",
+    ]),
+]
+
+
+def _dhash_com_sinal(dhash):
+    """dHash de 64 bits sem sinal -> inteiro que cabe em BIGINT/INTEGER"""
+    return dhash - (1 << 64) if dhash >= (1 << 63) else dhash
+
+
+def _bandas_dhash(dhash):
+    """Os 4 blocos de 16 bits do dHash: dois hashes a até 3 bits de distância têm ao menos um bloco igual"""
+    dhash &= (1 << 64) - 1
+    return tuple((dhash >> (16 * i)) & 0xFFFF for i in range(4))
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão ficou livre dentro do timeout de checkout"""
+
+
+class ConnectionPool:
+    """Pool limitado de conexões psycopg2 com timeout de checkout e health-check"""
+
+    def __init__(self, dsn, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX,
+                 timeout=DB_POOL_TIMEOUT, healthcheck=DB_POOL_HEALTHCHECK):
+        self.dsn = dsn
+        self.maxconn = max(1, maxconn)
+        self.timeout = timeout
+        self.healthcheck = healthcheck
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conexão, instante em que voltou ao pool)
+        self._total = 0
+        self.stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "reconnects": 0}
+
+        for _ in range(min(minconn, self.maxconn)):
+            self._idle.append((self._conectar(), time.monotonic()))
+            self._total += 1
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        esperou = False
+        with self._cond:
+            self.stats["checkouts"] += 1
+            while True:
+                if self._idle:
+                    conn, devolvida_em = self._idle.pop()
+                    break
+                if self._total < self.maxconn:
+                    self._total += 1
+                    conn = None
+                    break
+                if not esperou:
+                    self.stats["waits"] += 1
+                    esperou = True
+                restante = deadline - time.monotonic()
+                if restante <= 0:
+                    self.stats["timeouts"] += 1
+                    raise PoolTimeout(f"Nenhuma conexão livre em {self.timeout}s (máx {self.maxconn})")
+                self._cond.wait(restante)
+
+        try:
+            if conn is None:
+                return self._conectar()
+            if conn.closed or (time.monotonic() - devolvida_em > self.healthcheck and not self._saudavel(conn)):
+                self._fechar(conn)
+                conn = self._conectar()
+                with self._cond:
+                    self.stats["reconnects"] += 1
+            return conn
+        except Exception:
+            self._descartar()
+            raise
+
+    def release(self, conn):
+        if conn.closed:
+            self._descartar()
+            return
+        try:
+            # Não deixa transação aberta (ou abortada) para o próximo usuário
+            if conn.status != psycopg2.extensions.STATUS_READY:
+                conn.rollback()
+        except Exception:
+            self._fechar(conn)
+            self._descartar()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                self._fechar(self._idle.pop()[0])
+                self._total -= 1
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                **self.stats,
+                "size": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+                "max": self.maxconn,
+            }
+
+    def _conectar(self):
+        return psycopg2.connect(self.dsn, connection_factory=_ConexaoPostgres)
+
+    def _saudavel(self, conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _descartar(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class FilaEscrita:
+    """
+    Vez na conexão de escrita do SQLite: uma thread de cada vez, na ordem de chegada
+    (threading.Lock não garante ordem).
+    """
+
+    def __init__(self, timeout=DB_POOL_TIMEOUT):
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._esperando = deque()
+        self._dono = None
+        self.stats = {"writes": 0, "write_waits": 0, "write_timeouts": 0, "write_wait_max_ms": 0.0}
+
+    def na_vez(self):
+        """True se a thread atual está com a vez de escrever"""
+        return self._dono == threading.get_ident()
+
+    def entrar(self):
+        eu = threading.get_ident()
+        with self._cond:
+            self.stats["writes"] += 1
+            if self._dono is not None or self._esperando:
+                self.stats["write_waits"] += 1
+                inicio = time.perf_counter()
+                self._esperando.append(eu)
+                livre = self._cond.wait_for(lambda: self._dono is None and self._esperando[0] == eu, self.timeout)
+                self._esperando.remove(eu)
+                if not livre:
+                    self.stats["write_timeouts"] += 1
+                    self._cond.notify_all()
+                    raise PoolTimeout(f"Nenhuma vez de escrita no SQLite em {self.timeout:.0f}s ({len(self._esperando)} na fila)")
+                espera = (time.perf_counter() - inicio) * 1000
+                self.stats["write_wait_max_ms"] = round(max(self.stats["write_wait_max_ms"], espera), 1)
+            self._dono = eu
+
+    def sair(self):
+        with self._cond:
+            self._dono = None
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {**self.stats, "write_queue": len(self._esperando)}
+
+
+class SQLitePool:
+    """
+    Conexões SQLite (mesma interface do ConnectionPool). Leituras: uma conexão persistente por
+    thread, em paralelo (WAL). Escritas: `escrita()` entrega a conexão de escrita, única no
+    processo, a uma thread de cada vez (FilaEscrita) já com BEGIN IMMEDIATE.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conexoes = []
+        self._lock = threading.Lock()
+        self._escritor = None
+        self.fila = FilaEscrita()
+        self.stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "reconnects": 0}
+
+    def _abrir(self, **kwargs):
+        # Conexão persistente: o cache de statements do sqlite3 vale por toda a vida dela
+        conn = sqlite3.connect(
+            self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, factory=_ConexaoSQLite,
+            cached_statements=SQLITE_CACHE_INSTRUCOES, **kwargs
+        )
+        conn.row_factory = sqlite3.Row
+        modo = conn.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}").fetchone()[0]
+        if modo.upper() != SQLITE_JOURNAL_MODE.upper():
+            log.warning("SQLite recusou journal_mode=%s (ficou %s)", SQLITE_JOURNAL_MODE, modo)
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_MB * 1024 * 1024}")
+        conn.execute(f"PRAGMA cache_size = {-SQLITE_CACHE_MB * 1024}")  # negativo = KiB
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        with self._lock:
+            self._conexoes.append(conn)
+        return conn
+
+    def acquire(self):
+        self.stats["checkouts"] += 1
+        # Quem está escrevendo lê pela conexão de escrita (vê o que ainda não foi confirmado)
+        if self.fila.na_vez() and self._escritor is not None:
+            return self._escritor
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._abrir()
+        return conn
+
+    def release(self, conn):
+        # A transação da conexão de escrita é fechada por escrita()
+        if conn is not self._escritor and conn.in_transaction:
+            conn.rollback()
+
+    @contextmanager
+    def escrita(self):
+        """
+        Vez exclusiva na conexão de escrita com a transação aberta (BEGIN IMMEDIATE); quem usa faz o
+        commit, o que sobrar sem commit é desfeito na saída. Dentro de outra escrita da mesma thread,
+        entra na transação dela.
+        """
+        if self.fila.na_vez():
+            yield self._escritor
+            return
+
+        self.fila.entrar()
+        try:
+            if self._escritor is None:
+                # Usada por várias threads, mas uma de cada vez (FilaEscrita)
+                self._escritor = self._abrir(check_same_thread=False)
+            conn = self._escritor
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+        finally:
+            self.fila.sair()
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._conexoes:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conexoes.clear()
+        self._local = threading.local()
+        self._escritor = None
+
+    def snapshot(self):
+        with self._lock:
+            tamanho = len(self._conexoes)
+        return {**self.stats, **self.fila.snapshot(), "size": tamanho, "idle": tamanho, "in_use": 0, "max": None}
+
+
+class PooledConnection:
+    """Proxy de conexão: `close()` devolve ao pool em vez de fechar de verdade"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Transacao:
+    """Conexão de uma unidade de trabalho e os efeitos adiados até o commit"""
+    __slots__ = ("conn", "apos_commit")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.apos_commit = []
 
 
 class Database:
@@ -48,89 +886,141 @@ class Database:
         self.sqlite_path = DATABASE_PATH
         self.database_url = DATABASE_URL
         self.use_postgres = USE_POSTGRES
+        if self.use_postgres:
+            self.pool = ConnectionPool(self.database_url)
+        else:
+            self.pool = SQLitePool(self.sqlite_path)
+        # Traduções de SQL por texto e contadores de compilação/preparo
+        self.registro_sql = RegistroSQL(self.use_postgres)
+        # Snapshot de contagens por status: (instante, contagens); geração evita gravar dado velho
+        self._stats_cache = None
+        self._stats_geracao = 0
+        # Callbacks avisados a cada mudança de status: callback(transporte_id, novo_status)
+        self._status_listeners = []
+        # Cache de `configuracoes`: chave -> (instante, valor); None também fica guardado (chave ausente)
+        self._config_cache = {}
+        self._config_geracao = 0
+        self._config_hits = 0
+        self._config_misses = 0
         self.ensure_db_exists()
+        self.carregar_configs()
 
     # ---- Connection helpers ----
     def get_connection(self):
-        if self.use_postgres:
-            return psycopg2.connect(self.database_url)
-        else:
-            conn = sqlite3.connect(self.sqlite_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+        """Retira uma conexão do pool; chame `close()` para devolvê-la"""
+        return PooledConnection(self.pool, self.pool.acquire())
+
+    @contextmanager
+    def _conexao(self):
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def pool_stats(self):
+        """Contadores do pool (checkouts, waits, timeouts, reconnects) e ocupação atual"""
+        return self.pool.snapshot()
+
+    def sql_stats(self):
+        """Execuções, compilações (parse/plano) e prepared statements do registro de SQL"""
+        return self.registro_sql.metricas()
+
+    def sql_top(self, n=10, ordem="total_ms"):
+        """Queries (por impressão digital) com maior tempo total: contagem, p50/p95/p99, máximo e plano"""
+        return self.registro_sql.top(n, ordem)
+
+    def zerar_latencias_sql(self):
+        self.registro_sql.zerar_latencias()
+
+    def close(self):
+        self.pool.close_all()
     
     def get_wrapped_cursor(self, conn):
-        """Retorna um cursor que converte resultados para Row (compatível com ambos dict e tuple)"""
+        """Retorna um cursor cujos resultados vêm como Row (compatível com ambos dict e tuple)"""
         if self.use_postgres:
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor = conn.cursor(cursor_factory=_CursorPostgres)
         else:
-            cursor = conn.cursor()
-        
-        # Wrapper para converter fetchone() e fetchall()
-        original_fetchone = cursor.fetchone
-        original_fetchall = cursor.fetchall
-        
-        def wrapped_fetchone():
-            result = original_fetchone()
-            if result:
-                if isinstance(result, dict):
-                    return Row(result)
-                elif isinstance(result, sqlite3.Row):
-                    return Row(dict(result))
-            return result
-        
-        def wrapped_fetchall():
-            results = original_fetchall()
-            if results:
-                return [
-                    Row(row) if isinstance(row, dict) else Row(dict(row)) if isinstance(row, sqlite3.Row) else row
-                    for row in results
-                ]
-            return results
-        
-        cursor.fetchone = wrapped_fetchone
-        cursor.fetchall = wrapped_fetchall
+            cursor = conn.cursor(factory=_CursorSQLite)
+        cursor.registro = self.registro_sql
         return cursor
 
+    @contextmanager
+    def transaction(self):
+        """
+        Unidade de trabalho: os métodos chamados no bloco (nesta thread) usam uma só conexão e o
+        commit é feito uma vez, no fim; exceção desfaz tudo. Um bloco dentro de outro entra na
+        transação de fora. No SQLite o bloco inteiro fica com a vez na conexão de escrita.
+
+        Efeitos fora do banco (listeners de status, cache de configurações) só rodam após o commit.
+        """
+        transacao = _transacao_atual.get()
+        if transacao is not None:
+            yield transacao
+            return
+
+        with self._conexao_escrita() as conn:
+            transacao = Transacao(conn)
+            token = _transacao_atual.set(transacao)
+            try:
+                yield transacao
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                _transacao_atual.reset(token)
+            conn.commit()
+
+        for funcao, args in transacao.apos_commit:
+            funcao(*args)
+
+    def _apos_commit(self, funcao, *args):
+        """Roda `funcao(*args)` agora ou, dentro de `transaction()`, só se o commit acontecer"""
+        transacao = _transacao_atual.get()
+        if transacao is None:
+            funcao(*args)
+        else:
+            transacao.apos_commit.append((funcao, args))
+
+    def _conexao_escrita(self):
+        """Conexão para escrever: no SQLite a de escrita (em fila, BEGIN IMMEDIATE); no Postgres uma do pool"""
+        return self._conexao() if self.use_postgres else self.pool.escrita()
+
+    @contextmanager
+    def _cursor(self, commit=False):
+        """Cursor numa conexão do pool; vários comandos nele compartilham a mesma transação"""
+        transacao = _transacao_atual.get()
+        if transacao is not None:
+            # Dentro de transaction(): conexão da unidade de trabalho, commit só no fim do bloco
+            cur = self.get_wrapped_cursor(transacao.conn)
+            try:
+                yield cur
+            finally:
+                cur.close()
+            return
+
+        with (self._conexao_escrita() if commit else self._conexao()) as conn:
+            # Linhas saem como Row (tupla + índice de colunas) nos dois bancos
+            cur = self.get_wrapped_cursor(conn)
+            try:
+                yield cur
+                if commit:
+                    conn.commit()
+            finally:
+                cur.close()
+
     def _execute(self, sql, params=None, fetchone=False, fetchall=False, commit=False):
-        # Adapt placeholder style for psycopg2: replace ? -> %s
         if params is None:
             params = ()
 
-        if self.use_postgres:
-            sql_exec = sql.replace("?", "%s")
-        else:
-            sql_exec = sql
-
-        conn = self.get_connection()
-        try:
-            # Use RealDictCursor for PostgreSQL to return dicts instead of tuples
-            if self.use_postgres:
-                cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            else:
-                cur = conn.cursor()
-            
-            cur.execute(sql_exec, params)
+        with self._cursor(commit=commit) as cur:
+            cur.execute(sql, params)
             result = None
-            if commit:
-                conn.commit()
             if fetchone:
                 result = cur.fetchone()
-                # Converter para Row para compatibilidade com índices numéricos
-                if result:
-                    if isinstance(result, dict):
-                        result = Row(result)
-                    elif isinstance(result, sqlite3.Row):
-                        result = Row(dict(result))
             if fetchall:
                 result = cur.fetchall()
-                # Converter lista para Row objects
-                if result:
-                    result = [Row(row) if isinstance(row, dict) else Row(dict(row)) if isinstance(row, sqlite3.Row) else row for row in result]
-            cur.close()
             return result
-        finally:
-            conn.close()
 
     # ---- Schema / migration ----
     def ensure_db_exists(self):
@@ -288,18 +1178,39 @@ class Database:
                     """, commit=True)
             except Exception as e:
                 pass  # Constraint already exists or other error
-        else:
-            # SQLite handles FKs differently, they're defined in CREATE TABLE
-            # But since we created without FKs, we need to enable FK enforcement
-            try:
-                self._execute("PRAGMA foreign_keys = ON", commit=True)
-            except:
-                pass
+
+        # SQLite: foreign_keys (e os demais pragmas) são ligados em cada conexão, em SQLitePool._abrir
+
+        self.apply_migrations()
+
+    def apply_migrations(self, target=None):
+        """Aplica, em ordem, as migrações de `MIGRATIONS` ainda não registradas em schema_migrations"""
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                versao INTEGER PRIMARY KEY,
+                descricao TEXT,
+                aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """, commit=True)
+        aplicadas = {row[0] for row in self._execute("SELECT versao FROM schema_migrations", fetchall=True) or []}
+        dialeto = "postgres" if self.use_postgres else "sqlite"
+
+        for versao, descricao, comandos in MIGRATIONS:
+            if versao in aplicadas or (target is not None and versao > target):
+                continue
+            with self._cursor(commit=True) as cur:
+                for comando in comandos:
+                    if isinstance(comando, dict):
+                        comando = comando.get(dialeto)
+                    if comando:
+                        cur.execute(comando)
+                cur.execute("INSERT INTO schema_migrations (versao, descricao) VALUES (?, ?)", (versao, descricao))
+            log.info("✅ Migração %s aplicada: %s", versao, descricao)
 
     # ---- Compatibility helpers ----
     def _column_exists(self, table, column):
         if self.use_postgres:
-            sql = "SELECT column_name FROM information_schema.columns WHERE table_name=%s AND column_name=%s"
+            sql = "SELECT column_name FROM information_schema.columns WHERE table_name=? AND column_name=?"
             return bool(self._execute(sql, (table, column), fetchall=True))
         else:
             sql = "PRAGMA table_info(%s)" % table
@@ -318,40 +1229,68 @@ class Database:
 
     # ---- Public API (methods adapted from previous SQLite implementation) ----
     def get_or_create_cliente(self, discord_id, username=None):
-        cliente = self._execute("SELECT * FROM clientes WHERE discord_id = ?", (discord_id,), fetchone=True)
-        if not cliente:
-            self._execute(
-                "INSERT INTO clientes (discord_id, username) VALUES (?, ?)",
-                (discord_id, username), commit=True
-            )
-            cliente = self._execute("SELECT * FROM clientes WHERE discord_id = ?", (discord_id,), fetchone=True)
-        return cliente
+        # Upsert: cria ou devolve o cliente existente (atualizando o username) numa única ida ao banco
+        sql = """
+            INSERT INTO clientes (discord_id, username) VALUES (?, ?)
+            ON CONFLICT (discord_id) DO UPDATE SET username = COALESCE(excluded.username, clientes.username)
+        """
+        if self.use_postgres or SQLITE_RETURNING:
+            return self._execute(sql + " RETURNING *", (discord_id, username), fetchone=True, commit=True)
+
+        with self._cursor(commit=True) as cur:
+            cur.execute(sql, (discord_id, username))
+            cur.execute("SELECT * FROM clientes WHERE discord_id = ?", (discord_id,))
+            return cur.fetchone()
 
     def get_cliente(self, discord_id):
         return self._execute("SELECT * FROM clientes WHERE discord_id = ?", (discord_id,), fetchone=True)
 
-    def create_transporte(self, cliente_id, origem, valor_estimado, prioridade, taxa_final, ticket_channel_id):
-        self._execute(
-            """
-            INSERT INTO transportes 
-            (cliente_id, numero_ticket, status, origem, destino, valor_estimado, prioridade, taxa_final, ticket_channel_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (cliente_id, None, "AGUARDANDO_PAGAMENTO", origem, "Caerleon", valor_estimado, prioridade, taxa_final, ticket_channel_id),
-            commit=True
-        )
-
-        # Get last inserted id
+    def next_ticket_number(self):
+        """Reserva o próximo número de ticket (atômico, compartilhado entre cogs, processos e reinícios)"""
         if self.use_postgres:
-            # Fetch the last created transporte by highest id
-            transporte = self._execute("SELECT * FROM transportes ORDER BY id DESC LIMIT 1", fetchone=True)
+            return self._execute("SELECT nextval('ticket_numero_seq')", fetchone=True)[0]
+
+        with self._cursor(commit=True) as cur:
+            return self._reservar_numero_sqlite(cur)
+
+    def _reservar_numero_sqlite(self, cur):
+        """Incrementa a sequência de tickets no cursor dado (a transação de quem chama) e devolve o número"""
+        if SQLITE_RETURNING:
+            cur.execute("UPDATE sequencias SET valor = valor + 1 WHERE nome = 'ticket' RETURNING valor")
         else:
-            transporte = self._execute("SELECT * FROM transportes ORDER BY id DESC LIMIT 1", fetchone=True)
+            # O UPDATE já segura o lock de escrita até o commit, então o SELECT lê o próprio valor
+            cur.execute("UPDATE sequencias SET valor = valor + 1 WHERE nome = 'ticket'")
+            cur.execute("SELECT valor FROM sequencias WHERE nome = 'ticket'")
+        return cur.fetchone()[0]
+
+    def create_transporte(self, cliente_id, origem, valor_estimado, prioridade, taxa_final, ticket_channel_id, numero_ticket=None):
+        """
+        Cria o transporte e devolve a linha completa; sem `numero_ticket`, reserva um novo.
+        Postgres: número (nextval) e linha saem do próprio INSERT ... RETURNING *. SQLite: reserva e INSERT
+        na mesma transação de escrita, com RETURNING * quando a versão suporta.
+        """
+        valores = (cliente_id, "AGUARDANDO_PAGAMENTO", origem, "Caerleon", valor_estimado, prioridade, taxa_final, ticket_channel_id)
+        colunas = "(numero_ticket, cliente_id, status, origem, destino, valor_estimado, prioridade, taxa_final, ticket_channel_id)"
 
-        transporte_id = transporte[0]
-        numero_ticket = 1000 + transporte_id
-        self._execute("UPDATE transportes SET numero_ticket = ? WHERE id = ?", (numero_ticket, transporte_id), commit=True)
-        transporte = self._execute("SELECT * FROM transportes WHERE id = ?", (transporte_id,), fetchone=True)
+        if self.use_postgres:
+            numero = "nextval('ticket_numero_seq')" if numero_ticket is None else "?"
+            transporte = self._execute(
+                f"INSERT INTO transportes {colunas} VALUES ({numero}, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING *",
+                valores if numero_ticket is None else (numero_ticket,) + valores, fetchone=True, commit=True
+            )
+        else:
+            sql = f"INSERT INTO transportes {colunas} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            with self._cursor(commit=True) as cur:
+                if numero_ticket is None:
+                    numero_ticket = self._reservar_numero_sqlite(cur)
+                if SQLITE_RETURNING:
+                    cur.execute(sql + " RETURNING *", (numero_ticket,) + valores)
+                else:
+                    # lastrowid é por conexão, então não há como pegar a linha de outro usuário
+                    cur.execute(sql, (numero_ticket,) + valores)
+                    cur.execute("SELECT * FROM transportes WHERE id = ?", (cur.lastrowid,))
+                transporte = cur.fetchone()
+        self._apos_commit(self._status_alterado, transporte["id"], transporte["status"])
         return transporte
 
     def get_transporte(self, transporte_id):
@@ -365,11 +1304,29 @@ class Database:
 
     def update_transporte_status(self, transporte_id, novo_status):
         self._execute("UPDATE transportes SET status = ? WHERE id = ?", (novo_status, transporte_id), commit=True)
+        self._apos_commit(self._status_alterado, transporte_id, novo_status)
+
+    def update_transporte_status_se(self, transporte_id, novo_status, status_esperado):
+        """
+        Troca o status só se o transporte ainda estiver em `status_esperado` (compare-and-set).
+        Devolve False se outra aprovação/rejeição chegou antes: quem chamou não deve seguir adiante.
+        """
+        with self._cursor(commit=True) as cur:
+            cur.execute(
+                "UPDATE transportes SET status = ? WHERE id = ? AND status = ?",
+                (novo_status, transporte_id, status_esperado)
+            )
+            if cur.rowcount == 0:
+                return False
+        self._apos_commit(self._status_alterado, transporte_id, novo_status)
+        return True
 
     def update_transporte(self, transporte_id, **kwargs):
         campos = ", ".join([f"{k} = ?" for k in kwargs.keys()])
         valores = list(kwargs.values()) + [transporte_id]
         self._execute(f"UPDATE transportes SET {campos} WHERE id = ?", tuple(valores), commit=True)
+        if "status" in kwargs:
+            self._apos_commit(self._status_alterado, transporte_id, kwargs["status"])
 
     def get_transportes_by_status(self, status):
         return self._execute("SELECT * FROM transportes WHERE status = ? ORDER BY data_criacao ASC", (status,), fetchall=True)
@@ -379,47 +1336,526 @@ class Database:
         sql = f"SELECT * FROM transportes WHERE status IN ({placeholders}) ORDER BY prioridade DESC, data_criacao ASC"
         return self._execute(sql, tuple(status_list), fetchall=True)
 
+    def get_transportes_pagina(self, status_list, antes=None, depois=None, limite=25):
+        """
+        Página de transportes com status em `status_list`, do mais recente ao mais antigo (ver `_pagina`).
+        Cada item traz `cliente_discord_id` (cliente_id é o id interno da tabela clientes).
+        """
+        return self._pagina(
+            "transportes", [("status = ?", (status,)) for status in status_list], antes, depois, limite,
+            juntar=("clientes.discord_id AS cliente_discord_id", "LEFT JOIN clientes ON clientes.id = pagina.cliente_id")
+        )
+
+    def _pagina(self, tabela, filtros, antes, depois, limite, juntar=None):
+        """
+        Paginação por cursor (keyset) em `id`, do maior para o menor: `antes` = id do último item da
+        página atual (avança), `depois` = id do primeiro (volta). `filtros` = [(sql, params)], unidos
+        por OR: cada um vira uma subconsulta ordenada pelo índice com LIMIT, então uma página lê no
+        máximo `limite + 1` linhas por filtro, por mais fundo que esteja o cursor.
+        `juntar` = (colunas, JOIN sobre `pagina`): aplicado só às linhas já recortadas da página.
+        """
+        if not filtros:
+            return {"itens": [], "tem_anterior": False, "tem_proxima": False, "primeiro_id": None, "ultimo_id": None}
+        if depois is not None:
+            cursor, valor, ordem = " AND id > ?", (depois,), "ASC"
+        elif antes is not None:
+            cursor, valor, ordem = " AND id < ?", (antes,), "DESC"
+        else:
+            cursor, valor, ordem = "", (), "DESC"
+
+        partes, params = [], ()
+        for filtro, filtro_params in filtros:
+            partes.append(f"SELECT * FROM {tabela} WHERE {filtro}{cursor} ORDER BY id {ordem} LIMIT ?")
+            params += tuple(filtro_params) + valor + (limite + 1,)
+        if len(partes) == 1:
+            sql = partes[0]
+        else:
+            sql = " UNION ALL ".join(f"SELECT * FROM ({parte}) AS p{i}" for i, parte in enumerate(partes))
+            sql += f" ORDER BY id {ordem} LIMIT ?"
+            params += (limite + 1,)
+        if juntar:
+            colunas, join = juntar
+            sql = f"SELECT pagina.*, {colunas} FROM ({sql}) AS pagina {join} ORDER BY pagina.id {ordem}"
+        linhas = self._execute(sql, params, fetchall=True) or []
+
+        if depois is not None:
+            itens = list(reversed(linhas[:limite]))
+            tem_anterior, tem_proxima = len(linhas) > limite, True
+        else:
+            itens = linhas[:limite]
+            tem_anterior, tem_proxima = antes is not None, len(linhas) > limite
+        return {
+            "itens": itens,
+            "tem_anterior": tem_anterior and bool(itens),
+            "tem_proxima": tem_proxima and bool(itens),
+            "primeiro_id": itens[0]["id"] if itens else None,
+            "ultimo_id": itens[-1]["id"] if itens else None,
+        }
+
     def get_all_transportes(self):
         return self._execute("SELECT * FROM transportes ORDER BY data_criacao DESC", fetchall=True)
 
     def delete_transporte(self, transporte_id):
         self._execute("DELETE FROM transportes WHERE id = ?", (transporte_id,), commit=True)
+        self._apos_commit(self._status_alterado, transporte_id, None)
+
+    def get_status_counts(self):
+        """
+        Quantidade de transportes por status numa única query. Mesmo critério de `get_transportes_pagina`
+        (status exato; a migração 9 normalizou a caixa), então o total de uma categoria bate com as páginas.
+        """
+        rows = self._execute("SELECT status, COUNT(*) AS total FROM transportes GROUP BY status", fetchall=True) or []
+        return {row["status"]: row["total"] for row in rows}
+
+    def get_stats_snapshot(self, ttl=STATS_CACHE_TTL):
+        """`get_status_counts()` em cache por `ttl` segundos; escritas de status invalidam o cache"""
+        cache = self._stats_cache
+        if cache is not None and time.monotonic() - cache[0] < ttl:
+            return dict(cache[1])
+
+        geracao = self._stats_geracao
+        contagens = self.get_status_counts()
+        if geracao == self._stats_geracao:
+            self._stats_cache = (time.monotonic(), contagens)
+        return dict(contagens)
+
+    def _invalidar_stats(self):
+        self._stats_geracao += 1
+        self._stats_cache = None
+
+    def add_status_listener(self, callback):
+        """Registra `callback(transporte_id, novo_status)`; roda na thread que fez a escrita"""
+        if callback not in self._status_listeners:
+            self._status_listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def _status_alterado(self, transporte_id, novo_status):
+        """Invalida o snapshot de contagens e avisa os listeners (novo_status None = removido)"""
+        self._invalidar_stats()
+        for callback in list(self._status_listeners):
+            try:
+                callback(transporte_id, novo_status)
+            except Exception:
+                log.exception("⚠️ Listener de status falhou (transporte %s)", transporte_id)
 
     def create_log_transporte(self, transporte_id, origem, destino, valor_aproximado, prioridade, status_final, message_id=None):
-        self._execute(
-            """
+        sql = """
             INSERT INTO log_transportes 
             (transporte_id, origem, destino, valor_aproximado, prioridade, status_final, data_conclusao, message_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (transporte_id, origem, destino, valor_aproximado, prioridade, status_final, datetime.now().isoformat(), message_id),
-            commit=True
-        )
-        # return last id
-        last = self._execute("SELECT id FROM log_transportes ORDER BY id DESC LIMIT 1", fetchone=True)
-        return last[0] if last else None
+        """
+        params = (transporte_id, origem, destino, valor_aproximado, prioridade, status_final, datetime.now().isoformat(), message_id)
+
+        if self.use_postgres:
+            return self._execute(sql + " RETURNING id", params, fetchone=True, commit=True)["id"]
+
+        with self._cursor(commit=True) as cur:
+            cur.execute(sql, params)
+            return cur.lastrowid
+
+    def registrar_log_transporte(self, transporte_id, origem, destino, valor_aproximado, prioridade, status_final, message_id):
+        """
+        Grava (ou atualiza) o log da entrega com a mensagem publicada. Uma linha por transporte: no Postgres
+        o índice único em transporte_id recusaria um segundo INSERT. Devolve o message_id que a linha tinha
+        antes (a publicação substituída, que ainda está no canal) ou None.
+        """
+        valores = (origem, destino, valor_aproximado, prioridade, status_final, datetime.now().isoformat(), message_id)
+        with self._cursor(commit=True) as cur:
+            cur.execute(
+                "SELECT id, message_id FROM log_transportes WHERE transporte_id = ? ORDER BY id DESC LIMIT 1",
+                (transporte_id,)
+            )
+            existente = cur.fetchone()
+            if existente is None:
+                cur.execute("""
+                    INSERT INTO log_transportes
+                    (transporte_id, origem, destino, valor_aproximado, prioridade, status_final, data_conclusao, message_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (transporte_id,) + valores)
+                return None
+            cur.execute("""
+                UPDATE log_transportes
+                SET origem = ?, destino = ?, valor_aproximado = ?, prioridade = ?, status_final = ?, data_conclusao = ?, message_id = ?
+                WHERE id = ?
+            """, valores + (existente["id"],))
+            return int(existente["message_id"]) if existente["message_id"] else None
 
     def get_logs_transportes(self, limite=50):
         return self._execute("SELECT * FROM log_transportes ORDER BY data_conclusao DESC LIMIT ?", (limite,), fetchall=True)
 
+    def get_log_message_ids(self, limite):
+        """IDs das últimas `limite` mensagens ainda publicadas no histórico, da mais antiga para a mais nova"""
+        linhas = self._execute(
+            "SELECT id, message_id FROM log_transportes WHERE message_id IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (limite,), fetchall=True
+        ) or []
+        return [int(linha["message_id"]) for linha in reversed(linhas)]
+
+    def clear_log_message_ids(self, message_ids):
+        """Marca mensagens do histórico como apagadas do canal"""
+        with self._cursor(commit=True) as cur:
+            cur.executemany(
+                "UPDATE log_transportes SET message_id = NULL WHERE message_id = ?",
+                [(str(message_id),) for message_id in message_ids]
+            )
+
     def create_auditoria(self, staff_id, acao, transporte_id, detalhes=None):
         self._execute(
             "INSERT INTO auditorias (staff_id, acao, transporte_id, detalhes) VALUES (?, ?, ?, ?)",
             (staff_id, acao, transporte_id, detalhes), commit=True
         )
 
-    def get_config(self, chave):
+    def create_comprovante(self, transporte_id, numero_ticket, sha256, dhash, dhash16=None, mensagem_url=None):
+        self._execute("""
+            INSERT INTO comprovantes (transporte_id, numero_ticket, sha256, dhash, dhash16, banda0, banda1, banda2, banda3, mensagem_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (transporte_id, numero_ticket, sha256, _dhash_com_sinal(dhash), dhash16, *_bandas_dhash(dhash), mensagem_url), commit=True)
+
+    def get_comprovantes_similares(self, sha256, dhash, dhash16=None, ignorar_transporte_id=None, distancia_max=COMPROVANTE_DISTANCIA_MAX):
+        """
+        Comprovantes já registrados idênticos (sha256) ou parecidos (dHash 16x16), como [(linha, distância)].
+        Só consulta os índices: sha256 e as 4 bandas do dHash 8x8; a distância é medida nos 256 bits do dHash 16x16
+        (0 quando o sha256 é igual). Linhas antigas, sem dhash16, só contam se forem idênticas.
+        """
+        candidatos = self._execute("""
+            SELECT id, transporte_id, numero_ticket, sha256, dhash16, mensagem_url FROM comprovantes
+            WHERE sha256 = ? OR banda0 = ? OR banda1 = ? OR banda2 = ? OR banda3 = ?
+        """, (sha256, *_bandas_dhash(dhash)), fetchall=True) or []
+
+        similares = []
+        for linha in candidatos:
+            if ignorar_transporte_id is not None and linha["transporte_id"] == ignorar_transporte_id:
+                continue
+            if linha["sha256"] == sha256:
+                distancia = 0
+            elif dhash16 and linha["dhash16"]:
+                distancia = bin(int(linha["dhash16"], 16) ^ int(dhash16, 16)).count("1")
+            else:
+                continue
+            if distancia <= distancia_max:
+                similares.append((linha, distancia))
+        similares.sort(key=lambda item: (item[1], -item[0]["id"]))
+        return similares
+
+    def create_transacao_financeira(self, tipo, valor, descricao="", motivo="", autor_id=0, exigir_saldo=False):
+        """
+        Lança a transação e aplica o incremento no saldo na mesma transação do banco (sem ler e
+        regravar o saldo). Devolve o saldo atualizado, ou None se `exigir_saldo` e a saída não couber.
+        """
+        entrada, saida = (valor, 0) if tipo == "ENTRADA" else (0, valor)
+        condicao = " AND saldo_total >= ?" if exigir_saldo and saida else ""
+        with self._cursor(commit=True) as cur:
+            # O UPDATE vem primeiro: trava a linha do saldo até o commit
+            cur.execute(f"""
+                UPDATE financeiro_saldo
+                SET saldo_total = saldo_total + ?, saldo_entrada = saldo_entrada + ?, saldo_saida = saldo_saida + ?,
+                    ultima_atualizacao = CURRENT_TIMESTAMP
+                WHERE id = 1{condicao}
+            """, (entrada - saida, entrada, saida) + ((saida,) if condicao else ()))
+            if cur.rowcount == 0:
+                return None
+            cur.execute("""
+                INSERT INTO financeiro_transacoes (tipo, valor, descricao, motivo, autor_id)
+                VALUES (?, ?, ?, ?, ?)
+            """, (tipo, valor, descricao, motivo, autor_id))
+            cur.execute("SELECT * FROM financeiro_saldo WHERE id = 1")
+            return cur.fetchone()
+
+    def get_saldo_financeiro(self):
+        return self._execute("SELECT * FROM financeiro_saldo WHERE id = 1", fetchone=True)
+
+    def get_transacoes_financeiras(self, limite=10):
+        return self._execute("SELECT * FROM financeiro_transacoes ORDER BY id DESC LIMIT ?", (limite,), fetchall=True) or []
+
+    def get_transacoes_financeiras_pagina(self, antes=None, depois=None, limite=25):
+        """Página do livro-caixa, da transação mais recente para a mais antiga (ver `_pagina`)"""
+        return self._pagina("financeiro_transacoes", [("1 = 1", ())], antes, depois, limite)
+
+    def reconciliar_financeiro(self, corrigir=False):
+        """
+        Recalcula entradas/saídas a partir de financeiro_transacoes (uma agregação) e compara com o
+        saldo materializado. Com `corrigir`, grava os valores recalculados.
+        """
+        with self._cursor(commit=corrigir) as cur:
+            if corrigir:
+                # Trava a linha do saldo: nenhum lançamento entra entre a soma e a correção
+                cur.execute("UPDATE financeiro_saldo SET id = id WHERE id = 1")
+            cur.execute("""
+                SELECT COUNT(*) AS lancamentos,
+                       COALESCE(SUM(CASE WHEN tipo = 'ENTRADA' THEN valor ELSE 0 END), 0) AS entrada,
+                       COALESCE(SUM(CASE WHEN tipo = 'SAIDA' THEN valor ELSE 0 END), 0) AS saida
+                FROM financeiro_transacoes
+            """)
+            soma = cur.fetchone()
+            cur.execute("SELECT * FROM financeiro_saldo WHERE id = 1")
+            saldo = cur.fetchone() or {}
+
+            calculado = {"entrada": soma["entrada"], "saida": soma["saida"], "total": soma["entrada"] - soma["saida"]}
+            registrado = {
+                "entrada": saldo.get("saldo_entrada") or 0,
+                "saida": saldo.get("saldo_saida") or 0,
+                "total": saldo.get("saldo_total") or 0,
+            }
+            diferenca = {chave: registrado[chave] - calculado[chave] for chave in calculado}
+
+            if corrigir:
+                cur.execute("""
+                    UPDATE financeiro_saldo
+                    SET saldo_total = ?, saldo_entrada = ?, saldo_saida = ?, ultima_atualizacao = CURRENT_TIMESTAMP
+                    WHERE id = 1
+                """, (calculado["total"], calculado["entrada"], calculado["saida"]))
+
+        return {
+            "lancamentos": soma["lancamentos"],
+            "calculado": calculado,
+            "registrado": registrado,
+            "diferenca": diferenca,
+            "corrigido": corrigir,
+        }
+
+    def salvar_sessoes(self, namespace, sessoes):
+        """Upsert de várias sessões: [(user_id, dados_json, atualizada_em), ...]"""
+        with self._cursor(commit=True) as cur:
+            cur.executemany(
+                """
+                    INSERT INTO sessoes (namespace, user_id, dados, atualizada_em) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (namespace, user_id) DO UPDATE SET dados = excluded.dados, atualizada_em = excluded.atualizada_em
+                """,
+                [(namespace, str(user_id), dados, atualizada_em) for user_id, dados, atualizada_em in sessoes]
+            )
+
+    def remover_sessoes(self, namespace, user_ids):
+        with self._cursor(commit=True) as cur:
+            cur.executemany(
+                "DELETE FROM sessoes WHERE namespace = ? AND user_id = ?",
+                [(namespace, str(user_id)) for user_id in user_ids]
+            )
+
+    def get_sessoes(self, namespace, desde):
+        """Sessões alteradas a partir de `desde` (epoch), da mais antiga para a mais recente"""
+        return self._execute(
+            "SELECT user_id, dados, atualizada_em FROM sessoes WHERE namespace = ? AND atualizada_em >= ? ORDER BY atualizada_em",
+            (namespace, desde), fetchall=True
+        ) or []
+
+    def limpar_sessoes(self, antes):
+        """Apaga sessões (de qualquer namespace) paradas desde antes de `antes` (epoch)"""
+        self._execute("DELETE FROM sessoes WHERE atualizada_em < ?", (antes,), commit=True)
+
+    def get_config(self, chave, ttl=CONFIG_CACHE_TTL):
+        """
+        Valor de `configuracoes` via cache (read-through). `set_config` atualiza o cache na hora;
+        `ttl` (segundos, 0 = sem expiração) só importa quando outra instância pode alterar o banco.
+        """
+        encontrado, valor = self._config_em_cache(chave, ttl)
+        if encontrado:
+            return valor
+        return self._buscar_config(chave)
+
+    def _buscar_config(self, chave):
+        """Lê a chave do banco e guarda no cache (a menos que um set_config tenha corrido no meio)"""
+        geracao = self._config_geracao
         res = self._execute("SELECT valor FROM configuracoes WHERE chave = ?", (chave,), fetchone=True)
-        return res[0] if res else None
+        valor = res[0] if res else None
+        # Dentro de uma transação a leitura pode ver escrita ainda não confirmada: não vai ao cache
+        if geracao == self._config_geracao and _transacao_atual.get() is None:
+            self._config_cache[chave] = (time.monotonic(), valor)
+        return valor
+
+    def _config_em_cache(self, chave, ttl=CONFIG_CACHE_TTL):
+        """(True, valor) se a chave está no cache e não expirou; (False, None) conta como falta"""
+        cache = self._config_cache.get(chave)
+        if cache is not None and (not ttl or time.monotonic() - cache[0] < ttl):
+            self._config_hits += 1
+            return True, cache[1]
+        self._config_misses += 1
+        return False, None
 
     def set_config(self, chave, valor, tipo="string"):
+        self._config_geracao += 1
+        self._config_cache.pop(chave, None)
         existe = self._execute("SELECT * FROM configuracoes WHERE chave = ?", (chave,), fetchone=True)
         if existe:
             self._execute("UPDATE configuracoes SET valor = ?, tipo = ? WHERE chave = ?", (valor, tipo, chave), commit=True)
         else:
             self._execute("INSERT INTO configuracoes (chave, valor, tipo) VALUES (?, ?, ?)", (chave, valor, tipo), commit=True)
+        # Write-through: quem ler em seguida já vê o valor novo sem ir ao banco (após o commit)
+        self._apos_commit(self._gravar_config_cache, chave, valor)
+
+    def _gravar_config_cache(self, chave, valor):
+        self._config_geracao += 1
+        self._config_cache[chave] = (time.monotonic(), valor)
+
+    def get_configs(self, chaves):
+        """Várias chaves de `configuracoes` numa única query (sempre do banco): {chave: valor} (ausentes ficam de fora)"""
+        if not chaves:
+            return {}
+        placeholders = ",".join(["?" for _ in chaves])
+        geracao = self._config_geracao
+        linhas = self._execute(f"SELECT chave, valor FROM configuracoes WHERE chave IN ({placeholders})", tuple(chaves), fetchall=True) or []
+        valores = {linha["chave"]: linha["valor"] for linha in linhas}
+        if geracao == self._config_geracao and _transacao_atual.get() is None:
+            agora = time.monotonic()
+            self._config_cache.update({chave: (agora, valores.get(chave)) for chave in chaves})
+        return valores
+
+    def carregar_configs(self):
+        """Pré-carrega todas as chaves de `configuracoes` no cache com uma única query"""
+        geracao = self._config_geracao
+        linhas = self._execute("SELECT chave, valor FROM configuracoes", fetchall=True) or []
+        if geracao == self._config_geracao and _transacao_atual.get() is None:
+            agora = time.monotonic()
+            self._config_cache = {linha["chave"]: (agora, linha["valor"]) for linha in linhas}
+        return len(linhas)
+
+    def config_cache_stats(self):
+        """Acertos/faltas do cache de `configuracoes` desde o início"""
+        total = self._config_hits + self._config_misses
+        return {
+            "hits": self._config_hits,
+            "misses": self._config_misses,
+            "hit_rate": self._config_hits / total if total else 0.0,
+            "chaves": len(self._config_cache),
+            "ttl": CONFIG_CACHE_TTL,
+        }
+
+    # ---- Notificações entre instâncias (Postgres LISTEN/NOTIFY) ----
+    def notificar(self, canal, mensagem=""):
+        """NOTIFY para as instâncias que escutam `canal`; no SQLite (instância única) não faz nada"""
+        if self.use_postgres:
+            self._execute("SELECT pg_notify(?, ?)", (canal, mensagem), fetchone=True, commit=True)
+
+    def escutar(self, canal, callback):
+        """
+        LISTEN `canal` numa conexão dedicada, fora do pool, numa thread daemon. `callback(payload)`
+        roda nessa thread; também é chamado com None a cada (re)conexão, pois avisos enviados
+        enquanto a conexão estava caída se perdem. Só Postgres: devolve None no SQLite.
+        """
+        if not self.use_postgres:
+            return None
+        thread = threading.Thread(target=self._loop_escuta, args=(canal, callback), name=f"listen-{canal}", daemon=True)
+        thread.start()
+        return thread
+
+    def _loop_escuta(self, canal, callback):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.database_url)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{canal}"')
+                self._avisar(callback, None)
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._avisar(callback, conn.notifies.pop(0).payload)
+            except Exception as e:
+                log.warning("⚠️ LISTEN %s interrompido: %s (reconectando em 5s)", canal, e)
+                time.sleep(5)
+            finally:
+                if conn is not None:
+                    ConnectionPool._fechar(conn)
+
+    @staticmethod
+    def _avisar(callback, payload):
+        try:
+            callback(payload)
+        except Exception:
+            log.exception("⚠️ Callback de notificação falhou")
+
+
+class AsyncDatabase:
+    """
+    Fachada assíncrona do `Database`.
+
+    Espelha todos os métodos do `Database` (`await adb.get_transporte(...)`,
+    `await adb._execute(...)`, ...) executando-os num executor dedicado, para que uma
+    query lenta atrase só a interação que a fez e não o loop do gateway do discord.py.
+
+    `async with adb.transaction():` pega uma thread de transação e a grava num ContextVar: os
+    `await adb.*` do bloco (e de tasks criadas dentro dele, que herdam o contexto) rodam nela,
+    dentro de um `db.transaction()`. Não é exclusiva da task, é de quem vê esse contexto.
+
+    Threads comuns + threads de transação somam `max_workers` (o tamanho do pool do Postgres):
+    cada uma segura no máximo uma conexão, então as transações nunca esgotam o pool das avulsas.
+    """
+
+    def __init__(self, database, max_workers=DB_POOL_MAX, max_transacoes=DB_TRANSACOES_MAX):
+        self._db = database
+        # Com uma conexão só não há como separar: as duas partes a dividem
+        vagas_transacao = max(1, min(max_transacoes, max_workers - 1))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers - vagas_transacao), thread_name_prefix="db")
+        # Threads de transação reaproveitadas (no SQLite cada uma mantém a sua conexão)
+        self._executores_transacao = []
+        self._vagas_transacao = asyncio.Semaphore(vagas_transacao)
+
+    async def run_sync(self, func, *args, **kwargs):
+        """Executa uma função síncrona qualquer (que use o banco) no executor do banco"""
+        loop = asyncio.get_running_loop()
+        executor = _executor_transacao.get() or self._executor
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Versão assíncrona de `db.transaction()`: um commit para todos os `await adb.*` do bloco"""
+        if _executor_transacao.get() is not None:
+            yield
+            return
+
+        await self._vagas_transacao.acquire()
+        executor = self._executores_transacao.pop() if self._executores_transacao else ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-tx"
+        )
+        loop = asyncio.get_running_loop()
+        # O gerenciador entra e sai na mesma thread em que as chamadas do bloco rodam
+        gerenciador = self._db.transaction()
+        token = _executor_transacao.set(executor)
+        try:
+            await loop.run_in_executor(executor, gerenciador.__enter__)
+            try:
+                yield
+            except BaseException as e:
+                await loop.run_in_executor(executor, gerenciador.__exit__, type(e), e, e.__traceback__)
+                raise
+            await loop.run_in_executor(executor, gerenciador.__exit__, None, None, None)
+        finally:
+            _executor_transacao.reset(token)
+            self._executores_transacao.append(executor)
+            self._vagas_transacao.release()
+
+    async def get_config(self, chave, ttl=CONFIG_CACHE_TTL):
+        """Acerto no cache responde direto no loop; só a falta vai ao executor"""
+        encontrado, valor = self._db._config_em_cache(chave, ttl)
+        if encontrado:
+            return valor
+        return await self.run_sync(self._db._buscar_config, chave)
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def chamada(*args, **kwargs):
+            return await self.run_sync(attr, *args, **kwargs)
+
+        # Cacheia o wrapper para não recriá-lo a cada acesso
+        setattr(self, name, chamada)
+        return chamada
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for executor in self._executores_transacao:
+            executor.shutdown(wait=True)
 
 
 # Instância global
 db = Database()
+adb = AsyncDatabase(db)
 
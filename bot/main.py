@@ -13,6 +13,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 load_dotenv()
 
+from bot.utils.log import configurar_logging, vincular_interacao
+
 # Configurações
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 GUILD_ID = int(os.getenv("GUILD_ID", 0))
@@ -49,8 +51,9 @@ async def on_guild_join(guild):
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
     """Evento de interação (botões, select, modais)"""
-    # Emit custom event para cogs
+    # Emit custom event para cogs (as tasks dos listeners herdam o contexto de log da interação)
     if interaction.type == discord.InteractionType.component:
+        vincular_interacao(interaction, custom_id=interaction.data.get("custom_id"))
         bot.dispatch("button_click", interaction)
 
 async def load_cogs():
@@ -75,6 +78,7 @@ async def load_cogs():
 
 async def main():
     """Função principal"""
+    configurar_logging()
     async with bot:
         # Carrega cogs
         await load_cogs()
@@ -0,0 +1,14 @@
+"""
+Configuração dos testes
+
+O banco é criado na importação de `bot.database`: força SQLite num diretório temporário
+antes de qualquer import do bot. Rodar da raiz do repositório: `python -m pytest -q`.
+"""
+import os
+import sys
+import tempfile
+
+os.environ["DATABASE_URL"] = ""
+os.chdir(tempfile.mkdtemp(prefix="tas_testes_"))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -0,0 +1,61 @@
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+from bot.config import COMPROVANTE_DISTANCIA_MAX
+from bot.database import db
+from bot.utils.validators import _analisar_bytes
+
+
+def _comprovante(semente, formato="PNG", tamanho=(720, 1440)):
+    """Comprovante sintético: mesmo modelo de banco, "texto" (blocos) determinado pela semente"""
+    rnd = random.Random(semente)
+    img = Image.new("RGB", (720, 1440), "white")
+    desenho = ImageDraw.Draw(img)
+    desenho.rectangle([0, 0, 720, 200], fill=(130, 10, 210))
+    for topo in (260, 420, 580, 740):
+        desenho.rectangle([40, topo, 160, topo + 24], fill=(150, 150, 150))  # rótulo fixo do modelo
+        x = 40
+        while x < 600:
+            largura = rnd.randint(12, 40)
+            desenho.rectangle([x, topo + 40, x + largura, topo + 80], fill="black")
+            x += largura + rnd.randint(6, 30)
+    for y in range(900, 1300, 80):
+        desenho.line([40, y, 680, y], fill=(220, 220, 220), width=2)
+    buffer = io.BytesIO()
+    img.resize(tamanho).save(buffer, formato)
+    return buffer.getvalue()
+
+
+def _distancia16(a, b):
+    return bin(int(a[2], 16) ^ int(b[2], 16)).count("1")
+
+
+def test_modelo_igual_nao_e_o_mesmo_comprovante():
+    a, b = _analisar_bytes(_comprovante(1)), _analisar_bytes(_comprovante(2))
+    assert _distancia16(a, b) > COMPROVANTE_DISTANCIA_MAX
+
+
+def test_reenvio_recomprimido_fica_parecido():
+    a = _analisar_bytes(_comprovante(1))
+    copia = _analisar_bytes(_comprovante(1, "JPEG", (540, 1080)))
+    assert a[0] != copia[0]
+    assert _distancia16(a, copia) <= COMPROVANTE_DISTANCIA_MAX
+
+
+def test_similares_separa_identico_de_parecido():
+    original = _analisar_bytes(_comprovante(10))
+    outro = _analisar_bytes(_comprovante(11))
+    db.create_comprovante(9001, 1, *original, mensagem_url="analise/1")
+    db.create_comprovante(9002, 2, *outro, mensagem_url="analise/2")
+    # Linha antiga (antes do dHash 16x16): só conta se for o mesmo arquivo
+    db.create_comprovante(9003, 3, *original[:2], mensagem_url="analise/3")
+
+    mesmo = db.get_comprovantes_similares(*original)
+    assert {(linha["numero_ticket"], distancia) for linha, distancia in mesmo} == {(1, 0), (3, 0)}
+
+    copia = _analisar_bytes(_comprovante(10, "JPEG", (540, 1080)))
+    parecidos = db.get_comprovantes_similares(*copia)
+    assert [linha["numero_ticket"] for linha, _ in parecidos] == [1]
+    assert parecidos[0][0]["sha256"] != copia[0]
@@ -0,0 +1,60 @@
+import asyncio
+
+from bot.config import STATUS
+from bot.database import db
+from bot.cogs.dashboards import Dashboards, agrupar_stats
+
+
+def test_agrupa_status_reais():
+    contagens = {
+        "ABERTO": 3, "AGUARDANDO_PAGAMENTO": 2, "PAGO": 1, "DEPOSITADO": 1,
+        "EM_TRANSPORTE": 4, "ENTREGUE": 1, "CONCLUIDO": 5, "CANCELADO": 7,
+    }
+    assert agrupar_stats(contagens) == {
+        "concluidos": 6,
+        "fila": 3,
+        "aguardando_pagamento": 2,
+        "pagos_esperando": 6,
+        "total": 17,
+    }
+
+
+def test_grupos_usam_apenas_status_existentes():
+    from bot.cogs.dashboards import GRUPOS_STATS
+    conhecidos = set(STATUS.values())
+    assert all(set(status) <= conhecidos for status in GRUPOS_STATS.values())
+
+
+def test_stats_a_partir_do_snapshot():
+    cliente = db.get_or_create_cliente("500", "dash")
+    antes = asyncio.run(Dashboards._get_stats_transporte(None))
+    for status in ("ABERTO", "ABERTO", "PAGO", "CONCLUIDO"):
+        transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+        db.update_transporte_status(transporte["id"], status)
+
+    depois = asyncio.run(Dashboards._get_stats_transporte(None))
+    assert depois["fila"] - antes["fila"] == 2
+    assert depois["pagos_esperando"] - antes["pagos_esperando"] == 1
+    assert depois["concluidos"] - antes["concluidos"] == 1
+    assert depois["total"] - antes["total"] == 4
+
+
+def test_atualizar_edita_o_dashboard_pela_fila(monkeypatch):
+    import bot.cogs.dashboards as dashboards
+    from types import SimpleNamespace
+
+    chamadas = []
+
+    async def enviar(canal, prioridade=None, **kwargs):
+        chamadas.append(("send", canal))
+
+    def editar(mensagem, prioridade=None, **kwargs):
+        chamadas.append(("edit", mensagem))
+
+    monkeypatch.setattr(dashboards, "outbound", SimpleNamespace(send=enviar, edit=editar))
+    cog, canal, mensagem = Dashboards(None), object(), object()
+
+    asyncio.run(cog._enviar_dashboard_relatorios(canal))
+    asyncio.run(cog._enviar_dashboard_relatorios(canal, mensagem))
+    asyncio.run(cog._enviar_dashboard_config(canal, mensagem))
+    assert chamadas == [("send", canal), ("edit", mensagem), ("edit", mensagem)]
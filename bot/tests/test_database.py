@@ -0,0 +1,382 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+import bot.database as database
+from bot.database import db
+
+
+def _criar(numero_ticket=None):
+    cliente = db.get_or_create_cliente("900", "banco")
+    return db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1", numero_ticket=numero_ticket)
+
+
+def test_create_transporte_reserva_numero_e_devolve_a_linha(monkeypatch):
+    for returning in (True, False):
+        monkeypatch.setattr(database, "SQLITE_RETURNING", returning)
+        primeiro, segundo = _criar(), _criar()
+        assert segundo["numero_ticket"] == primeiro["numero_ticket"] + 1
+        assert segundo["status"] == "AGUARDANDO_PAGAMENTO"
+        assert dict(segundo) == dict(db.get_transporte(segundo["id"]))
+
+
+def test_create_transporte_com_numero_informado():
+    numero = db.next_ticket_number()
+    assert _criar(numero_ticket=numero)["numero_ticket"] == numero
+    assert db.next_ticket_number() == numero + 1
+
+
+def test_next_ticket_number_concorrente_sem_repeticao_nem_buraco():
+    primeiro = db.next_ticket_number()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        numeros = list(executor.map(lambda _: db.next_ticket_number(), range(200)))
+    assert sorted(numeros) == list(range(primeiro + 1, primeiro + 201))
+
+
+def test_next_ticket_number_compartilhado_entre_instancias():
+    outra = database.Database()  # outro processo no mesmo banco
+    try:
+        numero = db.next_ticket_number()
+        assert outra.next_ticket_number() == numero + 1
+        assert db.next_ticket_number() == numero + 2
+    finally:
+        outra.close()
+
+
+def test_transacoes_saem_do_mesmo_orcamento_de_conexoes():
+    adb = database.AsyncDatabase(db, max_workers=3, max_transacoes=1)
+    ativas, pico, trava = 0, 0, threading.Lock()
+
+    def ocupar():
+        nonlocal ativas, pico
+        with trava:
+            ativas += 1
+            pico = max(pico, ativas)
+        time.sleep(0.05)
+        with trava:
+            ativas -= 1
+
+    async def em_transacao():
+        async with adb.transaction():
+            await adb.run_sync(ocupar)
+
+    async def cenario():
+        await asyncio.gather(*[adb.run_sync(ocupar) for _ in range(6)], *[em_transacao() for _ in range(3)])
+
+    try:
+        asyncio.run(cenario())
+    finally:
+        adb.close()
+    assert pico == 3
+
+
+class ConexaoFalsa:
+    autocommit = False
+
+    def __init__(self):
+        self.preparadas = set()
+
+
+class CursorFalso(database._PreparoPostgres):
+    """Caminho PREPARE/EXECUTE do cursor Postgres sem servidor: só registra o que iria ao driver"""
+
+    def __init__(self, registro, conexao=None):
+        self.registro = registro
+        self.connection = conexao or ConexaoFalsa()
+        self.enviados = []
+
+    def _direto(self, sql, argumentos=None):
+        self.enviados.append((sql, argumentos))
+
+    def execute(self, sql, *params):
+        self.enviados.clear()
+        self._executar(self.registro.instrucao(sql), sql, *params)
+        return self.enviados
+
+
+def test_prepara_apos_n_usos_com_placeholders_numerados():
+    cursor = CursorFalso(database.RegistroSQL(True, preparar_apos=2))
+    sql = "SELECT * FROM transportes WHERE obs <> '?' AND id = ? AND status = ?"
+
+    assert cursor.execute(sql, (1, "PAGO")) == [
+        ("SELECT * FROM transportes WHERE obs <> '?' AND id = %s AND status = %s", (1, "PAGO")),
+    ]
+    assert cursor.execute(sql, (2, "PAGO")) == [
+        ("SAVEPOINT tas_preparo", None),
+        ("PREPARE tas_1 AS SELECT * FROM transportes WHERE obs <> '?' AND id = $1 AND status = $2", None),
+        ("RELEASE SAVEPOINT tas_preparo", None),
+        ("EXECUTE tas_1 (%s, %s)", (2, "PAGO")),
+    ]
+    assert cursor.execute(sql, (3, "PAGO")) == [("EXECUTE tas_1 (%s, %s)", (3, "PAGO"))]
+    assert cursor.connection.preparadas == {"tas_1"}
+    assert cursor.registro.metricas()["preparos"] == 1
+    assert cursor.registro.metricas()["compilacoes"] == 2  # a execução direta e o PREPARE
+
+
+def test_limite_de_preparadas_por_conexao(monkeypatch):
+    monkeypatch.setattr(database, "DB_PREPARADAS_MAX", 2)
+    registro = database.RegistroSQL(True, preparar_apos=1)
+    cursor = CursorFalso(registro)
+    consultas = [f"SELECT * FROM tabela_{i} WHERE id = ?" for i in range(3)]
+
+    for sql in consultas:
+        cursor.execute(sql, (1,))
+    assert cursor.connection.preparadas == {"tas_1", "tas_2"}
+    # Cheia, a conexão segue pelo caminho direto para as demais
+    assert cursor.execute(consultas[2], (1,)) == [("SELECT * FROM tabela_2 WHERE id = %s", (1,))]
+    # O limite é por conexão: outra conexão ainda prepara a terceira
+    outro = CursorFalso(registro)
+    assert outro.execute(consultas[2], (1,))[-1] == ("EXECUTE tas_3 (%s)", (1,))
+
+
+def test_sem_preparo_quando_desligado():
+    cursor = CursorFalso(database.RegistroSQL(True, preparar_apos=0))
+    sql = "SELECT * FROM clientes WHERE nick LIKE 'a%' AND id = ?"
+    for i in range(5):
+        assert cursor.execute(sql, (i,)) == [("SELECT * FROM clientes WHERE nick LIKE 'a%%' AND id = %s", (i,))]
+    assert cursor.connection.preparadas == set()
+    assert cursor.registro.metricas()["preparos"] == 0
+    assert cursor.registro.metricas()["compilacoes"] == 5
+
+
+def test_set_config_atualiza_o_cache_do_get_config():
+    db.set_config("TESTE_CACHE", "1")
+    hits = db.config_cache_stats()["hits"]
+    assert db.get_config("TESTE_CACHE") == "1"
+    db.set_config("TESTE_CACHE", "2")
+    assert db.get_config("TESTE_CACHE") == "2"
+    assert db.config_cache_stats()["hits"] == hits + 2  # nenhuma das leituras foi ao banco
+
+    # Alteração desfeita pelo rollback não fica no cache
+    try:
+        with db.transaction():
+            db.set_config("TESTE_CACHE", "3")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert db.get_config("TESTE_CACHE") == "2"
+
+
+def test_cache_de_config_pre_carregado_e_com_ttl():
+    db.set_config("TESTE_TTL", "a")
+    outra = database.Database()  # outra instância no mesmo banco
+    try:
+        hits = outra.config_cache_stats()["hits"]
+        assert outra.get_config("TESTE_TTL") == "a"
+        assert outra.config_cache_stats()["hits"] == hits + 1  # veio do carregar_configs da inicialização
+
+        db.set_config("TESTE_TTL", "b")
+        assert outra.get_config("TESTE_TTL") == "a"  # sem TTL o cache não expira
+        time.sleep(0.02)
+        assert outra.get_config("TESTE_TTL", ttl=0.01) == "b"
+    finally:
+        outra.close()
+
+
+class ConexaoPgFalsa:
+    def __init__(self, saudavel=True):
+        self.closed = False
+        self.saudavel = saudavel
+        self.status = psycopg2.extensions.STATUS_READY
+        self.rollbacks = 0
+
+    def cursor(self):
+        conexao = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                if not conexao.saudavel:
+                    raise psycopg2.OperationalError("server closed the connection")
+
+        return Cursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(monkeypatch, **kwargs):
+    monkeypatch.setattr(database, "psycopg2", psycopg2)
+    abertas = []
+
+    def conectar(pool):
+        abertas.append(ConexaoPgFalsa())
+        return abertas[-1]
+
+    monkeypatch.setattr(database.ConnectionPool, "_conectar", conectar)
+    return database.ConnectionPool("postgres://teste", **{"minconn": 0, **kwargs}), abertas
+
+
+def test_pool_reaproveita_conexao_e_respeita_o_limite(monkeypatch):
+    pool, abertas = _pool(monkeypatch, maxconn=1, timeout=0.05)
+    conn = pool.acquire()
+    conn.status = psycopg2.extensions.STATUS_BEGIN  # transação esquecida aberta
+    pool.release(conn)
+    assert conn.rollbacks == 1
+    assert pool.acquire() is conn
+
+    with pytest.raises(database.PoolTimeout):
+        pool.acquire()
+    # Quem espera recebe a conexão assim que ela volta
+    threading.Timer(0.01, pool.release, (conn,)).start()
+    pool.timeout = 1
+    assert pool.acquire() is conn
+    assert len(abertas) == 1
+    assert pool.snapshot() == {
+        "checkouts": 4, "waits": 2, "timeouts": 1, "reconnects": 0, "size": 1, "idle": 0, "in_use": 1, "max": 1,
+    }
+
+
+def test_pool_reconecta_conexao_ociosa_que_caiu(monkeypatch):
+    pool, abertas = _pool(monkeypatch, maxconn=2, healthcheck=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.saudavel = False
+    nova = pool.acquire()
+    assert nova is not conn and conn.closed
+    assert len(abertas) == 2
+    assert pool.snapshot()["reconnects"] == 1
+    assert pool.snapshot()["size"] == 1
+
+
+def test_sqlite_mantem_uma_conexao_por_thread():
+    conn = db.pool.acquire()
+    db.pool.release(conn)
+    assert db.pool.acquire() is conn
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(db.pool.acquire).result() is not conn
+
+
+def _plano(banco, sql, params=()):
+    return " ".join(linha["detail"] for linha in banco._execute("EXPLAIN QUERY PLAN " + sql, params, fetchall=True))
+
+
+def test_migracoes_versionadas_e_indices(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "migracoes.db"))
+    novo = database.Database()
+    try:
+        versoes = [linha["versao"] for linha in novo._execute("SELECT versao FROM schema_migrations ORDER BY versao", fetchall=True)]
+        assert versoes == [versao for versao, _, _ in database.MIGRATIONS]
+
+        assert "idx_transportes_status_data" in _plano(novo, "SELECT * FROM transportes WHERE status = ? ORDER BY data_criacao ASC", ("PAGO",))
+        assert "idx_transportes_cliente_data" in _plano(novo, "SELECT * FROM transportes WHERE cliente_id = ? ORDER BY data_criacao", (1,))
+        assert "idx_transportes_ticket_channel" in _plano(novo, "SELECT * FROM transportes WHERE ticket_channel_id = ?", ("1",))
+
+        # Só a migração que falta roda de novo; as demais ficam como estão
+        cliente = novo.get_or_create_cliente("901", "migracao")
+        transporte = novo.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "2")
+        novo._execute("UPDATE transportes SET status = 'concluido' WHERE id = ?", (transporte["id"],), commit=True)
+        novo._execute("DELETE FROM schema_migrations WHERE versao = 9", commit=True)
+        novo.apply_migrations()
+        novo.apply_migrations()
+        assert novo.get_transporte(transporte["id"])["status"] == "CONCLUIDO"
+        assert novo._execute("SELECT COUNT(*) FROM schema_migrations", fetchone=True)[0] == len(database.MIGRATIONS)
+    finally:
+        novo.close()
+
+
+def test_row_por_nome_e_por_posicao_com_indice_compartilhado():
+    _criar()
+    _criar()
+    linhas = db._execute("SELECT id, status, numero_ticket FROM transportes ORDER BY id", fetchall=True)
+    primeira = linhas[0]
+
+    assert primeira["status"] == primeira[1] == primeira.get("status")
+    assert primeira.get("inexistente", "padrao") == "padrao"
+    assert primeira[:2] == (primeira["id"], primeira["status"])
+    assert list(primeira) == ["id", "status", "numero_ticket"]
+    assert dict(primeira) == {"id": primeira[0], "status": primeira[1], "numero_ticket": primeira[2]}
+    assert "status" in primeira and len(primeira) == 3
+    assert all(linha._indice is primeira._indice for linha in linhas)  # um índice por query
+    assert not hasattr(primeira, "__dict__")
+
+    # Colunas repetidas (JOIN): vale a última
+    linha = db._execute(
+        "SELECT t.id, c.id FROM transportes t JOIN clientes c ON c.id = t.cliente_id WHERE t.id = ?",
+        (primeira["id"],), fetchone=True,
+    )
+    assert linha["id"] == linha[1]
+
+
+def test_impressao_digital_agrupa_variacoes_da_mesma_query():
+    assert database.impressao_digital("SELECT * FROM t WHERE id = 42 AND nome = 'ana'") == \
+        database.impressao_digital("SELECT *  FROM t\n WHERE id = 7 AND nome = 'bia'") == \
+        "SELECT * FROM t WHERE id = ? AND nome = ?"
+    assert database.impressao_digital("SELECT * FROM t WHERE status IN (?, ?, ?)") == \
+        database.impressao_digital("SELECT * FROM t WHERE status IN (?)") == "SELECT * FROM t WHERE status IN (?...)"
+
+
+def test_percentis_pelo_histograma():
+    estatistica = database.EstatisticaSQL("SELECT 1")
+    for ms in range(1, 101):
+        estatistica.registrar(float(ms))
+    resumo = estatistica.resumo()
+    assert resumo["contagem"] == 100 and resumo["total_ms"] == 5050
+    assert 25 <= resumo["p50_ms"] <= 100
+    assert resumo["p50_ms"] <= resumo["p95_ms"] <= resumo["p99_ms"] <= resumo["max_ms"] == 100
+
+
+def test_query_lenta_vai_ao_log_sem_valores_e_com_plano(monkeypatch, caplog):
+    monkeypatch.setattr(database, "DB_LENTA_MS", 0)
+    monkeypatch.setattr(database, "DB_EXPLAIN_MS", 0.000001)
+    sql = "SELECT * FROM clientes WHERE username = ? AND id > 0"
+    with caplog.at_level("WARNING", logger="tas.database"):
+        db._execute(sql, ("segredo",), fetchall=True)
+
+    digital = database.impressao_digital(sql)
+    assert f"{digital} params=(str[7])" in caplog.text
+    assert "segredo" not in caplog.text
+    resumo = next(resumo for resumo in db.sql_top(n=1000) if resumo["digital"] == digital)
+    assert resumo["contagem"] >= 1
+    assert resumo["plano"]
+
+
+def _pragmas(conn):
+    return {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ("journal_mode", "synchronous", "foreign_keys", "busy_timeout")
+    }
+
+
+def test_sqlite_pragmas_em_toda_conexao():
+    esperado = {
+        "journal_mode": database.SQLITE_JOURNAL_MODE.lower(), "synchronous": 1,  # NORMAL
+        "foreign_keys": 1, "busy_timeout": database.SQLITE_BUSY_TIMEOUT_MS,
+    }
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(lambda: _pragmas(db.pool.acquire())).result() == esperado
+    with db.pool.escrita() as escritor:
+        assert _pragmas(escritor) == esperado
+
+
+def test_sqlite_escritas_concorrentes_e_leitura_durante_escrita():
+    cliente = db.get_or_create_cliente("902", "concorrencia")
+
+    def criar(_):
+        return db.create_transporte(cliente["id"], "Lymhurst", 10_000_000, "NORMAL", 6.0, "3")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        criados = list(executor.map(criar, range(40)))
+    assert len({transporte["numero_ticket"] for transporte in criados}) == 40
+
+    # Leitura em outra thread não espera a escrita em andamento (WAL) e não vê o que não foi confirmado
+    with db.pool.escrita() as escritor:
+        escritor.execute("UPDATE transportes SET status = 'CANCELADO' WHERE id = ?", (criados[0]["id"],))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lido = executor.submit(db.get_transporte, criados[0]["id"]).result(timeout=1)
+        assert lido["status"] == criados[0]["status"]
+    assert db.get_transporte(criados[0]["id"])["status"] == criados[0]["status"]  # saiu sem commit
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bot.database import db
+from bot.cogs.financeiro import Financeiro
+
+
+def test_saldo_insuficiente_e_erro_sao_distintos(monkeypatch):
+    cog = Financeiro(None)
+    saldo = db.get_saldo_financeiro()["saldo_total"]
+
+    lancada = cog._adicionar_transacao("SAIDA", saldo + 100, exigir_saldo=True)
+    assert lancada is None
+
+    lancada = cog._adicionar_transacao("ENTRADA", 50)
+    assert lancada["saldo_total"] == saldo + 50
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError("banco fora do ar")
+
+    monkeypatch.setattr(db, "create_transacao_financeira", falhar)
+    with pytest.raises(RuntimeError):
+        cog._adicionar_transacao("SAIDA", 10, exigir_saldo=True)
+
+
+def test_lancamento_que_falha_nao_altera_o_saldo():
+    antes = dict(db.get_saldo_financeiro())
+    lancamentos = db.reconciliar_financeiro()["lancamentos"]
+
+    # O UPDATE do saldo já rodou quando o INSERT falha (autor_id impossível de gravar)
+    with pytest.raises(Exception):
+        db.create_transacao_financeira("ENTRADA", 70, autor_id=object())
+    # Erro depois do lançamento, dentro de uma transação maior
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.create_transacao_financeira("ENTRADA", 70)
+            raise RuntimeError("falha no meio da aprovação")
+
+    assert dict(db.get_saldo_financeiro()) == antes
+    assert db.reconciliar_financeiro()["lancamentos"] == lancamentos
+
+
+def test_lancamentos_concorrentes_nao_perdem_incremento():
+    antes = db.get_saldo_financeiro()
+    diferenca = db.reconciliar_financeiro()["diferenca"]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: db.create_transacao_financeira("ENTRADA", 2), range(100)))
+        list(executor.map(lambda _: db.create_transacao_financeira("SAIDA", 1), range(50)))
+
+    depois = db.get_saldo_financeiro()
+    assert depois["saldo_total"] == antes["saldo_total"] + 150
+    assert depois["saldo_entrada"] == antes["saldo_entrada"] + 200
+    assert depois["saldo_saida"] == antes["saldo_saida"] + 50
+    assert db.reconciliar_financeiro()["diferenca"] == diferenca
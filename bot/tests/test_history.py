@@ -0,0 +1,80 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+from bot.database import db
+import bot.cogs.history as history
+
+
+class _Canal:
+    def __init__(self):
+        self.ids = itertools.count(1000)
+        self.publicadas = []
+
+    async def send(self, **kwargs):
+        mensagem = SimpleNamespace(id=next(self.ids))
+        self.publicadas.append(mensagem.id)
+        return mensagem
+
+    async def delete_messages(self, mensagens):
+        for mensagem in mensagens:
+            self.publicadas.remove(mensagem.id)
+
+
+def _cog(monkeypatch):
+    canal = _Canal()
+
+    async def enviar(canal_destino, prioridade=None, **kwargs):
+        return await canal_destino.send(**kwargs)
+
+    monkeypatch.setattr(history, "outbound", SimpleNamespace(send=enviar))
+    monkeypatch.setattr(history, "canais", SimpleNamespace(canal=lambda guild, papel: canal))
+    db.set_config("GUILD_ID", "1")
+    return history.HistoryCog(SimpleNamespace(get_guild=lambda guild_id: object())), canal
+
+
+def _transporte():
+    cliente = db.get_or_create_cliente("800", "historico")
+    return db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+
+
+def test_entrega_republicada_substitui_a_anterior(monkeypatch):
+    cog, canal = _cog(monkeypatch)
+    transporte = _transporte()
+
+    asyncio.run(cog.registrar_entrega_publico(transporte["id"]))
+    asyncio.run(cog.registrar_entrega_publico(transporte["id"]))
+
+    linhas = db._execute("SELECT message_id FROM log_transportes WHERE transporte_id = ?", (transporte["id"],), fetchall=True)
+    assert [int(linha["message_id"]) for linha in linhas] == canal.publicadas == list(cog.mensagens)
+
+
+def test_falha_ao_gravar_remove_a_publicacao(monkeypatch):
+    cog, canal = _cog(monkeypatch)
+    transporte = _transporte()
+
+    async def falhar(*args, **kwargs):
+        raise RuntimeError("banco fora do ar")
+
+    monkeypatch.setattr(history.adb, "registrar_log_transporte", falhar)
+    asyncio.run(cog.registrar_entrega_publico(transporte["id"]))
+
+    assert canal.publicadas == []
+    assert not cog.mensagens
+
+
+def test_erro_de_comando_vai_para_o_log(monkeypatch, caplog):
+    async def on_error_padrao(interaction, error):
+        pass
+
+    tree = SimpleNamespace(on_error=on_error_padrao)
+    cog = history.HistoryCog(SimpleNamespace(tree=tree))
+    asyncio.run(cog.cog_load())
+
+    interaction = SimpleNamespace(command=SimpleNamespace(qualified_name="banco"), user=SimpleNamespace(id=42))
+    with caplog.at_level("ERROR", logger="tas.cogs.history"):
+        asyncio.run(tree.on_error(interaction, RuntimeError("falhou")))
+    assert "/banco" in caplog.text
+
+    asyncio.run(cog.cog_unload())
+    assert tree.on_error is on_error_padrao
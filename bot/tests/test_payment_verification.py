@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.config import STATUS
+from bot.database import db
+from bot.cogs.payment_verification import PaymentVerification
+
+
+class _Respostas:
+    def __init__(self):
+        self.enviadas = []
+
+    async def defer(self, **kwargs):
+        pass
+
+    async def send(self, conteudo=None, **kwargs):
+        self.enviadas.append(conteudo)
+
+
+def test_troca_de_status_condicional():
+    cliente = db.get_or_create_cliente("700", "cas")
+    transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+    db.update_transporte_status(transporte["id"], STATUS["AGUARDANDO_PAGAMENTO"])
+
+    assert db.update_transporte_status_se(transporte["id"], STATUS["PAGO"], STATUS["AGUARDANDO_PAGAMENTO"])
+    assert not db.update_transporte_status_se(transporte["id"], STATUS["PAGO"], STATUS["AGUARDANDO_PAGAMENTO"])
+    assert db.get_transporte(transporte["id"])["status"] == STATUS["PAGO"]
+
+
+def test_segundo_clique_nao_lanca_entrada():
+    cliente = db.get_or_create_cliente("701", "duplo")
+    transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+    db.update_transporte_status(transporte["id"], STATUS["PAGO"])  # primeiro clique já aprovou
+    transporte = db.get_transporte(transporte["id"])
+    lancamentos = len(db.get_transacoes_financeiras(1000))
+
+    respostas = _Respostas()
+    interaction = SimpleNamespace(user=SimpleNamespace(name="staff"), response=respostas, followup=respostas)
+    asyncio.run(PaymentVerification(None)._aprovar_pagamento(interaction, transporte, transporte["numero_ticket"], None))
+
+    assert len(db.get_transacoes_financeiras(1000)) == lancamentos
+    assert "já foi processado" in respostas.enviadas[0]
+
+
+def _foto(autor_id, numero_ticket):
+    anexo = SimpleNamespace(
+        content_type="image/png", size=1024, width=800, height=600,
+        url="https://cdn.example/deposito.png", filename="deposito.png"
+    )
+    return SimpleNamespace(
+        author=SimpleNamespace(id=autor_id, name="cliente"), attachments=[anexo],
+        channel=SimpleNamespace(name=f"ticket-{numero_ticket}"), id=1,
+    )
+
+
+def test_foto_de_deposito_depende_so_do_status(monkeypatch):
+    import bot.cogs.payment_verification as payment_verification
+
+    enviadas = []
+    monkeypatch.setattr(payment_verification, "outbound", SimpleNamespace(
+        reply=lambda mensagem, **kwargs: enviadas.append(kwargs),
+        send=lambda canal, **kwargs: enviadas.append(kwargs),
+    ))
+    cliente = db.get_or_create_cliente("702", "deposito")
+    transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+    db.update_transporte_status(transporte["id"], STATUS["PAGO"])
+
+    # Cog novo (como após um restart): nenhum estado além do banco
+    cog = PaymentVerification(SimpleNamespace(user=object(), get_guild=lambda guild_id: None))
+    asyncio.run(cog.on_message(_foto(999, transporte["numero_ticket"])))  # outra pessoa: ignorada
+    assert db.get_transporte(transporte["id"])["status"] == STATUS["PAGO"]
+
+    asyncio.run(cog.on_message(_foto(702, transporte["numero_ticket"])))
+    asyncio.run(cog.on_message(_foto(702, transporte["numero_ticket"])))  # segunda foto não reenfileira
+    atualizado = db.get_transporte(transporte["id"])
+    assert atualizado["status"] == STATUS["DEPOSITADO"]
+    assert atualizado["print_items_origem"] == "https://cdn.example/deposito.png"
+    assert "embed" in enviadas[0]  # depósito confirmado uma vez; a segunda foto só recebe o aviso de status
+    assert enviadas[1:] == [{"content": "⏭️ Este transporte não está aguardando pagamento (Status: DEPOSITADO)", "mention_author": False}]
@@ -0,0 +1,18 @@
+from bot.cogs.queue_cog import QueueCog
+
+
+def test_antes_da_primeira_leitura_toda_mudanca_conta():
+    cog = QueueCog(None)
+    assert cog._afeta_quadro(1, "CANCELADO")
+
+
+def test_so_mudancas_que_entram_ou_saem_do_quadro():
+    cog = QueueCog(None)
+    cog._ids_na_fila = {7}
+    assert cog._afeta_quadro(1, "PAGO")
+    assert cog._afeta_quadro(2, "DEPOSITADO")
+    assert cog._afeta_quadro(7, "EM_TRANSPORTE")  # saiu da fila
+    assert cog._afeta_quadro(7, None)  # removido
+    assert not cog._afeta_quadro(1, "AGUARDANDO_PAGAMENTO")
+    assert not cog._afeta_quadro(3, "CONCLUIDO")
+    assert not cog._afeta_quadro(3, None)
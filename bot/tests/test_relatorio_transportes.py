@@ -0,0 +1,36 @@
+from bot.database import db, MIGRATIONS
+
+
+def test_pagina_traz_discord_id_do_cliente():
+    cliente = db.get_or_create_cliente("987654321012345678", "relatorio")
+    transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+    db.update_transporte_status(transporte["id"], "EM_TRANSPORTE")
+
+    pagina = db.get_transportes_pagina(["EM_TRANSPORTE"], limite=5)
+    item = next(item for item in pagina["itens"] if item["id"] == transporte["id"])
+    assert item["cliente_discord_id"] == "987654321012345678"
+    assert item["cliente_id"] == cliente["id"]
+
+
+def test_contagem_bate_com_as_paginas():
+    cliente = db.get_or_create_cliente("111", "caixa")
+    for status in ("CANCELADO", "cancelado", "Cancelado"):
+        transporte = db.create_transporte(cliente["id"], "Martlock", 10_000_000, "NORMAL", 6.0, "1")
+        db.update_transporte_status(transporte["id"], status)
+
+    # Migração 9: normaliza as linhas antigas gravadas em minúsculas
+    comandos = next(comandos for versao, _, comandos in MIGRATIONS if versao == 9)
+    with db._cursor(commit=True) as cur:
+        for comando in comandos:
+            cur.execute(comando)
+    db._invalidar_stats()
+
+    total = db.get_stats_snapshot()["CANCELADO"]
+    vistos, pagina = 0, db.get_transportes_pagina(["CANCELADO"], limite=2)
+    while True:
+        vistos += len(pagina["itens"])
+        if not pagina["tem_proxima"]:
+            break
+        pagina = db.get_transportes_pagina(["CANCELADO"], antes=pagina["ultimo_id"], limite=2)
+    assert total == vistos == 3
+    assert "cancelado" not in db.get_stats_snapshot()
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from bot.cogs.transport_flow import TransportFlowCog
+
+
+class CanalFalso:
+    def __init__(self):
+        self.id = 4242
+        self.enviadas = []
+
+    async def send(self, *args, **kwargs):
+        self.enviadas.append(kwargs)
+
+
+def bot_falso(canal):
+    return SimpleNamespace(get_channel=lambda canal_id: canal if canal_id == canal.id else None)
+
+
+def clique(custom_id, user_id, **dados):
+    return SimpleNamespace(
+        id=1, channel_id=4242,
+        data={"custom_id": custom_id, **dados},
+        user=SimpleNamespace(id=user_id, name="cliente"),
+        response=SimpleNamespace(defer=AsyncMock(), send_modal=AsyncMock()),
+        followup=SimpleNamespace(send=AsyncMock()),
+    )
+
+
+def custom_ids(mensagem):
+    return [item.custom_id for item in mensagem["view"].children]
+
+
+def test_sessao_restaurada_continua_do_passo_atual():
+    canal = CanalFalso()
+    user_id = 987654321
+
+    # Antes do reinício: cliente parou no passo de prioridade (gravado no banco fora do loop)
+    antes = TransportFlowCog(bot_falso(canal))
+    antes.sessions.criar(
+        user_id, numero_ticket=1234, canal_id=canal.id, cliente_id=1,
+        nick_jogo="Player", origem="Martlock", status="COLETANDO_PRIORIDADE",
+    )
+
+    async def depois_do_reinicio():
+        cog = TransportFlowCog(bot_falso(canal))
+        await cog.cog_load()
+        assert cog.sessions.get(user_id)["origem"] == "Martlock"
+
+        # Botão da mensagem enviada antes do reinício: só o custom_id chega
+        await cog.on_button_click(clique(f"fluxo_alta_{user_id}", user_id))
+        return cog
+
+    cog = asyncio.run(depois_do_reinicio())
+    sessao = cog.sessions.get(user_id)
+    assert sessao["prioridade"] == "ALTA"
+    assert sessao["status"] == "COLETANDO_VALOR"
+    # Próximo passo publicado com um botão estável
+    assert custom_ids(canal.enviadas[-1]) == [f"fluxo_valor_{user_id}"]
+
+
+def test_passo_com_modal_depois_do_reinicio():
+    canal = CanalFalso()
+    user_id = 123123123
+    TransportFlowCog(bot_falso(canal)).sessions.criar(
+        user_id, numero_ticket=1235, canal_id=canal.id, cliente_id=1, status="COLETANDO_NICK",
+    )
+
+    async def cenario():
+        cog = TransportFlowCog(bot_falso(canal))
+        await cog.cog_load()
+        inter = clique(f"fluxo_nick_{user_id}", user_id)
+        await cog.on_button_click(inter)
+        modal = inter.response.send_modal.await_args.args[0]
+
+        # Envio do modal: o nick vai para a sessão restaurada e o passo de origem é publicado
+        envio = clique("modal_nick_transport", user_id)
+        modal.nick._value = "Jogador"
+        await modal.on_submit(envio)
+        return cog
+
+    cog = asyncio.run(cenario())
+    assert cog.sessions.get(user_id)["nick_jogo"] == "Jogador"
+    assert custom_ids(canal.enviadas[-1]) == [f"fluxo_origem_{user_id}"]
+
+
+def test_custom_id_desconhecido_e_ignorado():
+    cog = TransportFlowCog(bot_falso(CanalFalso()))
+    inter = clique("aprovar_pag_1", 1)
+    asyncio.run(cog.on_button_click(inter))
+    inter.response.defer.assert_not_awaited()
+
+
+def test_gravacao_que_falha_volta_para_a_fila(monkeypatch):
+    import time
+    import bot.utils.sessions as sessions
+    from bot.database import db
+
+    gravar = sessions._gravar_no_banco
+    falhas = []
+
+    def falhar_uma_vez(*args):
+        if not falhas:
+            falhas.append(args)
+            raise RuntimeError("banco fora do ar")
+        gravar(*args)
+
+    monkeypatch.setattr(sessions, "_gravar_no_banco", falhar_uma_vez)
+    monkeypatch.setattr(sessions, "ESPERA_GRAVACAO_MIN", 0)
+
+    async def main():
+        store = sessions.SessionStore("teste_falha")
+        store.criar(55, numero_ticket=1234)
+        await store._gravacao
+
+    asyncio.run(main())
+    assert falhas
+    linhas = db.get_sessoes("teste_falha", time.time() - 60)
+    assert [linha["user_id"] for linha in linhas] == ["55"]
@@ -162,3 +162,41 @@ class ViewConfirmarEntrega(discord.ui.View):
     @discord.ui.button(label="✅ Confirmei Retirada", style=discord.ButtonStyle.success, custom_id="btn_confirmar_ret")
     async def confirmar(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.callback_func(interaction, True)
+
+class ViewPaginacao(discord.ui.View):
+    """Botões Anterior/Próxima para listas paginadas por cursor (guarda só os ids das pontas)"""
+    def __init__(self, buscar_pagina, montar_embed, timeout=300):
+        super().__init__(timeout=timeout)
+        self.buscar_pagina = buscar_pagina  # async (antes=None, depois=None) -> página do Database
+        self.montar_embed = montar_embed    # (página, número da página) -> discord.Embed
+        self.pagina = None
+        self.numero = 1
+    
+    async def primeira_pagina(self):
+        """Busca a primeira página e devolve o embed dela"""
+        self.pagina = await self.buscar_pagina()
+        self._atualizar_botoes()
+        return self.montar_embed(self.pagina, self.numero)
+    
+    def _atualizar_botoes(self):
+        self.anterior.disabled = not self.pagina["tem_anterior"]
+        self.proxima.disabled = not self.pagina["tem_proxima"]
+    
+    async def _mostrar(self, interaction, numero, **cursor):
+        pagina = await self.buscar_pagina(**cursor)
+        if pagina["itens"]:
+            self.pagina, self.numero = pagina, numero
+        else:
+            # Os itens daquele lado foram apagados nesse meio tempo: fica na página atual
+            lado = "tem_proxima" if "antes" in cursor else "tem_anterior"
+            self.pagina = {**self.pagina, lado: False}
+        self._atualizar_botoes()
+        await interaction.response.edit_message(embed=self.montar_embed(self.pagina, self.numero), view=self)
+    
+    @discord.ui.button(label="◀️ Anterior", style=discord.ButtonStyle.secondary)
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, self.numero - 1, depois=self.pagina["primeiro_id"])
+    
+    @discord.ui.button(label="Próxima ▶️", style=discord.ButtonStyle.secondary)
+    async def proxima(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, self.numero + 1, antes=self.pagina["ultimo_id"])
@@ -0,0 +1,187 @@
+"""
+Índice de canais da guild
+
+Evita varrer `guild.channels` a cada clique: mantém, por guild, o canal de cada
+papel (análise, painel staff, fila, histórico, financeiro...) e o canal de cada
+ticket pelo número. O cog `canais` mantém o índice atualizado pelos eventos
+`on_guild_channel_create/delete/update` e persiste os papéis em `configuracoes`.
+
+Também cria os canais de ticket: overwrites por cargo de staff (resolvidos uma
+vez e cacheados) dentro de uma categoria de tickets, sem percorrer membros.
+"""
+import asyncio
+import re
+import discord
+from config import ADMIN_ROLE_ID, STAFF_ROLE_ID
+
+# Papel -> regra pelo nome do canal (o primeiro canal que casar assume o papel)
+PAPEIS = {
+    "analise": lambda canal: "analise-pagamentos" in canal.name,
+    "painel_staff": lambda canal: "painel-staff" in canal.name,
+    "fila": lambda canal: "fila" in canal.name and isinstance(canal, discord.TextChannel),
+    "historico": lambda canal: "historico" in canal.name,
+    "financeiro": lambda canal: "financeiro" in canal.name.lower() and isinstance(canal, discord.TextChannel),
+    "relatorio": lambda canal: "relatorio" in canal.name.lower() and isinstance(canal, discord.TextChannel),
+    "config": lambda canal: "config" in canal.name.lower() and isinstance(canal, discord.TextChannel),
+    "tickets": lambda canal: "ticket" in canal.name.lower() and isinstance(canal, discord.CategoryChannel),
+}
+
+# Cargos de staff: prefixo no nome ou IDs do .env
+PREFIXOS_STAFF = ("💼", "👑")
+NOME_CATEGORIA_TICKETS = "🎫 TICKETS"
+LIMITE_CATEGORIA = 50  # máximo de canais por categoria no Discord
+
+# ticket-1001 (transport_flow) e ticket-transport-1001 (tickets/transport_novo)
+_RE_TICKET = re.compile(r"^ticket-(?:transport-)?(\d+)$")
+
+
+def chave_config(papel):
+    """Chave em `configuracoes` onde o id do canal do papel fica salvo"""
+    return f"CANAL_{papel.upper()}"
+
+
+def numero_ticket(nome):
+    """Número do ticket a partir do nome do canal, ou None"""
+    match = _RE_TICKET.match(nome or "")
+    return int(match.group(1)) if match else None
+
+
+class ChannelRegistry:
+    def __init__(self):
+        self._papeis = {}   # guild_id -> {papel: channel_id}
+        self._tickets = {}  # guild_id -> {numero: channel_id}
+        self._staff = {}    # guild_id -> [role_id]
+        self._lock_categoria = asyncio.Lock()
+
+    def reconstruir(self, guild, fixos=None):
+        """Monta o índice da guild numa única varredura; `fixos` (papel -> id salvo) tem preferência"""
+        papeis = {}
+        for papel, canal_id in (fixos or {}).items():
+            if canal_id and guild.get_channel(int(canal_id)):
+                papeis[papel] = int(canal_id)
+
+        tickets = {}
+        for canal in guild.channels:
+            numero = numero_ticket(canal.name)
+            if numero is not None:
+                tickets[numero] = canal.id
+                continue
+            for papel, regra in PAPEIS.items():
+                if papel not in papeis and regra(canal):
+                    papeis[papel] = canal.id
+
+        self._papeis[guild.id] = papeis
+        self._tickets[guild.id] = tickets
+        return dict(papeis)
+
+    def _indice(self, guild):
+        if guild.id not in self._papeis:
+            self.reconstruir(guild)
+        return self._papeis[guild.id], self._tickets[guild.id]
+
+    def canal(self, guild, papel):
+        """Canal que exerce `papel` na guild, ou None"""
+        if not guild:
+            return None
+        papeis, _ = self._indice(guild)
+        canal_id = papeis.get(papel)
+        return guild.get_channel(canal_id) if canal_id else None
+
+    def ticket(self, guild, numero):
+        """Canal do ticket `numero`, ou None"""
+        if not guild or numero is None:
+            return None
+        _, tickets = self._indice(guild)
+        canal_id = tickets.get(int(numero))
+        return guild.get_channel(canal_id) if canal_id else None
+
+    def registrar(self, canal):
+        """Canal criado; devolve os papéis que ele passou a ocupar"""
+        papeis, tickets = self._indice(canal.guild)
+        numero = numero_ticket(canal.name)
+        if numero is not None:
+            tickets[numero] = canal.id
+            return []
+
+        novos = []
+        for papel, regra in PAPEIS.items():
+            if papel not in papeis and regra(canal):
+                papeis[papel] = canal.id
+                novos.append(papel)
+        return novos
+
+    def remover(self, canal):
+        """Canal apagado; devolve os papéis que foram reatribuídos (ou ficaram vagos)"""
+        papeis, tickets = self._indice(canal.guild)
+        numero = numero_ticket(canal.name)
+        if numero is not None and tickets.get(numero) == canal.id:
+            del tickets[numero]
+
+        vagos = [papel for papel, canal_id in papeis.items() if canal_id == canal.id]
+        for papel in vagos:
+            del papeis[papel]
+            # Raro: só quando um canal de papel some, procura um substituto
+            for outro in canal.guild.channels:
+                if outro.id != canal.id and PAPEIS[papel](outro):
+                    papeis[papel] = outro.id
+                    break
+        return vagos
+
+    def atualizar(self, antes, depois):
+        """Canal renomeado/alterado; devolve os papéis afetados"""
+        if antes.name == depois.name and type(antes) is type(depois):
+            return []
+        afetados = self.remover(antes)
+        return sorted(set(afetados) | set(self.registrar(depois)))
+
+    def papeis(self, guild):
+        """Cópia do mapeamento papel -> id da guild"""
+        papeis, _ = self._indice(guild)
+        return dict(papeis)
+
+    def cargos_staff(self, guild):
+        """Cargos de staff da guild (cache invalidado pelos eventos de cargo)"""
+        if guild.id not in self._staff:
+            ids_env = {int(i) for i in (ADMIN_ROLE_ID, STAFF_ROLE_ID) if i and str(i).isdigit()}
+            self._staff[guild.id] = [
+                role.id for role in guild.roles
+                if role.name.startswith(PREFIXOS_STAFF) or role.id in ids_env
+            ]
+        return [role for role in map(guild.get_role, self._staff[guild.id]) if role]
+
+    def invalidar_cargos(self, guild):
+        self._staff.pop(guild.id, None)
+
+    def _overwrites_base(self, guild):
+        acesso = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+        for role in self.cargos_staff(guild):
+            overwrites[role] = acesso
+        overwrites[guild.me] = discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
+        return overwrites
+
+    async def categoria_tickets(self, guild):
+        """Categoria dos tickets; criada uma vez (com as permissões de staff) se não existir"""
+        categoria = self.canal(guild, "tickets")
+        if categoria:
+            return categoria
+        async with self._lock_categoria:
+            categoria = self.canal(guild, "tickets")
+            if not categoria:
+                categoria = await guild.create_category(NOME_CATEGORIA_TICKETS, overwrites=self._overwrites_base(guild))
+                self._indice(guild)[0]["tickets"] = categoria.id
+            return categoria
+
+    async def criar_ticket(self, guild, membro, name, topic=None):
+        """Cria o canal do ticket com overwrites por cargo: custo independe do número de membros"""
+        overwrites = self._overwrites_base(guild)
+        overwrites[membro] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        categoria = await self.categoria_tickets(guild)
+        if len(categoria.channels) >= LIMITE_CATEGORIA:
+            categoria = None  # categoria cheia: cria na raiz, overwrites por cargo continuam valendo
+        canal = await guild.create_text_channel(name=name, category=categoria, overwrites=overwrites, topic=topic)
+        self.registrar(canal)
+        return canal
+
+
+canais = ChannelRegistry()
@@ -0,0 +1,71 @@
+"""
+Botões persistentes com roteamento estático
+
+O custom_id carrega o id do transporte (`aprovar_pag_42`), então nenhum estado
+precisa ficar preso em closures: o cog registra um handler por tipo de botão e,
+no clique (evento `button_click` disparado pelo main.py), o roteador acha o
+handler pelo prefixo e o cog carrega o transporte do banco. Os botões continuam
+funcionando depois de um reinício e nenhuma View fica guardada na memória.
+
+Os passos dos assistentes de ticket usam o mesmo esquema com o user_id do dono
+do ticket no lugar do transporte (`fluxo_nick_1234...`): o clique acha a sessão
+restaurada do banco (SessionStore) e o cliente continua de onde parou.
+"""
+import re
+import discord
+
+_RE_CUSTOM_ID = re.compile(r"^(?P<prefixo>[a-z_]+_)(?P<id>\d+)$")
+
+
+class BotaoDinamico:
+    """Tipo de botão: `{prefixo}{transporte_id}` com rótulo e estilo fixos"""
+
+    def __init__(self, prefixo, label, style):
+        self.prefixo = prefixo
+        self.label = label
+        self.style = style
+
+    def item(self, transporte_id):
+        return discord.ui.Button(label=self.label, style=self.style, custom_id=f"{self.prefixo}{transporte_id}")
+
+
+class SelectDinamico:
+    """Select `{prefixo}{id}` com opções fixas; o valor escolhido vem em `interaction.data["values"]`"""
+
+    def __init__(self, prefixo, placeholder, opcoes):
+        self.prefixo = prefixo
+        self.placeholder = placeholder
+        self.opcoes = opcoes
+
+    def item(self, id_):
+        return discord.ui.Select(
+            placeholder=self.placeholder, min_values=1, max_values=1,
+            options=list(self.opcoes), custom_id=f"{self.prefixo}{id_}"
+        )
+
+
+def view_estatica(*itens):
+    """View só para desenhar os botões; já parada, o discord.py não a guarda no ViewStore"""
+    view = discord.ui.View(timeout=None)
+    for item in itens:
+        view.add_item(item)
+    view.stop()
+    return view
+
+
+class RoteadorComponentes:
+    """Prefixo do custom_id -> handler(interaction, id) (id do transporte ou user_id da sessão)"""
+
+    def __init__(self):
+        self._rotas = {}
+
+    def registrar(self, botao, handler):
+        self._rotas[botao.prefixo] = handler
+
+    def resolver(self, custom_id):
+        """(handler, id) para o custom_id, ou None se não for de um componente registrado"""
+        match = _RE_CUSTOM_ID.match(custom_id or "")
+        if not match:
+            return None
+        handler = self._rotas.get(match.group("prefixo"))
+        return (handler, int(match.group("id"))) if handler else None
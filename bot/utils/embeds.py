@@ -89,11 +89,11 @@ def criar_embed_resumo_transporte(numero_ticket, origem, valor_estimado, priorid
 
 def criar_embed_fila(transporte):
     """Cria embed para fila de transportes"""
-    numero = transporte[1]
-    origem = transporte[3]
-    valor_em_milhoes = transporte[5] / 1_000_000 if transporte[5] else 0
-    prioridade = transporte[6]
-    status = transporte[2]
+    numero = transporte["numero_ticket"]
+    origem = transporte["origem"]
+    valor_em_milhoes = transporte["valor_estimado"] / 1_000_000 if transporte["valor_estimado"] else 0
+    prioridade = transporte["prioridade"]
+    status = transporte["status"]
     
     prioridade_emoji = "⚡" if prioridade == "ALTA" else "🕒"
     
@@ -0,0 +1,117 @@
+"""
+Logging estruturado
+
+Substitui os `print` dos fluxos quentes. Cada módulo pega o seu logger com
+`get_logger(__name__)` e loga com formatação preguiçosa (`log.debug("ticket %s", n)`):
+abaixo de LOG_NIVEL a chamada para na checagem de nível, sem montar a string.
+
+O handler do processo é um QueueHandler: quem loga só enfileira o registro e uma
+thread (QueueListener) formata e escreve no stdout, longe do event loop.
+
+Correlação: `vincular(ticket=..., interacao=...)` guarda campos num ContextVar que
+vão em todo registro da task atual (cada evento do discord.py roda na sua task,
+então o vínculo não vaza para outros eventos). Com LOG_FORMATO=json cada linha é um
+objeto JSON com esses campos.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from config import LOG_NIVEL, LOG_FORMATO
+
+_contexto = contextvars.ContextVar("log_contexto", default={})
+_listener = None
+
+
+def get_logger(nome):
+    """Logger da hierarquia do bot (`bot.cogs.tickets` -> `tas.cogs.tickets`)"""
+    return logging.getLogger(f"tas.{nome.removeprefix('bot.')}")
+
+
+def vincular(**campos):
+    """Acrescenta campos de correlação a todos os logs da task atual (None é ignorado)"""
+    _contexto.set({**_contexto.get(), **{k: v for k, v in campos.items() if v is not None}})
+
+
+def vincular_interacao(interaction, **campos):
+    """Atalho para handlers de interação: id da interação, usuário e canal"""
+    vincular(
+        interacao=interaction.id,
+        usuario=interaction.user.id if interaction.user else None,
+        canal=interaction.channel_id,
+        **campos
+    )
+
+
+@contextmanager
+def contexto_log(**campos):
+    """Como `vincular`, mas só dentro do bloco"""
+    token = _contexto.set({**_contexto.get(), **{k: v for k, v in campos.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+class _HandlerFila(logging.handlers.QueueHandler):
+    """Enfileira o registro já com o contexto da task e a mensagem resolvida (os args podem mudar depois)"""
+
+    def prepare(self, record):
+        record.contexto = _contexto.get()
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class FormatoTexto(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        linha = super().format(record)
+        contexto = getattr(record, "contexto", None)
+        if contexto:
+            linha += " [" + " ".join(f"{k}={v}" for k, v in contexto.items()) + "]"
+        return linha
+
+
+class FormatoJSON(logging.Formatter):
+    def format(self, record):
+        dados = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "contexto", {}),
+        }
+        if record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def configurar_logging(nivel=LOG_NIVEL, formato=LOG_FORMATO):
+    """Instala o QueueHandler na raiz e inicia a thread de escrita (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(FormatoJSON() if formato == "json" else FormatoTexto())
+    fila = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    raiz = logging.getLogger()
+    raiz.addHandler(_HandlerFila(fila))
+    # Bibliotecas (discord.py, ...) só a partir de WARNING; o bot no nível configurado
+    raiz.setLevel(logging.WARNING)
+    logging.getLogger("tas").setLevel(nivel.upper())
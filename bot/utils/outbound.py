@@ -0,0 +1,205 @@
+"""
+Agendador de envios para a API do Discord
+
+Envios e edições entram numa fila por canal (uma rota de rate limit por canal) e
+são despachados por um worker por canal, com prioridade: respostas ao cliente
+passam na frente de painéis de staff, que passam na frente de logs/histórico.
+Edições pendentes da mesma mensagem são fundidas numa só chamada.
+
+Uso:
+    outbound.send(canal, embed=embed)                       # dispara e segue
+    msg = await outbound.send(canal, prioridade=PRIORIDADE_CLIENTE, embed=embed)
+    outbound.edit(mensagem, embeds=embeds)                  # edições em rajada viram uma
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+import discord
+from config import OUTBOUND_CONCORRENCIA
+from bot.utils.log import get_logger
+
+log = get_logger(__name__)
+
+PRIORIDADE_CLIENTE = 0  # mensagens que o cliente está esperando no ticket
+PRIORIDADE_STAFF = 1    # painéis e avisos para a staff
+PRIORIDADE_LOG = 2      # histórico, logs e quadros atualizados em segundo plano
+
+
+class _Envio:
+    __slots__ = ("prioridade", "seq", "funcao", "kwargs", "chave", "future", "enfileirado_em")
+
+    def __init__(self, prioridade, seq, funcao, kwargs, chave, future):
+        self.prioridade = prioridade
+        self.seq = seq
+        self.funcao = funcao
+        self.kwargs = kwargs
+        self.chave = chave
+        self.future = future
+        self.enfileirado_em = time.monotonic()
+
+    def __lt__(self, outro):
+        return (self.prioridade, self.seq) < (outro.prioridade, outro.seq)
+
+
+class _PortaoPrioridade:
+    """Semáforo que libera as vagas por ordem de prioridade, não de chegada"""
+
+    def __init__(self, vagas):
+        self._vagas = vagas
+        self._espera = []
+        self._seq = itertools.count()
+
+    async def entrar(self, prioridade):
+        if self._vagas > 0 and not self._espera:
+            self._vagas -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._espera, (prioridade, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Se a vaga já tinha sido entregue, devolve para o próximo
+            if future.done() and not future.cancelled():
+                self.sair()
+            raise
+
+    def sair(self):
+        while self._espera:
+            _, _, future = heapq.heappop(self._espera)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._vagas += 1
+
+
+class OutboundScheduler:
+    """Fila central de mensagens enviadas/editadas pelo bot"""
+
+    def __init__(self, concorrencia=OUTBOUND_CONCORRENCIA, tentativas=3, janela_latencia=500):
+        self.tentativas = tentativas
+        self._portao = _PortaoPrioridade(concorrencia)
+        self._filas = {}        # canal_id -> heap de _Envio
+        self._workers = {}      # canal_id -> task
+        self._pendentes = {}    # chave de edição -> _Envio ainda na fila
+        self._seq = itertools.count()
+        self._latencias = deque(maxlen=janela_latencia)
+        self.stats = {"enfileirados": 0, "enviados": 0, "coalescidos": 0, "erros": 0, "rate_limits": 0}
+
+    def send(self, canal, prioridade=PRIORIDADE_STAFF, **kwargs):
+        """Enfileira `canal.send(**kwargs)`; devolve um Future com a Message"""
+        return self._enfileirar(canal.id, prioridade, canal.send, kwargs)
+
+    def reply(self, mensagem, prioridade=PRIORIDADE_CLIENTE, **kwargs):
+        """Enfileira `mensagem.reply(**kwargs)` na fila do canal da mensagem"""
+        return self._enfileirar(mensagem.channel.id, prioridade, mensagem.reply, kwargs)
+
+    def edit(self, mensagem, prioridade=PRIORIDADE_LOG, **kwargs):
+        """Enfileira `mensagem.edit(**kwargs)`; edições ainda não enviadas da mesma mensagem são fundidas"""
+        chave = ("edit", mensagem.id)
+        envio = self._pendentes.get(chave)
+        if envio is not None:
+            envio.kwargs.update(kwargs)
+            envio.funcao = mensagem.edit
+            if prioridade < envio.prioridade:
+                envio.prioridade = prioridade
+                heapq.heapify(self._filas[mensagem.channel.id])
+            self.stats["coalescidos"] += 1
+            return envio.future
+        return self._enfileirar(mensagem.channel.id, prioridade, mensagem.edit, kwargs, chave)
+
+    def _enfileirar(self, canal_id, prioridade, funcao, kwargs, chave=None):
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consumir_erro)
+        envio = _Envio(prioridade, next(self._seq), funcao, dict(kwargs), chave, future)
+
+        heapq.heappush(self._filas.setdefault(canal_id, []), envio)
+        if chave is not None:
+            self._pendentes[chave] = envio
+        self.stats["enfileirados"] += 1
+
+        if canal_id not in self._workers:
+            self._workers[canal_id] = asyncio.create_task(self._worker(canal_id))
+        return future
+
+    async def _worker(self, canal_id):
+        """Despacha a fila de um canal em série; encerra quando ela esvazia"""
+        fila = self._filas[canal_id]
+        try:
+            while fila:
+                envio = heapq.heappop(fila)
+                if envio.chave is not None:
+                    self._pendentes.pop(envio.chave, None)
+                await self._portao.entrar(envio.prioridade)
+                try:
+                    await self._executar(canal_id, envio)
+                finally:
+                    self._portao.sair()
+        finally:
+            self._workers.pop(canal_id, None)
+            for envio in self._filas.pop(canal_id, []):
+                if envio.chave is not None:
+                    self._pendentes.pop(envio.chave, None)
+                envio.future.cancel()
+
+    async def _executar(self, canal_id, envio):
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                resultado = await envio.funcao(**envio.kwargs)
+            except discord.RateLimited as e:
+                # Só chega aqui se a espera passar do limite do discord.py: aguarda e tenta de novo
+                erro, espera = e, e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    self._falhou(canal_id, envio, e)
+                    return
+                erro, espera = e, tentativa
+            except Exception as e:
+                self._falhou(canal_id, envio, e)
+                return
+            else:
+                self.stats["enviados"] += 1
+                self._latencias.append(time.monotonic() - envio.enfileirado_em)
+                if not envio.future.done():
+                    envio.future.set_result(resultado)
+                return
+
+            self.stats["rate_limits"] += 1
+            if tentativa < self.tentativas:
+                await asyncio.sleep(espera)
+        self._falhou(canal_id, envio, erro)
+
+    def _falhou(self, canal_id, envio, erro):
+        self.stats["erros"] += 1
+        log.warning("⚠️ Envio para o canal %s falhou: %s", canal_id, erro)
+        if not envio.future.done():
+            envio.future.set_exception(erro)
+
+    def metricas(self):
+        """Profundidade das filas, contadores e latência (enfileirar → concluído)"""
+        latencias = sorted(self._latencias)
+
+        def percentil(p):
+            if not latencias:
+                return 0.0
+            return latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000
+
+        return {
+            **self.stats,
+            "profundidade": sum(len(fila) for fila in self._filas.values()),
+            "maior_fila": max((len(fila) for fila in self._filas.values()), default=0),
+            "canais_ativos": len(self._workers),
+            "latencia_p50_ms": percentil(0.50),
+            "latencia_p95_ms": percentil(0.95),
+        }
+
+
+def _consumir_erro(future):
+    # Envios "dispara e segue" não são aguardados: marca a exceção como lida (já foi logada)
+    if not future.cancelled():
+        future.exception()
+
+
+outbound = OutboundScheduler()
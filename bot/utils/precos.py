@@ -0,0 +1,105 @@
+"""
+Tabela de preços
+
+Os preços ficam em `configuracoes` (PRECO_POR_MILHAO, TAXA_ALTA_PRIORIDADE), com os
+valores de config.py como padrão. Em memória fica um snapshot imutável e versionado:
+ler um preço é só acessar um atributo, e uma alteração troca o snapshot inteiro.
+
+Quem altera chama `precos.definir(...)`: grava no banco, recarrega, avisa os ouvintes
+locais e, no Postgres, faz NOTIFY para as outras instâncias do bot recarregarem.
+
+Uso:
+    taxa = valor / 1_000_000 * precos.atual.por_milhao(prioridade)
+"""
+import threading
+
+from config import PRECO_POR_MILHAO, TAXA_ALTA_PRIORIDADE, VALOR_MINIMO
+from bot.database import db
+from bot.utils.log import get_logger
+
+log = get_logger(__name__)
+
+CANAL_NOTIFICACAO = "precos_alterados"
+
+# Chave em `configuracoes` -> valor padrão
+PADROES = {
+    "PRECO_POR_MILHAO": PRECO_POR_MILHAO,
+    "TAXA_ALTA_PRIORIDADE": TAXA_ALTA_PRIORIDADE,
+}
+
+
+class Precos:
+    """Snapshot dos preços (não muda depois de criado)"""
+    __slots__ = ("versao", "preco_por_milhao", "taxa_alta_prioridade", "preco_alta_prioridade", "preco_base")
+
+    def __init__(self, versao, preco_por_milhao, taxa_alta_prioridade):
+        self.versao = versao
+        self.preco_por_milhao = preco_por_milhao
+        self.taxa_alta_prioridade = taxa_alta_prioridade
+        self.preco_alta_prioridade = preco_por_milhao * (1 + taxa_alta_prioridade)
+        self.preco_base = VALOR_MINIMO * preco_por_milhao
+
+    def por_milhao(self, prioridade):
+        return self.preco_alta_prioridade if prioridade == "ALTA" else self.preco_por_milhao
+
+    def __repr__(self):
+        return f"Precos(v{self.versao}, {self.preco_por_milhao}/M, +{self.taxa_alta_prioridade:.0%} alta)"
+
+
+class TabelaPrecos:
+    def __init__(self):
+        self._atual = None
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._escuta = None
+
+    @property
+    def atual(self):
+        """Snapshot vigente (carrega do banco no primeiro acesso)"""
+        return self._atual or self.carregar()
+
+    def carregar(self, payload=None):
+        """Lê os preços do banco; troca o snapshot (nova versão) só se algo mudou"""
+        salvos = db.get_configs(list(PADROES))
+        valores = {chave: float(salvos.get(chave) or padrao) for chave, padrao in PADROES.items()}
+        with self._lock:
+            anterior = self._atual
+            if anterior and (anterior.preco_por_milhao, anterior.taxa_alta_prioridade) == tuple(valores.values()):
+                return anterior
+            self._atual = Precos((anterior.versao + 1) if anterior else 1, *valores.values())
+            atual = self._atual
+        if anterior:
+            log.info("💲 Preços atualizados: %s", atual)
+            for callback in list(self._listeners):
+                try:
+                    callback(atual)
+                except Exception:
+                    log.exception("⚠️ Listener de preços falhou")
+        return atual
+
+    def definir(self, **valores):
+        """Grava preços (ex.: PRECO_POR_MILHAO=0.65) e propaga para esta e as outras instâncias"""
+        for chave, valor in valores.items():
+            if chave not in PADROES:
+                raise KeyError(chave)
+            db.set_config(chave, str(float(valor)), "float")
+        atual = self.carregar()
+        db.notificar(CANAL_NOTIFICACAO, str(atual.versao))
+        return atual
+
+    def add_listener(self, callback):
+        """callback(precos) a cada nova versão; pode rodar fora do event loop (thread do LISTEN)"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def escutar(self):
+        """Postgres: recarrega quando outra instância alterar os preços (idempotente)"""
+        if self._escuta is None:
+            self._escuta = db.escutar(CANAL_NOTIFICACAO, self.carregar) or False
+
+
+precos = TabelaPrecos()
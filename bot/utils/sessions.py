@@ -0,0 +1,219 @@
+"""
+Sessões do assistente de ticket
+
+Cada cog guarda o progresso do cliente (nick, origem, prioridade, valor...) num
+`SessionStore`: registros compactos (`__slots__`), expiração por inatividade
+(TTL), limite de memória (saem primeiro as alteradas há mais tempo) e gravação
+no banco (tabela `sessoes`) a cada alteração, para que um reinício do bot não
+obrigue o cliente a recomeçar. Uma gravação que falha volta para a fila e é
+repetida com espera crescente.
+
+Uso nos cogs (a sessão continua acessível como dict):
+    sessao = self.sessions.criar(user_id, numero_ticket=..., canal_id=...)
+    sessao['origem'] = origem          # grava no banco no próximo ciclo do loop
+    sessao = self.sessions.get(user_id)  # None se não existe ou expirou
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from config import SESSAO_TTL, SESSAO_MAX
+from bot.database import db, adb  # mesmo módulo que os cogs usam (um único Database)
+from bot.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Espera entre tentativas quando a gravação falha (dobra a cada falha, até o máximo)
+ESPERA_GRAVACAO_MIN = 1
+ESPERA_GRAVACAO_MAX = 60
+
+
+class Sessao:
+    """Estado de um ticket em andamento"""
+    CAMPOS = (
+        "numero_ticket", "canal_id", "cliente_id", "status", "nick_jogo", "origem",
+        "prioridade", "valor", "obs", "print_item", "transporte_id", "comprovante_url",
+    )
+    # Nomes antigos usados por alguns cogs
+    ALIASES = {"canal_ticket": "canal_id"}
+
+    __slots__ = CAMPOS + ("user_id", "atualizada_em", "_store")
+
+    def __init__(self, store, user_id, atualizada_em=None, **campos):
+        self._store = store
+        self.user_id = user_id
+        self.atualizada_em = atualizada_em or time.time()
+        for campo in self.CAMPOS:
+            setattr(self, campo, None)
+        for chave, valor in campos.items():
+            setattr(self, self._campo(chave), valor)
+
+    @classmethod
+    def _campo(cls, chave):
+        chave = cls.ALIASES.get(chave, chave)
+        if chave not in cls.CAMPOS:
+            raise KeyError(chave)
+        return chave
+
+    def __getitem__(self, chave):
+        return getattr(self, self._campo(chave))
+
+    def __setitem__(self, chave, valor):
+        setattr(self, self._campo(chave), valor)
+        if self._store is not None:
+            self._store._alterada(self)
+
+    def get(self, chave, padrao=None):
+        try:
+            valor = self[chave]
+        except KeyError:
+            return padrao
+        return padrao if valor is None else valor
+
+    def to_json(self):
+        return json.dumps({campo: getattr(self, campo) for campo in self.CAMPOS if getattr(self, campo) is not None})
+
+    def __repr__(self):
+        return f"Sessao(user_id={self.user_id}, numero_ticket={self.numero_ticket}, status={self.status})"
+
+
+class SessionStore:
+    """
+    Sessões de um cog, em memória com cópia na tabela `sessoes`. Expiração e limite seguem a ordem
+    da última alteração (FIFO por escrita): ler uma sessão não a renova nem a protege do limite.
+    """
+
+    def __init__(self, namespace, ttl=SESSAO_TTL, maximo=SESSAO_MAX):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maximo = maximo
+        self._sessoes = OrderedDict()  # user_id -> Sessao, da alterada há mais tempo para a mais recente
+        self._sujas = {}               # user_id -> Sessao aguardando gravação
+        self._removidas = set()
+        self._gravacao = None
+
+    def criar(self, user_id, **campos):
+        """Nova sessão (substitui a anterior do usuário)"""
+        sessao = Sessao(self, user_id, **campos)
+        self._sessoes[user_id] = sessao
+        self._alterada(sessao)
+        return sessao
+
+    def get(self, user_id):
+        self._expurgar()
+        return self._sessoes.get(user_id)
+
+    def __getitem__(self, user_id):
+        sessao = self.get(user_id)
+        if sessao is None:
+            raise KeyError(user_id)
+        return sessao
+
+    def __contains__(self, user_id):
+        return self.get(user_id) is not None
+
+    def __len__(self):
+        return len(self._sessoes)
+
+    def remover(self, user_id):
+        if self._sessoes.pop(user_id, None) is not None:
+            self._sujas.pop(user_id, None)
+            self._removidas.add(user_id)
+            self._agendar_gravacao()
+
+    def _alterada(self, sessao):
+        sessao.atualizada_em = time.time()
+        self._sessoes[sessao.user_id] = sessao
+        self._sessoes.move_to_end(sessao.user_id)
+        self._sujas[sessao.user_id] = sessao
+        self._removidas.discard(sessao.user_id)
+        self._expurgar()
+        self._agendar_gravacao()
+
+    def _expurgar(self):
+        """Remove as expiradas (do banco também) e, acima do limite, as menos recentes (só da memória)"""
+        limite = time.time() - self.ttl
+        while self._sessoes:
+            user_id, sessao = next(iter(self._sessoes.items()))
+            if sessao.atualizada_em >= limite and len(self._sessoes) <= self.maximo:
+                break
+            del self._sessoes[user_id]
+            if sessao.atualizada_em < limite:
+                self._sujas.pop(user_id, None)
+                self._removidas.add(user_id)
+        if self._removidas:
+            self._agendar_gravacao()
+
+    # ---- Persistência ----
+    def _agendar_gravacao(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._gravar()  # fora do loop (scripts): grava na hora
+            return
+        if self._gravacao is None or self._gravacao.done():
+            # Alterações feitas no mesmo handler saem numa única escrita
+            self._gravacao = loop.create_task(self._gravar_async())
+
+    def _pendentes(self):
+        """Tira da fila o que falta gravar: (sessões, linhas serializadas, user_ids removidos)"""
+        sessoes = list(self._sujas.values())
+        linhas = [(s.user_id, s.to_json(), s.atualizada_em) for s in sessoes]
+        removidas = list(self._removidas)
+        self._sujas.clear()
+        self._removidas.clear()
+        return sessoes, linhas, removidas
+
+    def _devolver(self, sessoes, removidas):
+        """Gravação falhou: volta para a fila o que não foi substituído por uma alteração mais nova"""
+        for sessao in sessoes:
+            if sessao.user_id not in self._removidas:
+                self._sujas.setdefault(sessao.user_id, sessao)
+        for user_id in removidas:
+            if user_id not in self._sujas:
+                self._removidas.add(user_id)
+
+    def _gravar(self):
+        sessoes, linhas, removidas = self._pendentes()
+        try:
+            _gravar_no_banco(self.namespace, linhas, removidas)
+        except Exception:
+            self._devolver(sessoes, removidas)
+            raise
+
+    async def _gravar_async(self):
+        await asyncio.sleep(0)
+        espera = ESPERA_GRAVACAO_MIN
+        # Repete enquanto chegarem alterações durante a escrita anterior (ou enquanto o banco falhar)
+        while self._sujas or self._removidas:
+            sessoes, linhas, removidas = self._pendentes()
+            try:
+                await adb.run_sync(_gravar_no_banco, self.namespace, linhas, removidas)
+            except Exception:
+                log.exception("⚠️ Erro ao gravar sessões (%s); nova tentativa em %ss", self.namespace, espera)
+                self._devolver(sessoes, removidas)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, ESPERA_GRAVACAO_MAX)
+            else:
+                espera = ESPERA_GRAVACAO_MIN
+
+    async def recarregar(self):
+        """Carrega do banco as sessões ainda válidas (chamar no `cog_load`)"""
+        desde = time.time() - self.ttl
+        await adb.limpar_sessoes(desde)
+        linhas = await adb.get_sessoes(self.namespace, desde)
+        for linha in linhas[-self.maximo:]:
+            user_id = int(linha["user_id"]) if str(linha["user_id"]).isdigit() else linha["user_id"]
+            campos = json.loads(linha["dados"])
+            self._sessoes[user_id] = Sessao(self, user_id, atualizada_em=float(linha["atualizada_em"]), **campos)
+        if linhas:
+            log.info("♻️ %s sessões restauradas (%s)", len(self._sessoes), self.namespace)
+
+
+def _gravar_no_banco(namespace, sujas, removidas):
+    if sujas:
+        db.salvar_sessoes(namespace, sujas)
+    if removidas:
+        db.remover_sessoes(namespace, removidas)
+
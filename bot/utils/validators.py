@@ -2,11 +2,26 @@
 Validadores e utilitários gerais
 """
 from PIL import Image
+import asyncio
+import hashlib
 import io
+from concurrent.futures import ThreadPoolExecutor
 import discord
+from config import IMAGEM_MAX_MB, IMAGEM_MAX_PIXELS, IMAGEM_WORKERS
 
-async def validar_imagem(attachment: discord.Attachment, max_size_mb=10) -> bool:
-    """Valida se um attachment é uma imagem válida"""
+# Pool dedicado: decodificar imagens não disputa o executor padrão (usado pelo banco)
+_pool_imagens = ThreadPoolExecutor(max_workers=IMAGEM_WORKERS, thread_name_prefix="imagem")
+# Limita os anexos baixados ao mesmo tempo (bytes em memória durante uma rajada)
+_vagas_imagens = None
+
+def _semaforo_imagens():
+    global _vagas_imagens
+    if _vagas_imagens is None:
+        _vagas_imagens = asyncio.Semaphore(IMAGEM_WORKERS)
+    return _vagas_imagens
+
+def checar_cabecalho(attachment: discord.Attachment, max_size_mb=IMAGEM_MAX_MB) -> bool:
+    """Checagem prévia só com os metadados do Discord (tipo, tamanho, dimensões), sem baixar nada"""
     if not attachment:
         return False
     
@@ -18,15 +33,71 @@ async def validar_imagem(attachment: discord.Attachment, max_size_mb=10) -> bool
     if attachment.size > max_size_mb * 1024 * 1024:
         return False
     
+    # Dimensões informadas pelo Discord (podem faltar)
+    if attachment.width and attachment.height and attachment.width * attachment.height > IMAGEM_MAX_PIXELS:
+        return False
+    
+    return True
+
+def _verificar_bytes(data: bytes) -> bool:
+    """Roda no pool: lê o cabeçalho, confere as dimensões e só então verifica o arquivo"""
     try:
-        # Tenta abrir como imagem
-        data = await attachment.read()
-        img = Image.open(io.BytesIO(data))
-        img.verify()
+        with Image.open(io.BytesIO(data)) as img:
+            largura, altura = img.size
+            if largura * altura > IMAGEM_MAX_PIXELS:
+                return False
+            img.verify()
         return True
     except Exception:
         return False
 
+def _dhash(cinza, lado=8) -> int:
+    """Hash perceptual (dHash) de lado x lado bits: compara cada pixel com o vizinho numa miniatura (lado+1) x lado"""
+    pixels = list(cinza.resize((lado + 1, lado), Image.LANCZOS).getdata())
+    valor = 0
+    for linha in range(lado):
+        for coluna in range(lado):
+            esquerda = pixels[linha * (lado + 1) + coluna]
+            valor = (valor << 1) | (esquerda > pixels[linha * (lado + 1) + coluna + 1])
+    return valor
+
+def _analisar_bytes(data: bytes):
+    """
+    Roda no pool: valida e devolve (sha256, dhash, dhash16), ou None se não for uma imagem válida.
+    dhash (64 bits) alimenta o índice de bandas; dhash16 (256 bits, em hex) é o que mede a semelhança:
+    o 8x8 dá distância 0 entre comprovantes diferentes do mesmo modelo de banco.
+    """
+    if not _verificar_bytes(data):
+        return None
+    try:
+        # verify() inutiliza o objeto: reabre para calcular o hash perceptual
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft('L', (64, 64))  # JPEG: decodifica já reduzido
+            cinza = img.convert('L')
+            return hashlib.sha256(data).hexdigest(), _dhash(cinza), f"{_dhash(cinza, 16):064x}"
+    except Exception:
+        return None
+
+async def _processar_no_pool(attachment, funcao, max_size_mb, padrao):
+    if not checar_cabecalho(attachment, max_size_mb):
+        return padrao
+    
+    async with _semaforo_imagens():
+        try:
+            data = await attachment.read()
+        except discord.HTTPException:
+            return padrao
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pool_imagens, funcao, data)
+
+async def validar_imagem(attachment: discord.Attachment, max_size_mb=IMAGEM_MAX_MB) -> bool:
+    """Valida se um attachment é uma imagem válida (verificação fora do event loop)"""
+    return await _processar_no_pool(attachment, _verificar_bytes, max_size_mb, False)
+
+async def analisar_comprovante(attachment: discord.Attachment, max_size_mb=IMAGEM_MAX_MB):
+    """Valida o comprovante e calcula (sha256, dhash, dhash16) no mesmo download; None se inválido"""
+    return await _processar_no_pool(attachment, _analisar_bytes, max_size_mb, None)
+
 def validar_valor_prata(valor_text: str, minimo: int = 10_000_000) -> tuple[bool, int]:
     """
     Valida um valor em prata